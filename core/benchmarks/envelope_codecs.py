@@ -0,0 +1,133 @@
+"""
+envelope_codecs.py
+
+Benchmarks envelope encode and decode cost, and envelope size, for the sample X12, FHIR, and HL7v2 payloads.
+
+Compares the installed envelope codecs, including the default json codec's legacy double encoded JSON envelope,
+with the headers envelope format. Codecs whose packages are not installed are skipped.
+
+Usage:
+    poetry run python benchmarks/envelope_codecs.py --iterations 10000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from linuxforhealth.healthos.core.connector.codecs import (
+    ENVELOPE_CODECS,
+    get_envelope_codec,
+)
+from linuxforhealth.healthos.core.connector.envelope import (
+    EnvelopeFormat,
+    decode_envelope,
+    encode_envelope,
+)
+from linuxforhealth.healthos.core.connector.processor import PublishDataModel
+from linuxforhealth.healthos.core.detect import detect_content_type
+
+SAMPLE_DATA_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "resources", "sample-data"
+)
+SAMPLE_FILES = ["270.x12", "fhir-us-core-patient.json", "adt_a01_26.hl7"]
+
+
+def load_publish_models() -> Dict[str, PublishDataModel]:
+    """Returns publish models for the sample payloads, keyed by file name"""
+    publish_models = {}
+    for file_name in SAMPLE_FILES:
+        with open(os.path.join(SAMPLE_DATA_PATH, file_name)) as f:
+            data = f.read()
+        publish_models[file_name] = PublishDataModel(
+            data=data, content_type=detect_content_type(data)
+        )
+    return publish_models
+
+
+def median_latency(func: Callable, iterations: int) -> float:
+    """
+    Returns the median latency, in microseconds, for repeated calls to a function.
+
+    :param func: The function to measure
+    :param iterations: The number of calls
+    :return: the median latency
+    """
+    latencies: List[float] = []
+    for _ in range(iterations):
+        start_time = time.perf_counter_ns()
+        func()
+        latencies.append((time.perf_counter_ns() - start_time) / 1000)
+    return statistics.median(latencies)
+
+
+def report(name: str, encode: Callable, decode: Callable, iterations: int):
+    """
+    Measures and prints the results for an envelope encoding.
+
+    :param name: The encoding name
+    :param encode: Function returning the encoded body and headers
+    :param decode: Function decoding the encoded body and headers
+    :param iterations: The number of calls measured
+    """
+    body, headers = encode()
+    header_size = sum(len(k) + len(v) for k, v in (headers or {}).items())
+
+    encode_latency = median_latency(encode, iterations)
+    decode_latency = median_latency(lambda: decode(body, headers), iterations)
+
+    print(
+        f"  {name:<12} {encode_latency:>12.1f} {decode_latency:>12.1f} "
+        + f"{len(body):>10} {header_size:>10}"
+    )
+
+
+def main(iterations: int):
+    """
+    Runs the benchmark.
+
+    :param iterations: The number of encode and decode calls measured per codec and payload
+    """
+    codecs = []
+    for codec_name in ENVELOPE_CODECS:
+        try:
+            codecs.append(get_envelope_codec(codec_name))
+        except ImportError:
+            print(f"skipping {codec_name}, package is not installed")
+
+    for file_name, publish_model in load_publish_models().items():
+        print(f"\n{file_name} ({len(publish_model.data)} characters)")
+        print(
+            f"  {'envelope':<12} {'encode (us)':>12} {'decode (us)':>12} "
+            + f"{'body bytes':>10} {'hdr bytes':>10}"
+        )
+
+        for codec in codecs:
+            report(
+                codec.name,
+                lambda: encode_envelope(
+                    publish_model, EnvelopeFormat.BODY, codec=codec
+                ),
+                decode_envelope,
+                iterations,
+            )
+
+        report(
+            "headers",
+            lambda: encode_envelope(publish_model, EnvelopeFormat.HEADERS),
+            decode_envelope,
+            iterations,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Envelope codec benchmark")
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=10000,
+        help="The number of encode and decode calls measured per codec and payload",
+    )
+    args = parser.parse_args(sys.argv[1:])
+    main(args.iterations)
@@ -0,0 +1,179 @@
+"""
+fhir_validation.py
+
+Benchmarks FHIR resource validation latency per resource type.
+
+Reports the first use (cold) latency, optionally after warming the registry, and the p50/p99 latency for validation through the FHIR model registry
+and through fhir.resources.construct_fhir_element. Also reports the latency for rejecting a resource type
+which is not included in the registry's allow-list.
+
+Usage:
+    poetry run python benchmarks/fhir_validation.py --iterations 1000 [--warm]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from linuxforhealth.healthos.core.detect import DataValidationError, FhirModelRegistry
+
+SAMPLE_PATIENT_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "tests",
+    "resources",
+    "sample-data",
+    "fhir-us-core-patient.json",
+)
+
+
+def load_resources() -> Dict[str, Dict]:
+    """Returns the benchmarked resources, keyed by resource type"""
+    with open(SAMPLE_PATIENT_PATH) as f:
+        patient = json.load(f)
+
+    observation = {
+        "resourceType": "Observation",
+        "id": "blood-pressure",
+        "status": "final",
+        "code": {
+            "coding": [
+                {"system": "http://loinc.org", "code": "85354-9", "display": "BP"}
+            ]
+        },
+        "subject": {"reference": f"Patient/{patient['id']}"},
+        "effectiveDateTime": "2022-07-01T09:30:10+01:00",
+        "component": [
+            {
+                "code": {"coding": [{"system": "http://loinc.org", "code": "8480-6"}]},
+                "valueQuantity": {"value": 107, "unit": "mmHg"},
+            },
+            {
+                "code": {"coding": [{"system": "http://loinc.org", "code": "8462-4"}]},
+                "valueQuantity": {"value": 60, "unit": "mmHg"},
+            },
+        ],
+    }
+
+    encounter = {
+        "resourceType": "Encounter",
+        "id": "office-visit",
+        "status": "finished",
+        "class": {
+            "system": "http://terminology.hl7.org/CodeSystem/v3-ActCode",
+            "code": "AMB",
+        },
+        "subject": {"reference": f"Patient/{patient['id']}"},
+        "period": {"start": "2022-07-01T09:00:00Z", "end": "2022-07-01T10:00:00Z"},
+    }
+
+    bundle = {
+        "resourceType": "Bundle",
+        "id": "transaction",
+        "type": "transaction",
+        "entry": [
+            {
+                "fullUrl": f"urn:uuid:{i}",
+                "resource": r,
+                "request": {"method": "POST", "url": r["resourceType"]},
+            }
+            for i, r in enumerate([patient, observation, encounter])
+        ],
+    }
+
+    return {
+        "Patient": patient,
+        "Observation": observation,
+        "Encounter": encounter,
+        "Bundle": bundle,
+    }
+
+
+def measure(func: Callable, iterations: int) -> List[float]:
+    """
+    Returns the latencies, in microseconds, for repeated calls to a function.
+
+    :param func: The function to measure
+    :param iterations: The number of calls
+    :return: list of latencies
+    """
+    latencies = []
+    for _ in range(iterations):
+        start_time = time.perf_counter_ns()
+        func()
+        latencies.append((time.perf_counter_ns() - start_time) / 1000)
+    return latencies
+
+
+def percentiles(latencies: List[float]) -> str:
+    """Returns the formatted p50 and p99 latencies"""
+    quantiles = statistics.quantiles(latencies, n=100)
+    return f"{quantiles[49]:>10.1f} {quantiles[98]:>10.1f}"
+
+
+def main(iterations: int, warm: bool):
+    """
+    Runs the benchmark.
+    Cold latencies are only meaningful when the benchmark runs in a new interpreter.
+
+    :param iterations: The number of validations measured per resource type
+    :param warm: True to warm the registry before measuring
+    """
+    from fhir.resources import construct_fhir_element
+
+    resources = load_resources()
+    registry = FhirModelRegistry(resources.keys())
+
+    if warm:
+        start_time = time.perf_counter()
+        model_count = registry.warm()
+        elapsed_time = time.perf_counter() - start_time
+        print(f"warmed {model_count} element models in {elapsed_time:.3f}s\n")
+
+    print(
+        f"{'resource type':<15} {'cold (us)':>12} {'registry p50':>12} {'p99':>10} "
+        + f"{'construct p50':>14} {'p99':>10}"
+    )
+
+    for resource_type, resource in resources.items():
+        validate = lambda: registry.get_model(resource_type).parse_obj(resource)
+        construct = lambda: construct_fhir_element(resource_type, resource)
+
+        cold_latency = measure(validate, 1)[0]
+        registry_latencies = measure(validate, iterations)
+        construct_latencies = measure(construct, iterations)
+
+        print(
+            f"{resource_type:<15} {cold_latency:>12.1f} {percentiles(registry_latencies):>23} "
+            + f"{percentiles(construct_latencies):>25}"
+        )
+
+    def reject():
+        try:
+            registry.get_model("Claim")
+        except DataValidationError:
+            pass
+
+    print(
+        f"{'rejected type':<15} {'':>12} {percentiles(measure(reject, iterations)):>23}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FHIR validation latency benchmark")
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=1000,
+        help="The number of validations measured per resource type",
+    )
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Warms the registry's model classes before measuring",
+    )
+    args = parser.parse_args(sys.argv[1:])
+    main(args.iterations, args.warm)
@@ -0,0 +1,211 @@
+"""
+kafka_consumer.py
+
+Benchmarks Kafka consumer throughput for record-at-a-time consumption and for batched, partition parallel
+consumption.
+
+A stand-in consumer serves the sample X12, FHIR, and HL7v2 payloads from multiple partitions, and a stand-in
+Jetstream client acknowledges publishes after a configurable latency. One partition may be configured with
+additional per-record latency, to model a partition whose messages are slow to validate. Records are
+validated as they would be by the core service, optionally using validation worker processes.
+
+Usage:
+    poetry run python benchmarks/kafka_consumer.py --records 2000 --partitions 8 [--workers 4] [--slow-ms 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+from aiokafka import ConsumerRecord, TopicPartition
+
+from linuxforhealth.healthos.core.config import load_core_configuration
+from linuxforhealth.healthos.core.connector import kafka, nats
+from linuxforhealth.healthos.core.connector.kafka import (
+    KafkaBatchConsumer,
+    consume_message,
+)
+from linuxforhealth.healthos.core.connector.publisher import flush_core_publisher
+from linuxforhealth.healthos.core.executor import (
+    create_validation_executor,
+    shutdown_validation_executor,
+)
+
+RESOURCES_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "resources")
+SAMPLE_FILES = ["270.x12", "fhir-us-core-patient.json", "adt_a01_26.hl7"]
+TOPIC = "benchmark"
+
+
+class StandInJetStream:
+    """Acknowledges publishes after a fixed latency"""
+
+    def __init__(self, ack_latency: float):
+        self.ack_latency = ack_latency
+
+    async def publish(self, subject, stream, payload, headers=None):
+        await asyncio.sleep(self.ack_latency)
+        return None
+
+
+class StandInConsumer:
+    """Serves records from multiple partitions, supporting async iteration, getmany(), and pause()"""
+
+    def __init__(self, payloads: List[bytes], records: int, partitions: int):
+        self.partition_records: Dict[TopicPartition, List[ConsumerRecord]] = {}
+        for i in range(records):
+            partition = i % partitions
+            records_for_partition = self.partition_records.setdefault(
+                TopicPartition(TOPIC, partition), []
+            )
+            records_for_partition.append(
+                ConsumerRecord(
+                    topic=TOPIC,
+                    partition=partition,
+                    offset=len(records_for_partition),
+                    timestamp=0,
+                    timestamp_type=0,
+                    key=None,
+                    value=payloads[i % len(payloads)],
+                    checksum=None,
+                    serialized_key_size=0,
+                    serialized_value_size=0,
+                    headers=[],
+                )
+            )
+        self.paused_partitions = set()
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(r) for r in self.partition_records.values())
+
+    def subscription(self):
+        return {TOPIC}
+
+    def assignment(self):
+        return set(self.partition_records)
+
+    def pause(self, *partitions):
+        self.paused_partitions.update(partitions)
+
+    def resume(self, *partitions):
+        self.paused_partitions.difference_update(partitions)
+
+    def paused(self):
+        return set(self.paused_partitions)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ConsumerRecord:
+        for records in self.partition_records.values():
+            if records:
+                return records.pop(0)
+        raise StopAsyncIteration
+
+    async def getmany(self, timeout_ms=0, max_records=None) -> Dict:
+        # yields to the partition tasks, as a fetch would
+        await asyncio.sleep(0)
+        batch = {}
+        per_partition = max(1, max_records // max(1, len(self.partition_records)))
+        for partition, records in self.partition_records.items():
+            if records and partition not in self.paused_partitions:
+                batch[partition], self.partition_records[partition] = (
+                    records[:per_partition],
+                    records[per_partition:],
+                )
+        return batch
+
+
+def slow_partition_submit(slow_latency: float):
+    """
+    Wraps submit_batch, adding latency to records from partition 0.
+
+    :param slow_latency: The added latency, in seconds
+    """
+    submit_batch = kafka.submit_batch
+
+    async def _submit_batch(msg, validation_mode, upstream_id, upstream_key):
+        if upstream_key.endswith(":0"):
+            await asyncio.sleep(slow_latency)
+        return await submit_batch(msg, validation_mode, upstream_id, upstream_key)
+
+    return _submit_batch
+
+
+async def run_mode(mode: str, payloads: List[bytes], args) -> float:
+    """
+    Consumes the stand-in records and returns the throughput in records per second.
+
+    :param mode: "sequential" or "batch"
+    :param payloads: The sample payloads
+    :param args: The parsed command line arguments
+    """
+    consumer = StandInConsumer(payloads, args.records, args.partitions)
+    start_time = time.perf_counter()
+
+    if mode == "sequential":
+        await consume_message(consumer)
+    else:
+        batch_consumer = KafkaBatchConsumer(consumer, max_records=args.max_records)
+        while consumer.remaining:
+            await batch_consumer.consume_batch()
+        await batch_consumer.join()
+        await batch_consumer.stop()
+
+    await flush_core_publisher()
+    return args.records / (time.perf_counter() - start_time)
+
+
+async def main(args):
+    """
+    Runs the benchmark.
+
+    :param args: The parsed command line arguments
+    """
+    load_core_configuration(
+        os.path.join(RESOURCES_PATH, "service-config", "core-service.yml")
+    )
+    nats.jetstream_core_client = StandInJetStream(args.ack_ms / 1000)
+    if args.slow_ms:
+        kafka.submit_batch = slow_partition_submit(args.slow_ms / 1000)
+    create_validation_executor(args.workers, max_pending=64)
+
+    payloads = []
+    for file_name in SAMPLE_FILES:
+        with open(os.path.join(RESOURCES_PATH, "sample-data", file_name), "rb") as f:
+            payloads.append(f.read())
+
+    print(
+        f"{args.records} records, {args.partitions} partitions, {args.workers} validation workers, "
+        + f"{args.ack_ms}ms ack latency, {args.slow_ms}ms partition 0 latency"
+    )
+    try:
+        for mode in ("sequential", "batch"):
+            throughput = await run_mode(mode, payloads, args)
+            print(f"  {mode:<12} {throughput:>10.0f} records/s")
+    finally:
+        shutdown_validation_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kafka consumer throughput benchmark")
+    parser.add_argument("--records", type=int, default=2000, help="Records consumed")
+    parser.add_argument("--partitions", type=int, default=8, help="Topic partitions")
+    parser.add_argument(
+        "--max-records", type=int, default=500, help="Records per getmany() batch"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Validation worker processes"
+    )
+    parser.add_argument(
+        "--ack-ms", type=float, default=1.0, help="Jetstream ack latency (ms)"
+    )
+    parser.add_argument(
+        "--slow-ms",
+        type=float,
+        default=0.0,
+        help="Additional per-record latency for partition 0 (ms)",
+    )
+    asyncio.run(main(parser.parse_args(sys.argv[1:])))
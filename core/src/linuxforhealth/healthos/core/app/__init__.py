@@ -23,13 +23,31 @@ from ..config import (
     load_core_configuration,
 )
 from ..connector import (
+    close_core_spool,
+    create_claim_check_store,
+    create_core_publisher,
+    create_core_spool,
     create_inbound_connector_route,
     create_inbound_jetstream_clients,
     create_jetstream_core_client,
     create_kafka_consumer_connector,
+    create_kafka_producer_connector,
+    flush_core_publisher,
+    get_envelope_codec,
     get_jetstream_connections,
     get_kafka_consumer_connectors,
+    get_kafka_producer_connectors,
+    get_kafka_worker_supervisors,
+    ingress_stream_subject,
+    validate_compression,
 )
+from ..detect import (
+    ValidationMode,
+    configure_fhir_model_registry,
+    configure_validation_cache,
+    prewarm,
+)
+from ..executor import create_validation_executor, shutdown_validation_executor
 from .admin import router as admin_router
 
 logger = logging.getLogger(__name__)
@@ -50,6 +68,7 @@ def core_startup(args):
     Starts the HealthOS core service using the service config.
     Bootstrapping tasks include:
     - loading and parsing the service configuration
+    - pre-warming the parsers for the configured content types
     - registering app startup handlers
     - registering app shutdown handlers
 
@@ -62,7 +81,10 @@ def core_startup(args):
         # load service config
         load_core_configuration(args.f)
         core_config: CoreServiceConfig = get_core_configuration()
-    except (FileNotFoundError, ValidationError) as e:
+        # validates that the envelope codec's and compression algorithm's packages are installed
+        get_envelope_codec(core_config.app.messaging.envelope_codec)
+        validate_compression(core_config.app.messaging.compression)
+    except (FileNotFoundError, ValidationError, ImportError) as e:
         msg = f"Unable to start HealthOS Core Service\n An exception occurred {e}"
         logger.error(msg)
         sys.exit(1)
@@ -81,18 +103,75 @@ def core_startup(args):
         )
         core_service_app.add_event_handler("startup", startup_endpoints)
 
+        # load parsers and data models ahead of the first request
+        configure_fhir_model_registry(core_config.app.validation.fhir_resource_types)
+        prewarm(core_config.app.validation.prewarm_content_types)
+
+        # configure validation process pool
+        startup_validation = partial(
+            create_validation_executor,
+            core_config.app.validation.max_workers,
+            core_config.app.validation.max_pending,
+            core_config.app.validation.prewarm_content_types,
+            core_config.app.validation.fhir_resource_types,
+        )
+        core_service_app.add_event_handler("startup", startup_validation)
+
+        # configure validation cache
+        startup_validation_cache = partial(
+            configure_validation_cache,
+            core_config.app.validation.cache_max_entries,
+            core_config.app.validation.cache_max_bytes,
+            core_config.app.validation.cache_ttl,
+        )
+        core_service_app.add_event_handler("startup", startup_validation_cache)
+
         # configure internal NATS (Jetstream)
         startup_internal_nats = partial(
             create_jetstream_core_client,
             core_config.app.messaging.url,
             core_config.app.messaging.stream_name,
             [
-                core_config.app.messaging.ingress_subject,
+                ingress_stream_subject(core_config.app.messaging),
                 core_config.app.messaging.error_subject,
             ],
+            # the duplicate window is only configured when deduplication is enabled
+            core_config.app.messaging.dedupe_window
+            if core_config.app.messaging.dedupe_key != "none"
+            else None,
         )
         core_service_app.add_event_handler("startup", startup_internal_nats)
 
+        # configure the spool used when the core stream is unreachable
+        startup_core_spool = partial(
+            create_core_spool,
+            core_config.app.messaging.spool_directory,
+            core_config.app.messaging.spool_segment_max_bytes,
+            core_config.app.messaging.spool_sync_interval,
+            core_config.app.messaging.spool_replay_interval,
+        )
+        core_service_app.add_event_handler("startup", startup_core_spool)
+
+        # configure the claim check store for oversized messages
+        startup_claim_check_store = partial(
+            create_claim_check_store,
+            core_config.app.messaging.claim_check,
+            core_config.app.messaging.claim_check_bucket,
+            core_config.app.messaging.claim_check_directory,
+            core_config.app.messaging.claim_check_ttl,
+        )
+        core_service_app.add_event_handler("startup", startup_claim_check_store)
+
+        # configure the core messaging publisher
+        startup_core_publisher = partial(
+            create_core_publisher,
+            core_config.app.messaging.max_in_flight,
+            core_config.app.messaging.batch_max_count,
+            core_config.app.messaging.batch_max_bytes,
+            core_config.app.messaging.batch_linger,
+        )
+        core_service_app.add_event_handler("startup", startup_core_publisher)
+
         # configure external/inbound NATS (Jetstream)
         startup_inbound_jetstream = partial(
             create_inbound_jetstream_clients, core_config.inbound_nats_connectors
@@ -105,8 +184,17 @@ def core_startup(args):
         )
         core_service_app.add_event_handler("startup", startup_kafka_consumers)
 
+        # configure Kafka producers for outbound data
+        startup_kafka_producers = partial(
+            create_kafka_producer_connector, core_config.outbound_kafka_connectors
+        )
+        core_service_app.add_event_handler("startup", startup_kafka_producers)
+
         core_service_app.add_event_handler("shutdown", cancel_current_tasks)
+        core_service_app.add_event_handler("shutdown", flush_core_publisher)
+        core_service_app.add_event_handler("shutdown", close_core_spool)
         core_service_app.add_event_handler("shutdown", close_connectors)
+        core_service_app.add_event_handler("shutdown", shutdown_validation_executor)
 
         uvicorn_params = {
             "app": core_service_app,
@@ -155,7 +243,9 @@ def configure_inbound_endpoints(
     logger.info(f"Adding Admin Rest Endpoints to {APP_BASE_URL}/{admin_router.prefix}")
 
     for c in inbound_rest_connectors:
-        r = create_inbound_connector_route(c.config.url, c.config.http_method)
+        r = create_inbound_connector_route(
+            c.config.url, c.config.http_method, ValidationMode(c.validation_mode)
+        )
         app.include_router(r, prefix=APP_BASE_URL)
         logger.info(
             f"Adding Inbound RestEndpoint Connector to {APP_BASE_URL}/{r.prefix}"
@@ -187,6 +277,13 @@ async def close_connectors():
         except ConsumerStoppedError as e:
             logger.error(f"Error stopping kafka consumer {e}")
 
+    for s in get_kafka_worker_supervisors():
+        await s.stop()
+
+    for p in get_kafka_producer_connectors():
+        logger.info(f"Stopping Kafka Producer Connector")
+        await p.stop()
+
     for n in get_jetstream_connections():
         logger.info(f"Closing NATS Jetstream Connection")
         await n.close()
@@ -6,6 +6,9 @@ Implements /admin endpoints used to manage core service tasks
 
 from fastapi.routing import APIRouter
 
+from ..connector import get_kafka_producer_metrics
+from ..detect import get_validation_cache
+
 router = APIRouter(prefix="/admin")
 
 
@@ -13,3 +16,23 @@ router = APIRouter(prefix="/admin")
 async def list_tasks():
     """Lists the tasks registered with the core service"""
     return {"status": "ok"}
+
+
+@router.get("/metrics/validation-cache")
+async def validation_cache_metrics():
+    """Returns the validation cache's hit, miss and eviction counters"""
+    cache = get_validation_cache()
+
+    if cache is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/metrics/kafka-producer")
+async def kafka_producer_metrics():
+    """Returns the throughput and delivery latency of each Kafka topic produced to by outbound connectors"""
+    return {
+        topic: metrics.stats()
+        for topic, metrics in get_kafka_producer_metrics().items()
+    }
@@ -10,8 +10,6 @@ import logging.config
 import sys
 from typing import List
 
-from linuxforhealth.healthos.core.app import core_startup
-
 CLI_DESCRIPTION = """
 The LinuxForHealth HealthOS Core CLI manages Core OS services including:
 - connectors
@@ -38,6 +36,18 @@ def main(received_arguments: List[str] = None):
         parser.print_help()
 
 
+def start_core(args):
+    """
+    Starts the HealthOS core service.
+    The core service application is imported on demand, so that other subcommands do not load it.
+
+    :param args: parsed CLI arguments
+    """
+    from linuxforhealth.healthos.core.app import core_startup
+
+    core_startup(args)
+
+
 def create_arg_parser():
     """
     Creates the CLI argument parser for the HealthOS core and admin programs.
@@ -56,7 +66,7 @@ def create_arg_parser():
         help="starts the LFH HealthOS Core Service using the core configuration file.",
     )
     core.add_argument("-f", help="The path to the core configuration file.")
-    core.set_defaults(func=core_startup)
+    core.set_defaults(func=start_core)
 
     # admin
     admin = sub_parsers.add_parser(
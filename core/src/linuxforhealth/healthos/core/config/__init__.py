@@ -23,8 +23,17 @@ def load_core_configuration(file_path: str):
     with open(file_path) as fp:
         core_data = yaml.safe_load(fp)
 
+    set_core_configuration(CoreServiceConfig(**core_data))
+
+
+def set_core_configuration(config: CoreServiceConfig):
+    """
+    Sets the core service configuration, such as within a worker process
+
+    :param config: The CoreServiceConfig model
+    """
     global core_service_config
-    core_service_config = CoreServiceConfig(**core_data)
+    core_service_config = config
 
 
 def get_core_configuration() -> CoreServiceConfig:
@@ -5,9 +5,13 @@ Defines the data model used to support the Core service's "app" configuration.
 The Core service app provides the event loop used for core service components such as connectors, as
 well as Admin API interfaces.
 """
-from typing import Literal, Optional
+import string
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
+
+# placeholders supported within the ingress subject template
+INGRESS_SUBJECT_PLACEHOLDERS = ("content_type", "shard")
 
 
 class CoreAppMessaging(BaseModel):
@@ -22,6 +26,218 @@ class CoreAppMessaging(BaseModel):
     stream_name: Literal["healthos"] = "healthos"
     ingress_subject: Literal["core.ingress"] = "core.ingress"
     error_subject: Literal["core.error"] = "core.error"
+    ingress_subject_template: Optional[str] = Field(
+        description="The template used to distribute data messages across ingress subjects, such as "
+        + "core.ingress.{content_type}.{shard}. Supported placeholders are {content_type}, which is one of "
+        + "x12, fhir, or hl7v2, and {shard}. Each placeholder is a complete subject token. Defaults to None, "
+        + "which publishes data messages to the ingress subject.",
+        default=None,
+    )
+    ingress_shards: int = Field(
+        description="The number of shards used for the {shard} placeholder. Defaults to 1.",
+        default=1,
+        ge=1,
+    )
+    ingress_routing_key: Literal["data_id", "batch_id", "upstream_key"] = Field(
+        description="The key used to assign data messages to a shard. Messages with the same key are published "
+        + "to the same subject. batch_id keeps HL7v2 batch members together. upstream_key uses the Kafka "
+        + "record key or partition, or the inbound NATS subject. Messages without the key use their data id. "
+        + "Defaults to data_id.",
+        default="data_id",
+    )
+    envelope_format: Literal["body", "headers"] = Field(
+        description="The envelope format used to publish data messages. The body format publishes a JSON "
+        + "document containing the data and its metadata. The headers format publishes the original data "
+        + "payload, with metadata conveyed in message headers. Defaults to body.",
+        default="body",
+    )
+    envelope_codec: Literal["json", "orjson", "msgpack", "cbor"] = Field(
+        description="The codec used to encode body envelopes. The json codec publishes the legacy double "
+        + "encoded JSON document. The orjson, msgpack, and cbor codecs change the wire format, conveying the "
+        + "codec's media type in a Content-Type header, and require their respective packages. Defaults to json.",
+        default="json",
+    )
+    max_in_flight: int = Field(
+        description="The maximum number of published data messages awaiting a Jetstream ack. Inbound "
+        + "connectors wait for a slot when the limit is reached. Defaults to 64.",
+        default=64,
+        ge=1,
+    )
+    batch_max_count: int = Field(
+        description="The maximum number of data messages published as a batch. "
+        + "Defaults to 0, which publishes each message as it is received.",
+        default=0,
+        ge=0,
+    )
+    batch_max_bytes: int = Field(
+        description="The maximum size, in bytes, of a batch's message payloads. Defaults to 1MiB.",
+        default=1_048_576,
+        ge=1,
+    )
+    batch_linger: float = Field(
+        description="The maximum time, in seconds, a data message waits for its batch to be published. "
+        + "Defaults to 0.005.",
+        default=0.005,
+        gt=0,
+    )
+    dedupe_key: Literal["none", "content_hash", "upstream_id"] = Field(
+        description="The key used to set the Nats-Msg-Id header, which the stream uses to discard duplicate "
+        + "data messages. content_hash uses a hash of the message payload. upstream_id uses the Kafka topic, "
+        + "partition and offset, the inbound NATS stream sequence, or the REST Idempotency-Key header. "
+        + "Defaults to none, which disables deduplication.",
+        default="none",
+    )
+    dedupe_window: float = Field(
+        description="The duration, in seconds, the stream tracks message ids for deduplication. "
+        + "Applied when the stream is created with a dedupe_key other than none. Defaults to 120.",
+        default=120.0,
+        gt=0,
+    )
+    compression: Literal["none", "gzip", "zstd"] = Field(
+        description="The algorithm used to compress large data messages. The zstd algorithm requires the "
+        + "zstandard package. Defaults to none, which disables compression.",
+        default="none",
+    )
+    compression_threshold: int = Field(
+        description="The minimum size, in bytes, of a compressed data message. Defaults to 64KiB.",
+        default=65_536,
+        ge=0,
+    )
+    claim_check: Literal["none", "object_store", "filesystem"] = Field(
+        description="The store used for data messages which exceed the claim check threshold. The message is "
+        + "stored, and a reference message is published in its place. The filesystem store is intended for "
+        + "development and testing. Defaults to none, which publishes all messages as received.",
+        default="none",
+    )
+    claim_check_threshold: int = Field(
+        description="The message size, in bytes, above which messages are stored in the claim check store. "
+        + "Set below the NATS server's max_payload, allowing for message headers. Defaults to 1,000,000.",
+        default=1_000_000,
+        ge=1,
+    )
+    claim_check_bucket: str = Field(
+        description="The Jetstream Object Store bucket used by the object_store claim check store.",
+        default="healthos-claim-check",
+    )
+    claim_check_directory: str = Field(
+        description="The directory used by the filesystem claim check store.",
+        default="claim-check",
+    )
+    claim_check_ttl: float = Field(
+        description="The time to live, in seconds, for message bodies stored in the claim check store. Set "
+        + "longer than consumers take to resolve reference messages, including redeliveries. Applied when the "
+        + "Object Store bucket is created. Defaults to 604,800 (7 days).",
+        default=604_800.0,
+        gt=0,
+    )
+    spool_directory: Optional[str] = Field(
+        description="The directory used to spool data messages when the core stream is unreachable. Spooled "
+        + "messages are replayed in order once the stream is reachable. Defaults to None, which disables "
+        + "spooling.",
+        default=None,
+    )
+    spool_segment_max_bytes: int = Field(
+        description="The size, in bytes, at which a spool segment file is closed. Defaults to 64MiB.",
+        default=67_108_864,
+        ge=1,
+    )
+    spool_sync_interval: float = Field(
+        description="The time, in seconds, spooled messages wait to share an fsync. Defaults to 0.01.",
+        default=0.01,
+        ge=0,
+    )
+    spool_replay_interval: float = Field(
+        description="The time, in seconds, between attempts to replay spooled messages. Defaults to 5.",
+        default=5.0,
+        gt=0,
+    )
+
+    @validator("ingress_subject_template")
+    def validate_ingress_subject_template(
+        cls, field_value: Optional[str], values: Dict
+    ) -> Optional[str]:
+        """
+        Validates that the ingress subject template is within the ingress subject, and that each placeholder
+        is a supported, complete subject token.
+
+        :param field_value: The ingress_subject_template field value
+        :param values: The previously validated values
+        :return: the ingress_subject_template field value
+        """
+        if field_value is None:
+            return field_value
+
+        ingress_subject = values.get("ingress_subject")
+        if not field_value.startswith(f"{ingress_subject}."):
+            raise ValueError(
+                f"ingress_subject_template must begin with {ingress_subject}."
+            )
+
+        for token in field_value.split("."):
+            placeholders = [
+                name for _, name, _, _ in string.Formatter().parse(token) if name
+            ]
+            if not placeholders:
+                continue
+            if len(placeholders) > 1 or token != f"{{{placeholders[0]}}}":
+                raise ValueError(f"{token} must contain a single placeholder")
+            if placeholders[0] not in INGRESS_SUBJECT_PLACEHOLDERS:
+                raise ValueError(f"{token} is not a supported placeholder")
+
+        return field_value
+
+    class Config:
+        extra = "forbid"
+        frozen = True
+
+
+class CoreAppValidation(BaseModel):
+    """
+    The configuration settings for the Core service application's data validation component.
+    """
+
+    max_workers: int = Field(
+        description="The number of worker processes used to validate data messages. "
+        + "Defaults to 0, which validates messages within the application's event loop.",
+        default=0,
+        ge=0,
+    )
+    max_pending: int = Field(
+        description="The maximum number of messages submitted to the validation workers at one time. "
+        + "Additional messages wait until a submission slot is available. Defaults to 64.",
+        default=64,
+        ge=1,
+    )
+    cache_max_entries: int = Field(
+        description="The maximum number of validation outcomes cached for repeated messages. "
+        + "Defaults to 0, which disables the validation cache.",
+        default=0,
+        ge=0,
+    )
+    cache_max_bytes: int = Field(
+        description="The maximum approximate size, in bytes, of the validation cache. Defaults to 16MiB.",
+        default=16_777_216,
+        ge=0,
+    )
+    cache_ttl: float = Field(
+        description="The time to live, in seconds, for a cached validation outcome. Defaults to 300.",
+        default=300.0,
+        gt=0,
+    )
+    prewarm_content_types: List[
+        Literal["application/EDI-X12", "application/fhir+json", "text/hl7v2"]
+    ] = Field(
+        description="The content types whose parsers and data models are loaded at startup, and when a "
+        + "validation worker starts. Other content types are loaded when first validated. Defaults to all "
+        + "supported content types.",
+        default=["application/EDI-X12", "application/fhir+json", "text/hl7v2"],
+    )
+    fhir_resource_types: List[str] = Field(
+        description="The FHIR resource types accepted for validation. Messages with other resource types "
+        + "fail validation without loading their data models. Defaults to an empty list, which accepts all "
+        + "resource types.",
+        default=[],
+    )
 
     class Config:
         extra = "forbid"
@@ -65,6 +281,10 @@ class CoreApp(BaseModel):
         + "system",
         default=CoreAppMessaging(),
     )
+    validation: CoreAppValidation = Field(
+        description="Configuration for the application's data validation component",
+        default=CoreAppValidation(),
+    )
 
     class Config:
         extra = "forbid"
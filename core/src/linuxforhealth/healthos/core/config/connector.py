@@ -31,6 +31,13 @@ class ConnectorConfig(BaseModel):
         description="The connector id used to locate the service for admin operations"
     )
     name: str = Field(description="The user defined connector name")
+    validation_mode: str = Field(
+        description="The validation applied to inbound data. 'sniff' detects the content type only, "
+        + "'structural' checks the message structure, and 'full' validates the message against its "
+        + "data model. Defaults to 'full'.",
+        regex="^(sniff|structural|full)$",
+        default="full",
+    )
     config: Annotated[
         Union[
             KafkaConsumerConfig,
@@ -48,6 +48,11 @@ class CoreServiceConfig(BaseModel):
         """Returns inbound kafka connectors or an empty list"""
         return self._find_connectors("inbound", "KafkaConsumer")
 
+    @property
+    def outbound_kafka_connectors(self) -> List[ConnectorConfig]:
+        """Returns outbound kafka connectors or an empty list"""
+        return self._find_connectors("outbound", "KafkaProducer")
+
     def _find_connectors(
         self, connector_type: str, config_type: str
     ) -> List[ConnectorConfig]:
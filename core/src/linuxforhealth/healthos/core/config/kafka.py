@@ -148,11 +148,84 @@ class KafkaConsumerConfig(BaseModel):
     sasl_plain_password: str = Field(
         default=None, description="password for sasl PLAIN authentication."
     )
+    batch_max_records: Optional[int] = Field(
+        default=None,
+        description="The maximum number of records fetched per getmany() batch. "
+        + "Partitions are processed concurrently, and records are processed in order within a partition. "
+        + "Defaults to None, which processes records one at a time.",
+        ge=1,
+    )
+    batch_timeout_ms: int = Field(
+        default=1000,
+        description="The maximum time, in milliseconds, getmany() waits for records.",
+        ge=0,
+    )
+    queue_high_water: Optional[int] = Field(
+        default=None,
+        description="The number of queued records, across partitions, at which the consumer's partitions are "
+        + "paused, if batch_max_records is set. Defaults to twice batch_max_records.",
+        ge=1,
+    )
+    queue_low_water: Optional[int] = Field(
+        default=None,
+        description="The number of queued records at which paused partitions are resumed. "
+        + "Defaults to half of queue_high_water.",
+        ge=0,
+    )
+    workers: int = Field(
+        default=0,
+        description="The number of worker processes which consume the topics, each with its own consumer in "
+        + "the consumer group. Worker processes are supervised, and restarted if they exit. Defaults to 0, "
+        + "which consumes the topics within the core service event loop.",
+        ge=0,
+    )
+    commit_max_records: int = Field(
+        default=500,
+        description="The number of published records which triggers an offset commit, if enable_auto_commit "
+        + "is False. Offsets are committed once a record's data messages are acknowledged by the core stream.",
+        ge=1,
+    )
+    commit_interval_ms: int = Field(
+        default=1000,
+        description="The maximum time, in milliseconds, between offset commits, if enable_auto_commit is False.",
+        ge=1,
+    )
 
     class Config:
         extra = "forbid"
         frozen = True
 
+    @validator("workers")
+    def validate_workers_group_id(cls, field_value: Any, values: Dict) -> Any:
+        """
+        Validates that a group_id is set if worker processes are used, so that partitions are divided among them
+        :param field_value: The workers field value
+        :param values: The previously validated values
+        :return: the workers field value
+        """
+        if field_value > 0 and values.get("group_id") is None:
+            raise ValueError("group_id must be set if workers are used")
+
+        return field_value
+
+    @validator("queue_low_water")
+    def validate_queue_low_water(cls, field_value: Any, values: Dict) -> Any:
+        """
+        Validates that the queue low water mark is less than the high water mark
+        :param field_value: The queue_low_water field value
+        :param values: The previously validated values
+        :return: the queue_low_water field value
+        """
+        high_water = values.get("queue_high_water")
+        if (
+            field_value is not None
+            and high_water is not None
+            and field_value >= high_water
+        ):
+            raise ValueError("queue_low_water must be less than queue_high_water")
+
+        return field_value
+
 
 class KafkaProducerConfig(BaseModel):
     """
@@ -163,6 +236,22 @@ class KafkaProducerConfig(BaseModel):
 
     type: Literal["KafkaProducer"] = "KafkaProducer"
 
+    topic: str = Field(
+        default="healthos",
+        description="The Kafka topic data messages are produced to.",
+    )
+    subjects: Optional[List[str]] = Field(
+        default=None,
+        description="The core stream subjects whose data messages are produced to the topic. "
+        + "Defaults to the core ingress subjects.",
+    )
+    max_ack_pending: int = Field(
+        default=1000,
+        description="The maximum number of data messages received from the core stream and not yet "
+        + "delivered to Kafka.",
+        ge=1,
+    )
+
     bootstrap_servers: str | List = Field(
         description="host[:port] or list of host[:port] the producer connects to."
     )
@@ -247,12 +336,12 @@ class KafkaProducerConfig(BaseModel):
         frozen = True
 
     @validator("enable_idempotence")
-    def validate_idempotence_acks(cls, field_value: Any, values: Dict) -> Dict:
+    def validate_idempotence_acks(cls, field_value: Any, values: Dict) -> Any:
         """
         Validates that acks and enable_idempotence have compatible settings
         :param field_value: The enable_idempotence field value
         :param values: The previously validated values
-        :return: the previously validated values
+        :return: the enable_idempotence field value
         """
         acks_value = values.get("acks")
         if field_value is True and acks_value != "all":
@@ -260,4 +349,4 @@ class KafkaProducerConfig(BaseModel):
                 "acks must be set to ALL if idempotent transactions are enabled"
             )
 
-        return values
+        return field_value
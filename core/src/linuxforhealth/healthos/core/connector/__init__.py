@@ -4,7 +4,22 @@ connector package
 The connector package contains the core service's inbound and outbound data connectors.
 Package level imports are provided for convenience.
 """
-from .kafka import create_kafka_consumer_connector, get_kafka_consumer_connectors
+from .claimcheck import (
+    create_claim_check_store,
+    get_claim_check_store,
+    resolve_claim_check,
+)
+from .codecs import EnvelopeCodec, get_envelope_codec
+from .compression import compress_payload, decompress_payload, validate_compression
+from .envelope import EnvelopeFormat, decode_envelope, encode_envelope
+from .kafka import (
+    create_kafka_consumer_connector,
+    create_kafka_producer_connector,
+    get_kafka_consumer_connectors,
+    get_kafka_producer_connectors,
+    get_kafka_producer_metrics,
+    get_kafka_worker_supervisors,
+)
 from .nats import (
     create_inbound_jetstream_clients,
     create_jetstream_core_client,
@@ -13,4 +28,7 @@ from .nats import (
     get_jetstream_core_client,
 )
 from .processor import PublishDataModel
+from .publisher import create_core_publisher, flush_core_publisher, get_core_publisher
 from .rest import create_inbound_connector_route
+from .routing import ingress_stream_subject, ingress_subject
+from .spool import close_core_spool, create_core_spool, get_core_spool
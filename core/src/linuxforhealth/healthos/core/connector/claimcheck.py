@@ -0,0 +1,277 @@
+"""
+claimcheck.py
+
+Offloads data messages which are too large to publish to HealthOS Core Messaging.
+The message body is stored in a claim check store, and a reference message is published in its place. The
+reference message has an empty body and a HealthOS-Claim-Check header containing the stored object's name, along
+with the original message headers.
+
+Supported claim check stores include:
+- object_store: a NATS Jetstream Object Store bucket
+- filesystem: a local directory, intended for development and testing
+
+Consumers use resolve_claim_check to retrieve the original message body prior to decoding the envelope.
+Stored message bodies expire once their time to live elapses, so the TTL must exceed the time consumers take to
+resolve reference messages, including redeliveries.
+"""
+import asyncio
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from nats.js import JetStreamContext
+from nats.js.api import ObjectStoreConfig
+from nats.js.errors import BucketNotFoundError
+from nats.js.object_store import ObjectStore
+
+logger = logging.getLogger(__name__)
+
+# header name used to convey the claim check object name
+CLAIM_CHECK_HEADER = "HealthOS-Claim-Check"
+
+
+# the default time to live, in seconds, for stored message bodies
+DEFAULT_CLAIM_CHECK_TTL = 604_800.0
+
+# the minimum time, in seconds, between scans of a filesystem store for expired message bodies
+FILESYSTEM_EXPIRY_INTERVAL = 60.0
+
+
+class ClaimCheckStore(ABC):
+    """
+    Base class for claim check stores.
+    Stores save and load message bodies by name.
+    """
+
+    @abstractmethod
+    async def put(self, name: str, body: bytes):
+        """
+        Stores a message body.
+
+        :param name: The object name
+        :param body: The message body
+        """
+
+    @abstractmethod
+    async def get(self, name: str) -> bytes:
+        """
+        Loads a message body.
+
+        :param name: The object name
+        :return: the message body
+        """
+
+
+class ObjectStoreClaimCheckStore(ClaimCheckStore):
+    """
+    Stores message bodies in a NATS Jetstream Object Store bucket.
+    Message bodies are expired by the bucket's TTL, which is configured when the bucket is created.
+    """
+
+    def __init__(self, object_store: ObjectStore):
+        """
+        Configures the ObjectStoreClaimCheckStore instance.
+
+        :param object_store: The Jetstream Object Store bucket
+        """
+        self.object_store = object_store
+
+    async def put(self, name: str, body: bytes):
+        """
+        Stores a message body as an object within the bucket.
+
+        :param name: The object name
+        :param body: The message body
+        """
+        await self.object_store.put(name, body)
+
+    async def get(self, name: str) -> bytes:
+        """
+        Loads a message body from the bucket.
+
+        :param name: The object name
+        :return: the message body
+        """
+        object_result = await self.object_store.get(name)
+        return object_result.data
+
+
+class FileSystemClaimCheckStore(ClaimCheckStore):
+    """
+    Stores message bodies as files within a local directory.
+    Files older than the TTL are deleted as message bodies are stored, at most once per expiry interval.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = DEFAULT_CLAIM_CHECK_TTL,
+        expiry_interval: float = FILESYSTEM_EXPIRY_INTERVAL,
+    ):
+        """
+        Configures the FileSystemClaimCheckStore instance, creating the directory if it does not exist.
+
+        :param directory: The directory path
+        :param ttl: The time to live, in seconds, for stored message bodies
+        :param expiry_interval: The minimum time, in seconds, between scans for expired message bodies
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.expiry_interval = expiry_interval
+        self._expired_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        """Returns the file path for an object name"""
+        return os.path.join(self.directory, os.path.basename(name))
+
+    def _write(self, name: str, body: bytes):
+        """Writes a message body to a temporary file, which is renamed once the write completes"""
+        temp_path = f"{self._path(name)}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(body)
+        os.replace(temp_path, self._path(name))
+
+    def _read(self, name: str) -> bytes:
+        """Reads a message body"""
+        with open(self._path(name), "rb") as f:
+            return f.read()
+
+    def delete_expired(self) -> int:
+        """
+        Deletes the message bodies which were stored before the TTL.
+
+        :return: the number of deleted message bodies
+        """
+        expires_before = time.time() - self.ttl
+        deleted = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < expires_before:
+                        os.remove(entry.path)
+                        deleted += 1
+                except FileNotFoundError:
+                    continue
+        return deleted
+
+    async def put(self, name: str, body: bytes):
+        """
+        Stores a message body as a file, and deletes expired message bodies if the expiry interval has elapsed.
+
+        :param name: The object name
+        :param body: The message body
+        """
+        await asyncio.to_thread(self._write, name, body)
+
+        if time.monotonic() - self._expired_at >= self.expiry_interval:
+            self._expired_at = time.monotonic()
+            deleted = await asyncio.to_thread(self.delete_expired)
+            if deleted:
+                logger.debug(f"deleted {deleted} expired claim checks")
+
+    async def get(self, name: str) -> bytes:
+        """
+        Loads a message body from its file.
+
+        :param name: The object name
+        :return: the message body
+        """
+        return await asyncio.to_thread(self._read, name)
+
+
+# claim check store used for core messaging
+claim_check_store: ClaimCheckStore | None = None
+
+
+async def create_claim_check_store(
+    store_type: str,
+    bucket: str,
+    directory: str,
+    ttl: float = DEFAULT_CLAIM_CHECK_TTL,
+):
+    """
+    Creates the claim check store used for core messaging.
+    The Jetstream Object Store bucket is created with the TTL if it does not exist.
+
+    :param store_type: The claim check store type: "none", "object_store", or "filesystem"
+    :param bucket: The Jetstream Object Store bucket name, used by the object_store type
+    :param directory: The directory path, used by the filesystem type
+    :param ttl: The time to live, in seconds, for stored message bodies
+    """
+    global claim_check_store
+
+    match store_type:
+        case "object_store":
+            # workaround for circular import
+            from .nats import get_jetstream_core_client
+
+            core_client: JetStreamContext = get_jetstream_core_client()
+            try:
+                object_store = await core_client.object_store(bucket)
+            except BucketNotFoundError:
+                logger.info(f"Creating claim check Object Store bucket {bucket}")
+                # the bucket name is passed separately, as it replaces the config's bucket
+                object_store = await core_client.create_object_store(
+                    bucket=bucket, config=ObjectStoreConfig(ttl=ttl)
+                )
+            claim_check_store = ObjectStoreClaimCheckStore(object_store)
+        case "filesystem":
+            claim_check_store = FileSystemClaimCheckStore(directory, ttl)
+        case _:
+            claim_check_store = None
+            return
+
+    logger.info(f"Created {store_type} claim check store")
+
+
+def get_claim_check_store() -> ClaimCheckStore | None:
+    """Returns the claim check store used for core messaging, or None if claim checks are disabled"""
+    global claim_check_store
+    return claim_check_store
+
+
+async def check_in(
+    name: str, body: bytes, headers: Dict[str, str], store: ClaimCheckStore
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Stores a message body and returns the reference message published in its place.
+
+    :param name: The object name, unique to the message
+    :param body: The message body
+    :param headers: The message headers
+    :param store: The claim check store
+    :return: tuple containing the reference message body and headers
+    """
+    await store.put(name, body)
+    logger.debug(f"stored {len(body)} byte message body as claim check {name}")
+    return b"", {**headers, CLAIM_CHECK_HEADER: name}
+
+
+async def resolve_claim_check(
+    body: bytes,
+    headers: Optional[Dict[str, str]] = None,
+    store: Optional[ClaimCheckStore] = None,
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Resolves a reference message to the original message body and headers.
+    Messages without a HealthOS-Claim-Check header are returned as received.
+
+    :param body: The message body
+    :param headers: The message headers, if any
+    :param store: The claim check store. Defaults to the claim check store used for core messaging.
+    :return: tuple containing the original message body and headers
+    :raises: ValueError if the message is a reference message and a claim check store is not available
+    """
+    headers = dict(headers or {})
+    name = headers.pop(CLAIM_CHECK_HEADER, None)
+    if name is None:
+        return body, headers
+
+    store = store or get_claim_check_store()
+    if store is None:
+        raise ValueError(f"Unable to resolve claim check {name}, no store available")
+
+    return await store.get(name), headers
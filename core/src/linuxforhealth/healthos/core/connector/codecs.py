@@ -0,0 +1,189 @@
+"""
+codecs.py
+
+Serialization codecs for the "body" envelope format, which publishes a data message and its metadata as a
+single document.
+
+Supported codecs include:
+- json: JSON using the standard library, used to decode JSON envelopes when orjson is not installed
+- orjson: JSON using the orjson library
+- msgpack: MessagePack using the msgpack library
+- cbor: CBOR using the cbor2 library
+
+The json codec is the default, and publishes the legacy double encoded JSON envelope (see envelope.py). The
+orjson, msgpack, and cbor codecs require optional packages, installed with the "codecs" extra.
+"""
+import json
+import uuid
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class EnvelopeCodec(ABC):
+    """
+    Base class for envelope codecs.
+    Codecs convert an envelope dictionary to and from bytes.
+    """
+
+    # the codec name used in the core service configuration
+    name: str = ""
+    # the media type conveyed in the envelope's Content-Type header
+    media_type: str = ""
+
+    @abstractmethod
+    def encode(self, envelope: Dict[str, Any]) -> bytes:
+        """
+        Encodes an envelope.
+
+        :param envelope: The envelope dictionary
+        :return: the encoded envelope
+        """
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        """
+        Decodes an envelope.
+
+        :param data: The encoded envelope
+        :return: the envelope dictionary
+        """
+
+
+def _to_primitive(value: Any) -> Any:
+    """Converts UUIDs and enums to strings, for serialization libraries which do not support them"""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class JsonCodec(EnvelopeCodec):
+    """Encodes envelopes as JSON using the standard library"""
+
+    name = "json"
+    media_type = "application/json"
+
+    def encode(self, envelope: Dict[str, Any]) -> bytes:
+        return json.dumps(envelope, default=_to_primitive).encode()
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+class OrjsonCodec(EnvelopeCodec):
+    """Encodes envelopes as JSON using the orjson library"""
+
+    name = "orjson"
+    media_type = "application/json"
+
+    def encode(self, envelope: Dict[str, Any]) -> bytes:
+        return orjson.dumps(envelope)
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(EnvelopeCodec):
+    """Encodes envelopes as MessagePack using the msgpack library"""
+
+    name = "msgpack"
+    media_type = "application/msgpack"
+
+    def encode(self, envelope: Dict[str, Any]) -> bytes:
+        return msgpack.packb(envelope, default=_to_primitive)
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(data)
+
+
+class CborCodec(EnvelopeCodec):
+    """Encodes envelopes as CBOR using the cbor2 library"""
+
+    name = "cbor"
+    media_type = "application/cbor"
+
+    def encode(self, envelope: Dict[str, Any]) -> bytes:
+        return cbor2.dumps({k: _to_primitive(v) for k, v in envelope.items()})
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return cbor2.loads(data)
+
+
+# codec classes and their required packages
+ENVELOPE_CODECS = {
+    "json": (JsonCodec, json),
+    "orjson": (OrjsonCodec, orjson),
+    "msgpack": (MsgpackCodec, msgpack),
+    "cbor": (CborCodec, cbor2),
+}
+
+# package names used in error messages
+CODEC_PACKAGES = {"orjson": "orjson", "msgpack": "msgpack", "cbor": "cbor2"}
+
+# codec instances, indexed by name
+codec_instances: Dict[str, EnvelopeCodec] = {}
+
+
+def get_envelope_codec(name: str) -> EnvelopeCodec:
+    """
+    Returns an envelope codec.
+
+    :param name: The codec name
+    :return: EnvelopeCodec
+    :raises: ValueError if the codec is not supported
+    :raises: ImportError if the codec's package is not installed
+    """
+    codec = codec_instances.get(name)
+    if codec is not None:
+        return codec
+
+    if name not in ENVELOPE_CODECS:
+        raise ValueError(f"Unsupported envelope codec {name}")
+
+    codec_class, package = ENVELOPE_CODECS[name]
+    if package is None:
+        raise ImportError(
+            f"The {name} envelope codec requires the {CODEC_PACKAGES[name]} package"
+        )
+
+    codec = codec_class()
+    codec_instances[name] = codec
+    return codec
+
+
+def get_envelope_codec_for_media_type(media_type: str) -> EnvelopeCodec:
+    """
+    Returns an envelope codec which decodes a media type.
+    JSON envelopes are decoded with orjson, if it is installed.
+
+    :param media_type: The media type conveyed in the envelope's Content-Type header
+    :return: EnvelopeCodec
+    :raises: ValueError if the media type is not supported
+    :raises: ImportError if the codec's package is not installed
+    """
+    match media_type:
+        case "application/json":
+            return get_envelope_codec("orjson" if orjson is not None else "json")
+        case "application/msgpack":
+            return get_envelope_codec("msgpack")
+        case "application/cbor":
+            return get_envelope_codec("cbor")
+        case _:
+            raise ValueError(f"Unsupported envelope media type {media_type}")
@@ -0,0 +1,103 @@
+"""
+compression.py
+
+Compresses published message bodies which exceed a size threshold.
+Compressed bodies convey the compression algorithm in a Content-Encoding header, and are decompressed with
+decompress_payload prior to decoding the envelope.
+
+Supported compression algorithms include:
+- gzip: gzip using the standard library
+- zstd: Zstandard using the zstandard library
+
+The zstd algorithm requires the optional zstandard package, installed with the "zstd" extra.
+"""
+import gzip
+from typing import Dict, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# header name used to convey the compression algorithm
+CONTENT_ENCODING_HEADER = "Content-Encoding"
+
+# compression levels favor throughput over compression ratio
+GZIP_COMPRESS_LEVEL = 6
+ZSTD_COMPRESS_LEVEL = 3
+
+COMPRESSION_ALGORITHMS = ("gzip", "zstd")
+
+
+def validate_compression(algorithm: str):
+    """
+    Validates that a compression algorithm is supported, and that its package is installed.
+
+    :param algorithm: The compression algorithm, or "none"
+    :raises: ValueError if the algorithm is not supported
+    :raises: ImportError if the algorithm's package is not installed
+    """
+    if algorithm != "none" and algorithm not in COMPRESSION_ALGORITHMS:
+        raise ValueError(f"Unsupported compression algorithm {algorithm}")
+    if algorithm == "zstd" and zstandard is None:
+        raise ImportError(
+            "The zstd compression algorithm requires the zstandard package"
+        )
+
+
+def compress_payload(
+    payload: bytes, headers: Dict[str, str], algorithm: str, threshold: int
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Compresses a message body if its size is at least the threshold, and compression reduces its size.
+
+    :param payload: The message body
+    :param headers: The message headers. The Content-Encoding header is added if the body is compressed.
+    :param algorithm: The compression algorithm, or "none"
+    :param threshold: The minimum size, in bytes, of a compressed message body
+    :return: tuple containing the message body and the message headers
+    :raises: ValueError if the algorithm is not supported
+    :raises: ImportError if the algorithm's package is not installed
+    """
+    if algorithm == "none" or len(payload) < threshold:
+        return payload, headers
+
+    validate_compression(algorithm)
+    match algorithm:
+        case "gzip":
+            compressed_payload = gzip.compress(
+                payload, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0
+            )
+        case "zstd":
+            compressed_payload = zstandard.ZstdCompressor(
+                level=ZSTD_COMPRESS_LEVEL
+            ).compress(payload)
+
+    if len(compressed_payload) >= len(payload):
+        return payload, headers
+
+    headers[CONTENT_ENCODING_HEADER] = algorithm
+    return compressed_payload, headers
+
+
+def decompress_payload(body: bytes, headers: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Decompresses a message body based on its Content-Encoding header.
+    Message bodies without the header are returned as received.
+
+    :param body: The message body
+    :param headers: The message headers, if any
+    :return: the decompressed message body
+    :raises: ValueError if the algorithm is not supported
+    :raises: ImportError if the algorithm's package is not installed
+    """
+    algorithm: str = (headers or {}).get(CONTENT_ENCODING_HEADER, "none")
+    if algorithm == "none":
+        return body
+
+    validate_compression(algorithm)
+    match algorithm:
+        case "gzip":
+            return gzip.decompress(body)
+        case "zstd":
+            return zstandard.ZstdDecompressor().decompress(body)
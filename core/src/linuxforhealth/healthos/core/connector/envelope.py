@@ -0,0 +1,136 @@
+"""
+envelope.py
+
+Encodes and decodes the envelope used to publish data messages to HealthOS Core Messaging.
+
+Supported envelope formats include:
+- body: the PublishDataModel is published as a document within the message body, encoded with an envelope codec
+- headers: the original payload is published as the message body, with metadata conveyed in headers
+
+The default json codec publishes body envelopes as double encoded JSON documents, without a Content-Type
+header, so that existing core stream consumers are unaffected. The orjson, msgpack and cbor codecs are opt-in,
+and convey the codec's media type in a Content-Type header. Consumers must decode envelopes with
+decode_envelope, or support the Content-Type header, before these codecs are configured.
+
+Envelopes of either format may be compressed, as indicated by a Content-Encoding header.
+"""
+import json
+import re
+import uuid
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+from .codecs import (
+    EnvelopeCodec,
+    JsonCodec,
+    get_envelope_codec,
+    get_envelope_codec_for_media_type,
+)
+from .compression import decompress_payload
+from .processor import PublishDataModel
+
+# header names used for the "headers" envelope format
+DATA_ID_HEADER = "HealthOS-Data-Id"
+CONTENT_TYPE_HEADER = "HealthOS-Content-Type"
+ERROR_HEADER = "HealthOS-Error"
+BATCH_ID_HEADER = "HealthOS-Batch-Id"
+
+# header name used for the "body" envelope format
+ENVELOPE_CONTENT_TYPE_HEADER = "Content-Type"
+
+# header values are single line, and errors are truncated to this length
+MAX_ERROR_HEADER_LENGTH = 4096
+LINE_BREAK_PATTERN = re.compile(r"\s*[\r\n]+\s*")
+
+
+class EnvelopeFormat(str, Enum):
+    """
+    Supported envelope formats for published data messages
+    """
+
+    BODY = "body"
+    HEADERS = "headers"
+
+
+def _header_value(value: str) -> str:
+    """
+    Returns a value which may be conveyed within a message header.
+    Line breaks are replaced with a separator, and long values are truncated.
+
+    :param value: The header value
+    :return: the single line header value
+    """
+    value = LINE_BREAK_PATTERN.sub(" | ", value.strip())
+    return value[:MAX_ERROR_HEADER_LENGTH]
+
+
+def encode_envelope(
+    publish_model: PublishDataModel,
+    envelope_format: EnvelopeFormat = EnvelopeFormat.BODY,
+    payload: Optional[str | bytes] = None,
+    codec: Optional[EnvelopeCodec] = None,
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Encodes a data message for publishing.
+
+    :param publish_model: The data message
+    :param envelope_format: The envelope format. Defaults to the "body" format.
+    :param payload: The original data payload, published as received with the "headers" envelope format.
+        Defaults to the publish model's data.
+    :param codec: The codec used for the "body" envelope format. Defaults to the json codec, which publishes
+        the legacy double encoded JSON document.
+    :return: tuple containing the message body and the message headers
+    """
+    if envelope_format == EnvelopeFormat.BODY:
+        if codec is None or isinstance(codec, JsonCodec):
+            # the legacy encoding, a JSON string containing the JSON document
+            return json.dumps(publish_model.json()).encode(), {}
+
+        headers = {ENVELOPE_CONTENT_TYPE_HEADER: codec.media_type}
+        return codec.encode(publish_model.dict()), headers
+
+    if payload is None:
+        payload = publish_model.data
+    if isinstance(payload, str):
+        payload = payload.encode()
+
+    headers = {DATA_ID_HEADER: str(publish_model.data_id)}
+    if publish_model.content_type is not None:
+        headers[CONTENT_TYPE_HEADER] = publish_model.content_type.value
+    if publish_model.error is not None:
+        headers[ERROR_HEADER] = _header_value(publish_model.error)
+    if publish_model.batch_id is not None:
+        headers[BATCH_ID_HEADER] = str(publish_model.batch_id)
+
+    return payload, headers
+
+
+def decode_envelope(
+    body: bytes, headers: Optional[Dict[str, str]] = None
+) -> PublishDataModel:
+    """
+    Decodes a published data message.
+    The envelope format, codec, and compression are determined from the message headers.
+
+    :param body: The message body
+    :param headers: The message headers, if any
+    :return: PublishDataModel
+    :raises: ValueError if the envelope's media type or compression is not supported
+    """
+    headers = headers or {}
+    body = decompress_payload(body, headers)
+
+    if ENVELOPE_CONTENT_TYPE_HEADER in headers:
+        codec = get_envelope_codec_for_media_type(headers[ENVELOPE_CONTENT_TYPE_HEADER])
+        return PublishDataModel.parse_obj(codec.decode(body))
+
+    if DATA_ID_HEADER not in headers:
+        return PublishDataModel.parse_raw(json.loads(body))
+
+    return PublishDataModel(
+        data_id=uuid.UUID(headers[DATA_ID_HEADER]),
+        data=body.decode(),
+        content_type=headers.get(CONTENT_TYPE_HEADER),
+        error=headers.get(ERROR_HEADER),
+        batch_id=headers.get(BATCH_ID_HEADER),
+    )
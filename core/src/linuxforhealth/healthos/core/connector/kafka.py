@@ -5,48 +5,503 @@ Implements Kafka connectors for consuming and publishing data.
 """
 import asyncio
 import logging
-from typing import List
+import statistics
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Set, Tuple
 
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, ConsumerRecord, TopicPartition
+from aiokafka.abc import ConsumerRebalanceListener
+from nats.aio.msg import Msg
+from nats.js.api import ConsumerConfig
 
-from ..config import ConnectorConfig
-from .processor import PublishDataModel, process_data
+from ..config import ConnectorConfig, get_core_configuration
+from ..detect import ValidationMode
+from .claimcheck import resolve_claim_check
+from .envelope import EnvelopeFormat, decode_envelope, encode_envelope
+from .processor import DataSubmission, submit_batch
+from .routing import ingress_stream_subject
+
+if TYPE_CHECKING:
+    from .kafka_workers import KafkaWorkerSupervisor
 
 kafka_consumer_connectors: List[AIOKafkaConsumer] | None = None
 
+# supervisors of the worker processes used by connectors configured with workers
+kafka_worker_supervisors: List["KafkaWorkerSupervisor"] | None = None
+
+# KafkaConsumerConfig fields which are not AIOKafkaConsumer parameters
+CONNECTOR_CONFIG_FIELDS = {
+    "type",
+    "subjects",
+    "topics",
+    "batch_max_records",
+    "batch_timeout_ms",
+    "commit_max_records",
+    "commit_interval_ms",
+    "queue_high_water",
+    "queue_low_water",
+    "workers",
+}
+
+# KafkaProducerConfig fields which are not AIOKafkaProducer parameters
+PRODUCER_CONFIG_FIELDS = {"type", "topic", "subjects", "max_ack_pending"}
+
+kafka_producer_connectors: List["KafkaProducerConnector"] | None = None
+
 logger = logging.getLogger(__name__)
 
 
-async def consume_message(kafka_consumer: AIOKafkaConsumer):
+async def submit_record(
+    msg: ConsumerRecord, validation_mode: ValidationMode = ValidationMode.FULL
+) -> List[DataSubmission]:
+    """
+    Submits a Kafka record for processing, without waiting for Jetstream acks.
+
+    :param msg: The Kafka record
+    :param validation_mode: the validation mode configured for the connector
+    :return: The PublishDataModel and ack future for each published data message
+    """
+    submissions: List[DataSubmission] = await submit_batch(
+        msg.value,
+        validation_mode,
+        upstream_id=f"{msg.topic}:{msg.partition}:{msg.offset}",
+        upstream_key=(
+            msg.key.hex() if msg.key is not None else f"{msg.topic}:{msg.partition}"
+        ),
+    )
+
+    for publish_model, _ in submissions:
+        logger.debug(
+            f"submitted data to NATS data_id = {publish_model.data_id} "
+            + f"content_type = {publish_model.content_type}"
+        )
+    return submissions
+
+
+class OffsetCommitter(ConsumerRebalanceListener):
+    """
+    Commits consumer offsets once records are published, for connectors which disable auto commit.
+
+    A record's offset is committed once each of its data messages is acknowledged by the core stream, and each
+    prior record in its partition is committed. Commits are coalesced across partitions, and are made once
+    max_records records are acknowledged or interval_ms elapses.
+
+    If a record is not acknowledged, the partition is rewound to the record's offset so that it is consumed
+    again. Records are delivered at least once.
+
+    The committer is the consumer's rebalance listener. State for revoked partitions is dropped, so that
+    commits include only assigned partitions, and records from revoked partitions are not tracked until the
+    partition is assigned again.
+    """
+
+    def __init__(
+        self,
+        kafka_consumer: AIOKafkaConsumer,
+        max_records: int = 500,
+        interval_ms: int = 1000,
+    ):
+        """
+        Configures the OffsetCommitter instance.
+
+        :param kafka_consumer: the aiokafka consumer
+        :param max_records: The number of acknowledged records which triggers a commit
+        :param interval_ms: The maximum time, in milliseconds, between commits
+        """
+        self.kafka_consumer = kafka_consumer
+        self.max_records = max_records
+        self.interval_ms = interval_ms
+
+        self._pending: Dict[TopicPartition, Deque[Tuple[int, asyncio.Future]]] = {}
+        # partitions rewound after a failure, and the offset from which records are tracked again
+        self._rewound: Dict[TopicPartition, int] = {}
+        # partitions revoked by a rebalance, whose records are no longer tracked
+        self._revoked: Set[TopicPartition] = set()
+        self._acked_records = 0
+        self._commit_requested = asyncio.Event()
+
+    def track(self, msg: ConsumerRecord, acks: List["asyncio.Future"]):
+        """
+        Tracks a record's acks. Records without acks, such as invalid records, are committed in turn.
+
+        :param msg: The Kafka record
+        :param acks: The ack futures for the record's data messages
+        """
+        partition = TopicPartition(msg.topic, msg.partition)
+        if partition in self._revoked:
+            # records queued prior to a rebalance are consumed again by the partition's new owner
+            return
+
+        rewound_offset = self._rewound.get(partition)
+        if rewound_offset is not None:
+            if msg.offset != rewound_offset:
+                # records fetched prior to the rewind are consumed again
+                return
+            del self._rewound[partition]
+
+        record_ack = asyncio.gather(*acks)
+        record_ack.add_done_callback(self._record_done)
+        self._pending.setdefault(partition, deque()).append((msg.offset, record_ack))
+
+    def track_failure(self, msg: ConsumerRecord, ex: Exception):
+        """
+        Tracks a record which could not be processed.
+
+        :param msg: The Kafka record
+        :param ex: The exception raised when processing the record
+        """
+        failed_ack = asyncio.get_running_loop().create_future()
+        failed_ack.set_exception(ex)
+        self.track(msg, [failed_ack])
+
+    async def on_partitions_revoked(self, revoked: Set[TopicPartition]):
+        """
+        Drops the pending and rewound state for partitions revoked by a rebalance.
+        Records which are not yet committed are consumed again by the partition's new owner.
+
+        :param revoked: The revoked partitions
+        """
+        for partition in revoked:
+            self._pending.pop(partition, None)
+            self._rewound.pop(partition, None)
+        self._revoked.update(revoked)
+        logger.info(f"Kafka partitions revoked {sorted(revoked)}")
+
+    async def on_partitions_assigned(self, assigned: Set[TopicPartition]):
+        """
+        Tracks records for partitions assigned by a rebalance.
+
+        :param assigned: The assigned partitions
+        """
+        self._revoked.difference_update(assigned)
+
+    def _record_done(self, record_ack: asyncio.Future):
+        """Requests a commit when max_records records are acknowledged"""
+        self._acked_records += 1
+        if self._acked_records >= self.max_records:
+            self._commit_requested.set()
+
+    def _committable_offsets(self) -> Dict[TopicPartition, int]:
+        """
+        Returns the offsets to commit for each partition, rewinding partitions with failed records.
+
+        :return: dictionary of partitions and offsets
+        """
+        offsets = {}
+        for partition, pending in self._pending.items():
+            while pending and pending[0][1].done():
+                offset, record_ack = pending.popleft()
+                if record_ack.cancelled() or record_ack.exception() is not None:
+                    logger.error(
+                        f"Unable to publish record {partition.topic}:{partition.partition}:{offset}, "
+                        + "rewinding partition"
+                    )
+                    pending.clear()
+                    self._rewound[partition] = offset
+                    self.kafka_consumer.seek(partition, offset)
+                    break
+                offsets[partition] = offset + 1
+        return offsets
+
+    async def commit(self):
+        """Commits the offsets of acknowledged records"""
+        self._commit_requested.clear()
+        self._acked_records = 0
+
+        offsets = self._committable_offsets()
+        if not offsets:
+            return
+
+        try:
+            await self.kafka_consumer.commit(offsets)
+            logger.debug(f"committed Kafka offsets {offsets}")
+        except Exception as ex:
+            logger.warning(f"Unable to commit Kafka offsets {ex!r}")
+
+    async def run(self):
+        """Commits offsets until cancelled, making a final commit when cancelled"""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(
+                        self._commit_requested.wait(), self.interval_ms / 1000
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                await self.commit()
+        finally:
+            await self.commit()
+
+
+async def process_record(
+    msg: ConsumerRecord,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    committer: Optional[OffsetCommitter] = None,
+):
+    """
+    Submits a Kafka record for processing, without waiting for Jetstream acks.
+    Invalid records are logged and skipped.
+
+    :param msg: The Kafka record
+    :param validation_mode: the validation mode configured for the connector
+    :param committer: The committer which tracks the record's acks, if offsets are committed manually
+    """
+    try:
+        # acks are not awaited, so that publishing overlaps consuming
+        submissions = await submit_record(msg, validation_mode)
+    except ValueError as ve:
+        logger.warning(f"Invalid message. Exception {ve}")
+        submissions = []
+
+    if committer is not None:
+        committer.track(msg, [ack for _, ack in submissions])
+
+
+async def consume_message(
+    kafka_consumer: AIOKafkaConsumer,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    committer: Optional[OffsetCommitter] = None,
+):
     """
     Consumes messages from a Kafka Consumer
 
     :param kafka_consumer: the aiokafka consumer
+    :param validation_mode: the validation mode configured for the connector
+    :param committer: The committer used if offsets are committed manually
     """
     async for msg in kafka_consumer:
-        try:
-            data_message = msg.value.decode("utf-8")
-            publish_model: PublishDataModel = await process_data(data_message)
+        await process_record(msg, validation_mode, committer)
+
+
+class KafkaBatchConsumer:
+    """
+    Consumes records from a Kafka Consumer in batches, using getmany().
+    Each partition's records are processed in order by a dedicated task, so that a slow message delays only
+    its own partition.
+
+    Queued records are bounded across the connector's partitions. The consumer's assigned partitions are
+    paused once high_water records are queued, and resumed once the queued records drain to low_water, so
+    that fetching does not outpace validation and publishing. A rebalance assigns partitions unpaused, so
+    partitions assigned while paused are paused before the next fetch.
+    """
 
-            logger.debug(
-                f"published data to NATS data_id = {publish_model.data_id} "
-                + f"content_type = {publish_model.content_type}"
+    def __init__(
+        self,
+        kafka_consumer: AIOKafkaConsumer,
+        validation_mode: ValidationMode = ValidationMode.FULL,
+        max_records: int = 500,
+        timeout_ms: int = 1000,
+        name: str = "healthos_kafka_consumer",
+        committer: Optional[OffsetCommitter] = None,
+        high_water: Optional[int] = None,
+        low_water: Optional[int] = None,
+    ):
+        """
+        Configures the KafkaBatchConsumer instance.
+
+        :param kafka_consumer: the aiokafka consumer
+        :param validation_mode: the validation mode configured for the connector
+        :param max_records: The maximum number of records fetched per batch
+        :param timeout_ms: The maximum time, in milliseconds, to wait for records
+        :param name: The name prefix used for partition tasks
+        :param committer: The committer used if offsets are committed manually
+        :param high_water: The number of queued records at which partitions are paused. Defaults to
+        2 * max_records.
+        :param low_water: The number of queued records at which paused partitions are resumed. Defaults to
+        half of high_water.
+        """
+        self.kafka_consumer = kafka_consumer
+        self.validation_mode = validation_mode
+        self.max_records = max_records
+        self.timeout_ms = timeout_ms
+        self.name = name
+        self.committer = committer
+        self.high_water = high_water or 2 * max_records
+        self.low_water = low_water if low_water is not None else self.high_water // 2
+
+        self.queued = 0
+        self.paused = False
+        self._partition_queues: Dict[TopicPartition, asyncio.Queue] = {}
+        self._partition_tasks: Dict[TopicPartition, asyncio.Task] = {}
+
+    def _partition_queue(self, partition: TopicPartition) -> asyncio.Queue:
+        """
+        Returns the queue for a partition, starting the partition's task if required.
+
+        :param partition: The topic partition
+        :return: the partition queue
+        """
+        partition_queue = self._partition_queues.get(partition)
+        if partition_queue is None:
+            partition_queue = asyncio.Queue()
+            self._partition_queues[partition] = partition_queue
+            self._partition_tasks[partition] = asyncio.create_task(
+                self._consume_partition(partition_queue),
+                name=f"{self.name}_{partition.topic}_{partition.partition}",
             )
-        except ValueError as ve:
-            logger.warning(f"Invalid message. Exception {ve}")
+        return partition_queue
+
+    async def _consume_partition(self, partition_queue: asyncio.Queue):
+        """
+        Processes a partition's records in order.
+
+        :param partition_queue: The partition queue
+        """
+        while True:
+            msg: ConsumerRecord = await partition_queue.get()
+            try:
+                await process_record(msg, self.validation_mode, self.committer)
+            except Exception as ex:
+                logger.error(
+                    f"Unable to process record {msg.topic}:{msg.partition}:{msg.offset} {ex!r}"
+                )
+                if self.committer is not None:
+                    self.committer.track_failure(msg, ex)
+            finally:
+                partition_queue.task_done()
+                self.queued -= 1
+                self._update_backpressure()
+
+    def _update_backpressure(self):
+        """Pauses assigned partitions at the high water mark, and resumes them at the low water mark"""
+        if not self.paused and self.queued >= self.high_water:
+            self.paused = True
+            self.kafka_consumer.pause(*self.kafka_consumer.assignment())
+            logger.info(f"{self.name} paused with {self.queued} queued records")
+        elif self.paused and self.queued <= self.low_water:
+            self.paused = False
+            self.kafka_consumer.resume(*self.kafka_consumer.paused())
+            logger.info(f"{self.name} resumed with {self.queued} queued records")
+
+    def _pause_assigned(self):
+        """Pauses assigned partitions which are not paused, such as partitions assigned by a rebalance"""
+        unpaused = self.kafka_consumer.assignment() - self.kafka_consumer.paused()
+        if unpaused:
+            self.kafka_consumer.pause(*unpaused)
+            logger.info(f"{self.name} paused {len(unpaused)} assigned partitions")
+
+    async def consume_batch(self):
+        """Fetches a batch of records and queues them for their partition tasks"""
+        if self.paused:
+            self._pause_assigned()
 
+        batch: Dict[
+            TopicPartition, List[ConsumerRecord]
+        ] = await self.kafka_consumer.getmany(
+            timeout_ms=self.timeout_ms, max_records=self.max_records
+        )
+        for partition, records in batch.items():
+            partition_queue = self._partition_queue(partition)
+            for msg in records:
+                partition_queue.put_nowait(msg)
+            self.queued += len(records)
+        self._update_backpressure()
 
-async def consume_message_task(kafka_consumer: AIOKafkaConsumer):
+    async def join(self):
+        """Waits until each queued record is processed"""
+        for partition_queue in list(self._partition_queues.values()):
+            await partition_queue.join()
+
+    async def stop(self):
+        """Cancels the partition tasks"""
+        for partition_task in self._partition_tasks.values():
+            partition_task.cancel()
+        await asyncio.gather(*self._partition_tasks.values(), return_exceptions=True)
+        self._partition_queues.clear()
+        self._partition_tasks.clear()
+
+    async def run(self):
+        """Consumes batches until cancelled"""
+        logger.debug(
+            f"Running Kafka batch consumer, subscribed to {self.kafka_consumer.subscription()}"
+        )
+        try:
+            while True:
+                await self.consume_batch()
+        finally:
+            await self.stop()
+
+
+async def consume_message_task(
+    kafka_consumer: AIOKafkaConsumer,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    committer: Optional[OffsetCommitter] = None,
+):
     """
     AsyncIO task used to consume messages from a Kafka Consumer.
 
     :param kafka_consumer: The aiokafka consumer.
+    :param validation_mode: The validation mode configured for the connector.
+    :param committer: The committer used if offsets are committed manually.
     """
     logger.debug(
         f"Running Kafka Consumer Task, subscribed to {kafka_consumer.subscription()}"
     )
     while True:
-        await consume_message(kafka_consumer)
+        await consume_message(kafka_consumer, validation_mode, committer)
+
+
+async def start_kafka_consumer(
+    connector_config: ConnectorConfig, name: str
+) -> AIOKafkaConsumer:
+    """
+    Starts a Kafka Consumer, and creates the tasks which consume its records and commit its offsets.
+
+    :param connector_config: The kafka consumer connector configuration
+    :param name: The suffix used for task names
+    :return: the started aiokafka consumer
+    """
+    k = connector_config
+    topics = k.config.topics
+    configuration_data = k.config.dict(exclude=CONNECTOR_CONFIG_FIELDS)
+
+    # offsets are committed once records are published if auto commit is disabled
+    committer = None
+    if not k.config.enable_auto_commit and k.config.group_id is not None:
+        c = AIOKafkaConsumer(**configuration_data)
+        committer = OffsetCommitter(
+            c, k.config.commit_max_records, k.config.commit_interval_ms
+        )
+        # the committer drops its state for partitions revoked by a rebalance
+        c.subscribe(topics, listener=committer)
+    else:
+        c = AIOKafkaConsumer(*topics, **configuration_data)
+
+    try:
+        await c.start()
+    except (Exception, asyncio.CancelledError):
+        # the consumer's connections are closed if it fails to start
+        await c.stop()
+        raise
+    logger.info(f"Started Kafka consumer for {k.config.bootstrap_servers}")
+
+    if committer is not None:
+        committer_task = asyncio.get_running_loop().create_task(
+            committer.run(), name=f"healthos_kafka_committer_{name}"
+        )
+        logger.info(f"Created task to commit Kafka offsets {committer_task.get_name()}")
+
+    validation_mode = ValidationMode(k.validation_mode)
+    if k.config.batch_max_records is None:
+        consumer_coroutine = consume_message_task(c, validation_mode, committer)
+    else:
+        consumer_coroutine = KafkaBatchConsumer(
+            c,
+            validation_mode,
+            k.config.batch_max_records,
+            k.config.batch_timeout_ms,
+            name=f"healthos_kafka_consumer_{name}",
+            committer=committer,
+            high_water=k.config.queue_high_water,
+            low_water=k.config.queue_low_water,
+        ).run()
+
+    consumer_task = asyncio.get_running_loop().create_task(
+        consumer_coroutine,
+        name=f"healthos_kafka_consumer_{name}",
+    )
+    logger.info(f"Created task to consume Kafka messages {consumer_task.get_name()}")
+    return c
 
 
 async def create_kafka_consumer_connector(
@@ -54,26 +509,30 @@ async def create_kafka_consumer_connector(
 ):
     """
     Creates a Kafka Consumer Connector and starts it with the specified configuration.
+    Connectors configured with workers are consumed by supervised worker processes.
 
     :param inbound_kafka_consumers: The kafka consumer configuration
     """
+    # workaround for circular import
+    from .kafka_workers import KafkaWorkerSupervisor
+
     global kafka_consumer_connectors
+    global kafka_worker_supervisors
     kafka_consumer_connectors = []
+    kafka_worker_supervisors = []
 
     try:
         for i, k in enumerate(inbound_kafka_consumers):
-            topics = k.config.topics
-            configuration_data = k.config.dict(exclude={"type", "subjects", "topics"})
-            c = AIOKafkaConsumer(*topics, **configuration_data)
-            await c.start()
-            logger.info(f"Started Kafka consumer for {k.config.bootstrap_servers}")
+            if k.config.workers > 0:
+                supervisor = KafkaWorkerSupervisor(
+                    get_core_configuration(), k, name=f"healthos_kafka_workers_{i}"
+                )
+                supervisor.start()
+                kafka_worker_supervisors.append(supervisor)
+                continue
+
+            c = await start_kafka_consumer(k, str(i))
             kafka_consumer_connectors.append(c)
-            consumer_task = asyncio.get_running_loop().create_task(
-                consume_message_task(c), name=f"healthos_kafka_consumer_{i}"
-            )
-            logger.info(
-                f"Created task to consume Kafka messages {consumer_task.get_name()}"
-            )
 
     except Exception as ex:
         logger.error(f"Unable to start Kafka Consumer. Error {ex}")
@@ -84,3 +543,248 @@ def get_kafka_consumer_connectors() -> List[AIOKafkaConsumer]:
     """Returns the Kafka Consumer Connectors"""
     global kafka_consumer_connectors
     return kafka_consumer_connectors or []
+
+
+def get_kafka_worker_supervisors() -> List["KafkaWorkerSupervisor"]:
+    """Returns the supervisors of Kafka Consumer Connectors which use worker processes"""
+    global kafka_worker_supervisors
+    return kafka_worker_supervisors or []
+
+
+class ProducerMetrics:
+    """
+    Tracks the throughput and delivery latency of data messages produced to a Kafka topic.
+    Delivery latency is measured from when a data message is received from the core stream until it is
+    acknowledged by the Kafka broker. Latency percentiles are calculated over recent deliveries.
+    """
+
+    def __init__(self, max_samples: int = 1024):
+        """
+        Configures the ProducerMetrics instance.
+
+        :param max_samples: The number of recent delivery latencies used for percentiles
+        """
+        self.started_at = time.monotonic()
+        self.delivered = 0
+        self.delivered_bytes = 0
+        self.failed = 0
+        self.latency_max = 0.0
+        self._latency_total = 0.0
+        self._latencies: Deque[float] = deque(maxlen=max_samples)
+
+    def record_delivery(self, size: int, latency: float):
+        """
+        Records a delivered data message.
+
+        :param size: The message size, in bytes
+        :param latency: The delivery latency, in seconds
+        """
+        self.delivered += 1
+        self.delivered_bytes += size
+        self.latency_max = max(self.latency_max, latency)
+        self._latency_total += latency
+        self._latencies.append(latency)
+
+    def record_failure(self):
+        """Records a data message which was not delivered"""
+        self.failed += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the topic's counters, throughput, and delivery latency in milliseconds"""
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        latency_percentiles = (
+            statistics.quantiles(self._latencies, n=100, method="inclusive")
+            if len(self._latencies) > 1
+            else [self.latency_max] * 99
+        )
+        return {
+            "delivered": self.delivered,
+            "delivered_bytes": self.delivered_bytes,
+            "failed": self.failed,
+            "messages_per_second": self.delivered / elapsed,
+            "bytes_per_second": self.delivered_bytes / elapsed,
+            "latency_mean_ms": (
+                1000 * self._latency_total / self.delivered if self.delivered else 0.0
+            ),
+            "latency_p50_ms": 1000 * latency_percentiles[49],
+            "latency_p99_ms": 1000 * latency_percentiles[98],
+            "latency_max_ms": 1000 * self.latency_max,
+        }
+
+
+# producer metrics, by Kafka topic
+kafka_producer_metrics: Dict[str, ProducerMetrics] = {}
+
+
+def get_kafka_producer_metrics() -> Dict[str, ProducerMetrics]:
+    """Returns the producer metrics for each Kafka topic"""
+    global kafka_producer_metrics
+    return kafka_producer_metrics
+
+
+class KafkaProducerConnector:
+    """
+    Produces data messages received from the core stream to a Kafka topic.
+
+    Data messages are produced with their original payload as the record value, and metadata conveyed in
+    record headers, as in the "headers" envelope format. Records are keyed by the data message's batch id, or
+    data id, so that batch members are produced to the same partition.
+
+    The producer batches and compresses records, as configured. A data message is acknowledged on the core
+    stream once its record is acknowledged by the Kafka broker, and is redelivered if the record is not
+    delivered.
+    """
+
+    def __init__(
+        self,
+        kafka_producer: AIOKafkaProducer,
+        topic: str,
+        metrics: Optional[ProducerMetrics] = None,
+    ):
+        """
+        Configures the KafkaProducerConnector instance.
+
+        :param kafka_producer: the aiokafka producer
+        :param topic: The Kafka topic
+        :param metrics: The metrics for the Kafka topic
+        """
+        self.kafka_producer = kafka_producer
+        self.topic = topic
+        self.metrics = metrics or ProducerMetrics()
+        self._deliveries: Set[asyncio.Task] = set()
+
+    async def produce(self, msg: Msg):
+        """
+        Produces a data message received from the core stream, without waiting for the broker's ack.
+        Data messages which cannot be decoded are logged and terminated.
+
+        :param msg: The core stream message
+        """
+        received_at = time.monotonic()
+        try:
+            body, headers = await resolve_claim_check(msg.data, msg.headers)
+            publish_model = decode_envelope(body, headers)
+        except Exception as ex:
+            logger.error(f"Unable to decode core stream message {ex!r}")
+            await msg.term()
+            return
+
+        value, data_headers = encode_envelope(publish_model, EnvelopeFormat.HEADERS)
+        key = str(publish_model.batch_id or publish_model.data_id).encode()
+        try:
+            # send waits only if the producer's buffer is full
+            delivery: asyncio.Future = await self.kafka_producer.send(
+                self.topic,
+                value,
+                key=key,
+                headers=[(k, v.encode()) for k, v in data_headers.items()],
+            )
+        except Exception as ex:
+            logger.warning(f"Unable to produce data message to {self.topic} {ex!r}")
+            self.metrics.record_failure()
+            await msg.nak()
+            return
+
+        delivery_task = asyncio.create_task(
+            self._acknowledge(msg, delivery, len(value), received_at)
+        )
+        self._deliveries.add(delivery_task)
+        delivery_task.add_done_callback(self._deliveries.discard)
+
+    async def _acknowledge(
+        self, msg: Msg, delivery: asyncio.Future, size: int, received_at: float
+    ):
+        """
+        Acknowledges a data message on the core stream once its record is delivered, or requests redelivery.
+
+        :param msg: The core stream message
+        :param delivery: The future resolved with the record's metadata once it is delivered
+        :param size: The record value size, in bytes
+        :param received_at: The time the message was received
+        """
+        try:
+            await delivery
+        except Exception as ex:
+            logger.warning(f"Unable to deliver data message to {self.topic} {ex!r}")
+            self.metrics.record_failure()
+            await msg.nak()
+            return
+
+        self.metrics.record_delivery(size, time.monotonic() - received_at)
+        await msg.ack()
+
+    async def stop(self):
+        """Delivers pending records, acknowledges their data messages, and stops the producer"""
+        await self.kafka_producer.stop()
+        await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+
+def _producer_parameters(connector_config: ConnectorConfig) -> Dict:
+    """
+    Returns the AIOKafkaProducer parameters for a producer connector.
+
+    :param connector_config: The kafka producer connector configuration
+    :return: dictionary of producer parameters
+    """
+    parameters = connector_config.config.dict(
+        exclude=PRODUCER_CONFIG_FIELDS, exclude_none=True
+    )
+    # aiokafka expects numeric acks settings as integers
+    if parameters.get("acks") in ("0", "1"):
+        parameters["acks"] = int(parameters["acks"])
+    return parameters
+
+
+async def create_kafka_producer_connector(
+    outbound_kafka_producers: List[ConnectorConfig],
+):
+    """
+    Creates Kafka Producer Connectors, which subscribe to core stream subjects and produce to Kafka topics.
+    Each subject is consumed by a durable core stream consumer named for the connector id.
+
+    :param outbound_kafka_producers: The kafka producer configuration
+    """
+    # workaround for circular import
+    from .nats import get_jetstream_core_client
+
+    global kafka_producer_connectors
+    kafka_producer_connectors = []
+
+    messaging_config = get_core_configuration().app.messaging
+    core_client = get_jetstream_core_client()
+
+    try:
+        for k in outbound_kafka_producers:
+            p = AIOKafkaProducer(**_producer_parameters(k))
+            await p.start()
+            logger.info(f"Started Kafka producer for {k.config.bootstrap_servers}")
+
+            metrics = kafka_producer_metrics.setdefault(
+                k.config.topic, ProducerMetrics()
+            )
+            producer_connector = KafkaProducerConnector(p, k.config.topic, metrics)
+            kafka_producer_connectors.append(producer_connector)
+
+            subjects = k.config.subjects or [ingress_stream_subject(messaging_config)]
+            for i, subject in enumerate(subjects):
+                await core_client.subscribe(
+                    subject,
+                    cb=producer_connector.produce,
+                    durable=f"{k.id}-{i}",
+                    stream=messaging_config.stream_name,
+                    config=ConsumerConfig(max_ack_pending=k.config.max_ack_pending),
+                    manual_ack=True,
+                )
+                logger.info(
+                    f"Producing core stream subject {subject} to Kafka topic {k.config.topic}"
+                )
+
+    except Exception as ex:
+        logger.error(f"Unable to start Kafka Producer. Error {ex}")
+        raise
+
+
+def get_kafka_producer_connectors() -> List[KafkaProducerConnector]:
+    """Returns the Kafka Producer Connectors"""
+    global kafka_producer_connectors
+    return kafka_producer_connectors or []
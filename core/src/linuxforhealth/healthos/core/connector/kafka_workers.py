@@ -0,0 +1,296 @@
+"""
+kafka_workers.py
+
+Scales Kafka Consumer Connectors across worker processes.
+
+A connector configured with workers is consumed by that number of worker processes, rather than within the core
+service event loop. Each worker process joins the connector's consumer group with its own consumer, so that the
+topics' partitions are divided among the workers, and publishes to HealthOS Core Messaging using its own core
+client. Worker processes validate messages within their own event loop.
+
+The core service supervises the worker processes, restarting a worker process if it exits, and stops them when
+the service shuts down. A worker process which exits repeatedly, such as with an unreachable broker, is restarted
+with an exponential backoff. Worker processes commit their offsets and flush pending publishes when stopped.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.process import BaseProcess
+from typing import Dict
+
+from ..config import ConnectorConfig, CoreServiceConfig, set_core_configuration
+from ..detect import configure_fhir_model_registry, configure_validation_cache, prewarm
+from .claimcheck import create_claim_check_store
+from .kafka import start_kafka_consumer
+from .nats import create_jetstream_core_client, get_jetstream_connections
+from .publisher import create_core_publisher, flush_core_publisher
+from .routing import ingress_stream_subject
+from .spool import close_core_spool, create_core_spool
+
+logger = logging.getLogger(__name__)
+
+
+class KafkaWorkerSupervisor:
+    """
+    Starts a Kafka Consumer Connector's worker processes, and restarts worker processes which exit.
+
+    A worker process which exits is restarted immediately. If it exits again before running for
+    restart_backoff_max seconds, its restart is delayed by restart_backoff seconds, doubling with each
+    consecutive exit up to restart_backoff_max.
+    """
+
+    def __init__(
+        self,
+        core_config: CoreServiceConfig,
+        connector_config: ConnectorConfig,
+        name: str = "healthos_kafka_workers",
+        supervise_interval: float = 1.0,
+        stop_timeout: float = 30.0,
+        restart_backoff: float = 1.0,
+        restart_backoff_max: float = 60.0,
+    ):
+        """
+        Configures the KafkaWorkerSupervisor instance.
+
+        :param core_config: The core service configuration, provided to each worker process
+        :param connector_config: The kafka consumer connector configuration
+        :param name: The name used for the supervisor task and worker processes
+        :param supervise_interval: The time, in seconds, between worker process checks
+        :param stop_timeout: The time, in seconds, worker processes are given to stop before they are killed
+        :param restart_backoff: The initial delay, in seconds, before a repeatedly exiting worker is restarted
+        :param restart_backoff_max: The maximum restart delay, in seconds. A worker which runs for this long
+            is restarted without delay when it next exits.
+        """
+        self.core_config = core_config
+        self.connector_config = connector_config
+        self.name = name
+        self.supervise_interval = supervise_interval
+        self.stop_timeout = stop_timeout
+        self.restart_backoff = restart_backoff
+        self.restart_backoff_max = restart_backoff_max
+
+        # worker processes are spawned, rather than forked, since the core service runs threads
+        self._context = multiprocessing.get_context("spawn")
+        self.workers: Dict[int, BaseProcess] = {}
+        self.restarts = 0
+
+        # per worker start times, consecutive exits, and scheduled restart times
+        self._started_at: Dict[int, float] = {}
+        self._exits: Dict[int, int] = {}
+        self._restart_at: Dict[int, float] = {}
+
+    def _start_worker(self, worker_id: int):
+        """
+        Starts a worker process.
+
+        :param worker_id: The worker id, from 0 to workers - 1
+        """
+        process = self._context.Process(
+            target=run_kafka_worker,
+            args=(self.core_config, self.connector_config, worker_id),
+            name=f"{self.name}_{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self.workers[worker_id] = process
+        self._started_at[worker_id] = time.monotonic()
+        logger.info(f"Started Kafka worker process {process.name} pid {process.pid}")
+
+    def start(self):
+        """Starts the worker processes, and creates the task which supervises them"""
+        for worker_id in range(self.connector_config.config.workers):
+            self._start_worker(worker_id)
+
+        supervisor_task = asyncio.get_running_loop().create_task(
+            self.supervise(), name=self.name
+        )
+        logger.info(
+            f"Created task to supervise Kafka workers {supervisor_task.get_name()}"
+        )
+
+    def _restart_delay(self, worker_id: int, now: float) -> float:
+        """
+        Returns the delay before an exited worker process is restarted, recording the exit.
+
+        :param worker_id: The worker id
+        :param now: The current monotonic time
+        :return: the restart delay, in seconds
+        """
+        if now - self._started_at[worker_id] >= self.restart_backoff_max:
+            self._exits[worker_id] = 0
+
+        exits = self._exits.get(worker_id, 0)
+        self._exits[worker_id] = exits + 1
+        if exits == 0:
+            return 0.0
+
+        # the exponent is bounded, as the delay is capped long before it overflows
+        return min(
+            self.restart_backoff * 2 ** min(exits - 1, 32), self.restart_backoff_max
+        )
+
+    def restart_exited(self):
+        """Restarts worker processes which have exited, once their restart delay elapses"""
+        now = time.monotonic()
+        for worker_id, process in list(self.workers.items()):
+            if process.is_alive():
+                continue
+
+            if worker_id not in self._restart_at:
+                delay = self._restart_delay(worker_id, now)
+                self._restart_at[worker_id] = now + delay
+                logger.error(
+                    f"Kafka worker process {process.name} exited with code {process.exitcode}, "
+                    + f"restarting in {delay:.1f} seconds"
+                )
+
+            if now >= self._restart_at[worker_id]:
+                del self._restart_at[worker_id]
+                self.restarts += 1
+                self._start_worker(worker_id)
+
+    async def supervise(self):
+        """Restarts worker processes which exit, until cancelled"""
+        while True:
+            await asyncio.sleep(self.supervise_interval)
+            self.restart_exited()
+
+    def _stop_workers(self):
+        """Terminates the worker processes, and kills worker processes which do not stop within the timeout"""
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+
+        for process in self.workers.values():
+            process.join(self.stop_timeout)
+            if process.is_alive():
+                logger.error(f"Killing Kafka worker process {process.name}")
+                process.kill()
+                process.join()
+
+    async def stop(self):
+        """Stops the worker processes"""
+        logger.info(f"Stopping Kafka worker processes for {self.name}")
+        await asyncio.to_thread(self._stop_workers)
+        self.workers.clear()
+        self._restart_at.clear()
+
+
+async def _cancel_tasks(prefix: str):
+    """
+    Cancels the tasks whose names start with a prefix, and waits for them to complete.
+
+    :param prefix: The task name prefix
+    """
+    tasks = [t for t in asyncio.all_tasks() if t.get_name().startswith(prefix)]
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def run_kafka_worker(
+    core_config: CoreServiceConfig, connector_config: ConnectorConfig, worker_id: int
+):
+    """
+    Entry point for a Kafka worker process.
+
+    :param core_config: The core service configuration
+    :param connector_config: The kafka consumer connector configuration
+    :param worker_id: The worker id
+    """
+    asyncio.run(kafka_worker(core_config, connector_config, worker_id))
+
+
+async def kafka_worker(
+    core_config: CoreServiceConfig, connector_config: ConnectorConfig, worker_id: int
+):
+    """
+    Consumes a Kafka Consumer Connector's topics within a worker process, until the process is terminated.
+
+    :param core_config: The core service configuration
+    :param connector_config: The kafka consumer connector configuration
+    :param worker_id: The worker id
+    """
+    # workaround for circular import
+    from ..app import configure_logging
+
+    set_core_configuration(core_config)
+    configure_logging(core_config.logging_config)
+
+    # the worker is cancelled when the process is terminated, including while it starts
+    worker_task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signal_number, worker_task.cancel)
+
+    kafka_consumer = None
+    try:
+        validation = core_config.app.validation
+        configure_fhir_model_registry(validation.fhir_resource_types)
+        prewarm(validation.prewarm_content_types)
+        configure_validation_cache(
+            validation.cache_max_entries,
+            validation.cache_max_bytes,
+            validation.cache_ttl,
+        )
+
+        messaging = core_config.app.messaging
+        await create_jetstream_core_client(
+            messaging.url,
+            messaging.stream_name,
+            [ingress_stream_subject(messaging), messaging.error_subject],
+            messaging.dedupe_window if messaging.dedupe_key != "none" else None,
+        )
+        # each worker process spools to its own directory
+        spool_directory = (
+            os.path.join(
+                messaging.spool_directory, f"{connector_config.id}-{worker_id}"
+            )
+            if messaging.spool_directory is not None
+            else None
+        )
+        await create_core_spool(
+            spool_directory,
+            messaging.spool_segment_max_bytes,
+            messaging.spool_sync_interval,
+            messaging.spool_replay_interval,
+        )
+        await create_claim_check_store(
+            messaging.claim_check,
+            messaging.claim_check_bucket,
+            messaging.claim_check_directory,
+            messaging.claim_check_ttl,
+        )
+        create_core_publisher(
+            messaging.max_in_flight,
+            messaging.batch_max_count,
+            messaging.batch_max_bytes,
+            messaging.batch_linger,
+        )
+
+        kafka_consumer = await start_kafka_consumer(
+            connector_config, f"worker_{worker_id}"
+        )
+        logger.info(
+            f"Kafka worker {connector_config.id}-{worker_id} started, pid {os.getpid()}"
+        )
+        await asyncio.Event().wait()
+    except asyncio.CancelledError:
+        logger.info(f"Stopping Kafka worker {connector_config.id}-{worker_id}")
+    except Exception as ex:
+        logger.error(f"Kafka worker {connector_config.id}-{worker_id} failed {ex!r}")
+        raise
+    finally:
+        # cleanup runs after a failed startup, as well as when stopped
+        # consuming stops before pending publishes are flushed, so that their offsets are committed
+        await _cancel_tasks("healthos_kafka_consumer")
+        await flush_core_publisher()
+        await _cancel_tasks("healthos")
+        await close_core_spool()
+        if kafka_consumer is not None:
+            await kafka_consumer.stop()
+        for nats_connection in get_jetstream_connections():
+            await nats_connection.close()
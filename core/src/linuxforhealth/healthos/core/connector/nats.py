@@ -7,14 +7,19 @@ The core client submits data to "internal" NATS subjects which power the HealthO
 The egress client transmits data to external systems.
 """
 import logging
-from typing import List
+from functools import partial
+from typing import List, Optional
 
 import nats
+from nats.aio.msg import Msg
+from nats.errors import NotJSMessageError
 from nats.js import JetStreamContext, JetStreamManager
+from nats.js.api import StreamConfig
 from nats.js.errors import NotFoundError
 
 from ..config import ConnectorConfig, CoreServiceConfig, get_core_configuration
-from .processor import PublishDataModel, process_data
+from ..detect import ValidationMode
+from .processor import DataSubmission, submit_batch
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +33,24 @@ jetstream_clients: List[JetStreamContext] | None = None
 jetstream_connections: List[nats.NATS] | None = None
 
 
-async def create_jetstream_core_client(url: str, stream_name: str, subjects: str):
+async def create_jetstream_core_client(
+    url: str,
+    stream_name: str,
+    subjects: List[str],
+    duplicate_window: Optional[float] = None,
+):
     """
     Creates a NATS client for the Core service.
     Additional operations include:
     - creating the target stream and subjects if they do not exist
+    - adding subjects to the target stream if the stream exists without them
     - associating the target subject with the NATS client instance
 
     :param url: The NATS server url, including protocol, host, and port.
     :param stream_name: The NATS server stream name
     :param subjects: The NATS server subjects used by the core module
+    :param duplicate_window: The duration, in seconds, the stream tracks message ids for deduplication.
+        Defaults to None, which uses the server's default.
     :return:
     """
     nats_connection: nats.NATS
@@ -54,11 +67,24 @@ async def create_jetstream_core_client(url: str, stream_name: str, subjects: str
     jetstream_mgr: JetStreamManager = nats_connection.jsm()
 
     try:
-        await jetstream_mgr.stream_info(stream_name)
+        stream_info = await jetstream_mgr.stream_info(stream_name)
     except NotFoundError:
         logger.info("HealthOS Stream Not Found Within NATS Jetstream Server")
         logger.info("Creating HealthOS Stream")
-        await jetstream_mgr.add_stream(name=stream_name, subjects=subjects)
+        stream_config = StreamConfig(name=stream_name, subjects=subjects)
+        if duplicate_window is not None:
+            stream_config.duplicate_window = duplicate_window
+        await jetstream_mgr.add_stream(stream_config)
+    else:
+        stream_subjects = stream_info.config.subjects or []
+        missing_subjects = [s for s in subjects if s not in stream_subjects]
+        if missing_subjects:
+            logger.info(f"Adding subjects {missing_subjects} to HealthOS Stream")
+            await jetstream_mgr.update_stream(
+                stream_info.config.evolve(
+                    subjects=[*stream_subjects, *missing_subjects]
+                )
+            )
 
     global jetstream_core_client
     jetstream_core_client = nats_connection.jetstream()
@@ -95,8 +121,12 @@ async def create_inbound_jetstream_clients(inbound_nats_clients: List[ConnectorC
         jetstream_client = nats_connection.jetstream()
         jetstream_clients.append(jetstream_client)
 
+        callback = partial(
+            inbound_connector_callback,
+            validation_mode=ValidationMode(c.validation_mode),
+        )
         for s in subscription_subjects:
-            await jetstream_client.subscribe(s, cb=inbound_connector_callback)
+            await jetstream_client.subscribe(s, cb=callback)
             logger.info(f"Subscribed to subject {s}")
 
         connections = get_jetstream_connections()
@@ -123,20 +153,43 @@ def get_jetstream_connections() -> List[nats.NATS]:
     return jetstream_connections
 
 
-async def inbound_connector_callback(msg):
+def _upstream_id(msg: Msg) -> Optional[str]:
+    """
+    Returns the upstream id for an inbound message, derived from its stream and stream sequence.
+
+    :param msg: The inbound Jetstream message
+    :return: the upstream id, or None if the message is not a Jetstream message
+    """
+    try:
+        metadata = msg.metadata
+    except (NotJSMessageError, ValueError):
+        return None
+    return f"{metadata.stream}:{metadata.sequence.stream}"
+
+
+async def inbound_connector_callback(
+    msg, validation_mode: ValidationMode = ValidationMode.FULL
+):
     """
     This callback function is used to consolidate inbound message processing.
     Messages received are published to the core service's internal messaging system
 
     :param msg: The message from the internal system
+    :param validation_mode: The validation mode configured for the connector
     """
     await msg.ack()
 
     service_config: CoreServiceConfig = get_core_configuration()
     messaging_config = service_config.app.messaging
 
-    msg_str = msg.data.decode("utf-8")
-    publish_model: PublishDataModel = await process_data(msg_str)
-
-    logger.debug(f"published message to {messaging_config.ingress_subject}")
-    logger.debug(f"message metadata {publish_model.dict()}")
+    # acks are not awaited, so that publishing overlaps receiving
+    submissions: List[DataSubmission] = await submit_batch(
+        msg.data,
+        validation_mode,
+        upstream_id=_upstream_id(msg),
+        upstream_key=msg.subject,
+    )
+
+    for publish_model, _ in submissions:
+        logger.debug(f"submitted message to {messaging_config.ingress_subject}")
+        logger.debug(f"message metadata {publish_model.dict()}")
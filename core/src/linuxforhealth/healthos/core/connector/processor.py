@@ -3,13 +3,13 @@ processor.py
 
 Common data processing implementations for HealthOS connectors.
 """
-import json
+import asyncio
 import logging
 import uuid
-from typing import Optional
+from typing import List, Optional, Tuple
 
-from nats.js import JetStreamContext
-from nats.js.errors import NoStreamResponseError
+from nats.js import api
+from nats.js.api import Header
 from pydantic import BaseModel, Field
 
 from ..config import get_core_configuration
@@ -17,9 +17,14 @@ from ..detect import (
     ContentType,
     ContentTypeError,
     DataValidationError,
-    detect_content_type,
-    validate_message,
+    ParsedMessage,
+    ValidationMode,
+    content_hash,
+    is_hl7_batch,
+    split_hl7_batch,
 )
+from ..executor import submit_parse_message
+from ..ids import generate_data_id
 
 logger = logging.getLogger(__name__)
 
@@ -30,62 +35,297 @@ class PublishDataModel(BaseModel):
     """
 
     data_id: uuid.UUID = Field(
-        description="The unique id for the data message", default=uuid.uuid4()
+        description="The unique, time-ordered id for the data message",
+        default_factory=generate_data_id,
     )
     data: str = Field(description="The data payload")
     error: Optional[str] = Field(description="Contains data processing errors.")
     content_type: Optional[ContentType] = Field(description="The data content-type")
+    batch_id: Optional[uuid.UUID] = Field(
+        description="The unique id for the batch containing the data message, if the message was received "
+        + "within a HL7v2 batch"
+    )
+
+
+# a published data message and the future for its Jetstream ack
+DataSubmission = Tuple[PublishDataModel, "asyncio.Future[api.PubAck]"]
+
+
+async def submit_batch(
+    msg: str | bytes,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    upstream_id: Optional[str] = None,
+    upstream_key: Optional[str] = None,
+) -> List[DataSubmission]:
+    """
+    Processes data received by an inbound HealthOS connector which may contain multiple messages, without
+    waiting for Jetstream acks.
+    HL7v2 batch files are split into their member messages, which are validated concurrently and then published
+    independently, in batch order, with a shared batch id. A batch with an invalid structure is published as a single message
+    to the error subject. Other data is processed as a single message.
+
+    :param msg: The input data message
+    :param validation_mode: The validation mode configured for the connector. Defaults to full validation.
+    :param upstream_id: The id assigned to the data by the upstream system, if available. Batch members are
+        identified by the upstream id and the member's position within the batch.
+    :param upstream_key: The routing key assigned to the data by the upstream system, if available.
+    :return: The PublishDataModel and ack future for each published data message
+    """
+    if not is_hl7_batch(msg):
+        return [
+            await submit_data(
+                msg,
+                validation_mode,
+                upstream_id=upstream_id,
+                upstream_key=upstream_key,
+            )
+        ]
+
+    try:
+        members = list(split_hl7_batch(msg))
+    except (DataValidationError, UnicodeDecodeError) as ex:
+        logger.error(f"Exception occurred processing HL7v2 batch {ex}")
+        publish_model = PublishDataModel(
+            data=msg, content_type=ContentType.HL7_TEXT, error=str(ex)
+        )
+        return [
+            (
+                publish_model,
+                await _publish(publish_model, msg, upstream_id, upstream_key),
+            )
+        ]
+
+    batch_id = generate_data_id()
+    logger.debug(f"processing HL7v2 batch {batch_id} with {len(members)} messages")
+    publish_models = await asyncio.gather(
+        *(validate_data(m, validation_mode, batch_id) for m in members)
+    )
+
+    # members are published in batch order, regardless of the order in which their validation completes
+    return [
+        (
+            publish_model,
+            await _publish(
+                publish_model,
+                m,
+                f"{upstream_id}:{i}" if upstream_id is not None else None,
+                upstream_key,
+            ),
+        )
+        for i, (publish_model, m) in enumerate(zip(publish_models, members))
+    ]
+
+
+async def process_batch(
+    msg: str | bytes,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    upstream_id: Optional[str] = None,
+    upstream_key: Optional[str] = None,
+) -> List[PublishDataModel]:
+    """
+    Processes data which may contain multiple messages, waiting for each message's Jetstream ack.
+    See submit_batch for HL7v2 batch processing.
+
+    :param msg: The input data message
+    :param validation_mode: The validation mode configured for the connector. Defaults to full validation.
+    :param upstream_id: The id assigned to the data by the upstream system, if available.
+    :param upstream_key: The routing key assigned to the data by the upstream system, if available.
+    :return: The PublishDataModels for each published data message
+    :raises: NoStreamResponseError if a message is not acknowledged by the stream
+    """
+    submissions = await submit_batch(msg, validation_mode, upstream_id, upstream_key)
+    await asyncio.gather(*(ack for _, ack in submissions))
+    return [publish_model for publish_model, _ in submissions]
 
 
-async def process_data(msg: str) -> PublishDataModel:
+async def submit_data(
+    msg: str | bytes,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    batch_id: Optional[uuid.UUID] = None,
+    upstream_id: Optional[str] = None,
+    upstream_key: Optional[str] = None,
+) -> DataSubmission:
     """
     The core function used to process data received by an inbound HealthOS connector.
+    Binary messages are validated as received, and decoded to a string for the published data payload.
+    The data message is submitted to the core publisher, without waiting for the Jetstream ack.
 
     :param msg: The input data message
+    :param validation_mode: The validation mode configured for the connector. Defaults to full validation.
+    :param batch_id: The id of the HL7v2 batch containing the message, if applicable.
+    :param upstream_id: The id assigned to the message by the upstream system, if available.
+    :param upstream_key: The routing key assigned to the message by the upstream system, if available.
+    :return: The PublishDataModel containing the validated data and associated metadata, and the ack future
+    """
+    publish_model = await validate_data(msg, validation_mode, batch_id)
+    return publish_model, await _publish(publish_model, msg, upstream_id, upstream_key)
+
+
+async def validate_data(
+    msg: str | bytes,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    batch_id: Optional[uuid.UUID] = None,
+) -> PublishDataModel:
+    """
+    Detects and validates a data message, returning the data message to publish.
+    Validation errors are recorded within the PublishDataModel rather than raised.
+
+    :param msg: The input data message
+    :param validation_mode: The validation mode configured for the connector. Defaults to full validation.
+    :param batch_id: The id of the HL7v2 batch containing the message, if applicable.
     :return: The PublishDataModel containing the validated data and associated metadata
     """
-    publish_data = {}
+    publish_data = {"data": msg, "batch_id": batch_id}
     try:
-        publish_data["data"] = msg
-        content_type = detect_content_type(msg)
-        publish_data["content_type"] = content_type
-        validate_message(msg)
-    except (ContentTypeError, DataValidationError) as ex:
-        msg = f"Exception occurred processing data {ex}"
-        logger.error(msg)
+        # detection and validation share a single parse of the message
+        parsed_message: ParsedMessage = await submit_parse_message(
+            msg, validation_mode=validation_mode
+        )
+    except ContentTypeError as ex:
+        logger.error(f"Exception occurred processing data {ex}")
         publish_data["error"] = str(ex)
+    else:
+        publish_data["content_type"] = parsed_message.content_type
+        if parsed_message.error is not None:
+            logger.error(f"Exception occurred processing data {parsed_message.error}")
+            publish_data["error"] = parsed_message.error
+
+    return PublishDataModel(**publish_data)
+
+
+async def process_data(
+    msg: str | bytes,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    batch_id: Optional[uuid.UUID] = None,
+    upstream_id: Optional[str] = None,
+    upstream_key: Optional[str] = None,
+) -> PublishDataModel:
+    """
+    Processes a data message, waiting for the Jetstream ack.
 
-    # publish data to HealthOS Core Messaging
-    publish_model = PublishDataModel(**publish_data)
-    message_payload = json.dumps(publish_model.json()).encode()
+    :param msg: The input data message
+    :param validation_mode: The validation mode configured for the connector. Defaults to full validation.
+    :param batch_id: The id of the HL7v2 batch containing the message, if applicable.
+    :param upstream_id: The id assigned to the message by the upstream system, if available.
+    :param upstream_key: The routing key assigned to the message by the upstream system, if available.
+    :return: The PublishDataModel containing the validated data and associated metadata
+    :raises: NoStreamResponseError if the message is not acknowledged by the stream
+    """
+    publish_model, publish_ack = await submit_data(
+        msg, validation_mode, batch_id, upstream_id, upstream_key
+    )
+    await publish_ack
+    return publish_model
+
+
+def _deduplication_id(
+    dedupe_key: str, payload: str | bytes, upstream_id: Optional[str]
+) -> Optional[str]:
+    """
+    Returns the id used by the Jetstream stream to discard duplicate messages.
+
+    :param dedupe_key: The configured deduplication key: "none", "content_hash", or "upstream_id"
+    :param payload: The original data payload
+    :param upstream_id: The id assigned to the message by the upstream system, if available
+    :return: the deduplication id, or None if the message is not deduplicated
+    """
+    match dedupe_key:
+        case "content_hash":
+            return content_hash(payload)
+        case "upstream_id":
+            return upstream_id
+        case _:
+            return None
+
+
+def _failed_ack(ex: Exception) -> "asyncio.Future[api.PubAck]":
+    """
+    Returns an ack future for a message which could not be submitted for publishing.
+    The exception is retrieved so that callers which do not await the ack are not reported as unhandled.
+
+    :param ex: The exception raised when submitting the message
+    :return: a future which raises the exception
+    """
+    ack_future = asyncio.get_running_loop().create_future()
+    ack_future.set_exception(ex)
+    ack_future.exception()
+    return ack_future
+
+
+async def _publish(
+    publish_model: PublishDataModel,
+    payload: str | bytes,
+    upstream_id: Optional[str] = None,
+    upstream_key: Optional[str] = None,
+) -> "asyncio.Future[api.PubAck]":
+    """
+    Submits a data message to the core publisher for HealthOS Core Messaging.
+    Messages with errors are published to the error subject, otherwise to an ingress subject.
+    A Nats-Msg-Id header is included when deduplication is configured, and large messages are compressed when
+    compression is configured. Messages which exceed the claim check threshold are stored in the claim check
+    store, if configured, and published as a reference message.
+
+    :param publish_model: The data message to publish
+    :param payload: The original data payload
+    :param upstream_id: The id assigned to the message by the upstream system, if available
+    :param upstream_key: The routing key assigned to the message by the upstream system, if available
+    :return: a future resolved with the Jetstream ack
+    """
     messaging_config = get_core_configuration().app.messaging
 
     # workaround for circular import
-    from .nats import get_jetstream_core_client
+    from .claimcheck import check_in, get_claim_check_store
+    from .codecs import get_envelope_codec
+    from .compression import compress_payload
+    from .envelope import EnvelopeFormat, encode_envelope
+    from .publisher import get_core_publisher
+    from .routing import ingress_subject
+
+    message_payload, message_headers = encode_envelope(
+        publish_model,
+        EnvelopeFormat(messaging_config.envelope_format),
+        payload,
+        get_envelope_codec(messaging_config.envelope_codec),
+    )
+
+    deduplication_id = _deduplication_id(
+        messaging_config.dedupe_key, payload, upstream_id
+    )
+    if deduplication_id is not None:
+        message_headers[Header.MSG_ID.value] = deduplication_id
+
+    message_payload, message_headers = compress_payload(
+        message_payload,
+        message_headers,
+        messaging_config.compression,
+        messaging_config.compression_threshold,
+    )
 
-    core_client: JetStreamContext = get_jetstream_core_client()
+    claim_check_store = get_claim_check_store()
+    if (
+        claim_check_store is not None
+        and len(message_payload) > messaging_config.claim_check_threshold
+    ):
+        try:
+            message_payload, message_headers = await check_in(
+                str(publish_model.data_id),
+                message_payload,
+                message_headers,
+                claim_check_store,
+            )
+        except Exception as ex:
+            logger.error(f"Unable to store claim check {publish_model.data_id} {ex!r}")
+            return _failed_ack(ex)
 
     if publish_model.error is not None:
         nats_subject = messaging_config.error_subject
     else:
-        nats_subject = messaging_config.ingress_subject
-
-    try:
-        publish_ack = await core_client.publish(
-            subject=nats_subject,
-            stream=messaging_config.stream_name,
-            payload=message_payload,
-        )
-    except NoStreamResponseError as nsre:
-        msg = f"Unable to publish message to {messaging_config.stream_name}:{nats_subject}"
-        logger.error(msg)
-        logger.error(f"NATS NoStreamResponseError {nsre}")
-        raise
-    else:
-        logger.debug(
-            f"publishing to NATS {messaging_config.stream_name}:{nats_subject}"
-        )
-        logger.debug(f"received NATS Ack {publish_ack}")
-        logger.debug(f"returning status = received, id = {publish_model.data_id}")
+        nats_subject = ingress_subject(messaging_config, publish_model, upstream_key)
 
-    return publish_model
+    logger.debug(f"publishing to NATS {messaging_config.stream_name}:{nats_subject}")
+    return await get_core_publisher().publish(
+        subject=nats_subject,
+        stream=messaging_config.stream_name,
+        payload=message_payload,
+        headers=message_headers,
+    )
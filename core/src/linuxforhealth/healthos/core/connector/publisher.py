@@ -0,0 +1,320 @@
+"""
+publisher.py
+
+Publishes data messages to HealthOS Core Messaging (NATS Jetstream) with a bounded number of publishes in flight.
+Publishing returns a future for the Jetstream ack, so that callers may overlap network round trips rather than
+awaiting each ack in turn.
+
+The BatchingPublisher buffers messages from all connectors and dispatches them together when a count, size, or
+linger limit is reached. The NATS client coalesces the publishes dispatched within a batch into a single socket
+write, and each message's ack is resolved individually.
+"""
+import asyncio
+import logging
+from functools import partial
+from typing import Dict, List, Optional, Set, Tuple
+
+from nats.js import JetStreamContext, api
+
+from .spool import SPOOLED_ERRORS, get_core_spool
+
+logger = logging.getLogger(__name__)
+
+# the default maximum number of publishes awaiting an ack
+DEFAULT_MAX_IN_FLIGHT = 64
+
+# the default batch limits
+DEFAULT_BATCH_MAX_BYTES = 1_048_576
+DEFAULT_BATCH_LINGER = 0.005
+
+# a buffered message: subject, stream, payload, headers, and the caller's ack future
+BatchEntry = Tuple[
+    str, str, bytes, Optional[Dict[str, str]], "asyncio.Future[api.PubAck]"
+]
+
+
+class JetStreamPublisher:
+    """
+    Publishes messages to the core Jetstream client within a bounded in-flight window.
+    Callers wait for a slot when the window is full, which applies backpressure to inbound connectors.
+    """
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
+        """
+        Configures the JetStreamPublisher instance.
+
+        :param max_in_flight: The maximum number of publishes awaiting an ack.
+        """
+        self.max_in_flight = max_in_flight
+        self._in_flight: Set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        """Returns the number of publishes awaiting an ack"""
+        return len(self._in_flight)
+
+    async def publish(
+        self,
+        subject: str,
+        stream: str,
+        payload: bytes,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> "asyncio.Future[api.PubAck]":
+        """
+        Submits a message for publishing, waiting for a slot if the in-flight window is full.
+
+        :param subject: The NATS subject
+        :param stream: The NATS Jetstream stream name
+        :param payload: The message body
+        :param headers: The message headers, if any
+        :return: a future resolved with the Jetstream ack, or None if the message was spooled. The future raises
+            NoStreamResponseError if the message is not acknowledged by the stream and spooling is disabled.
+        """
+        while len(self._in_flight) >= self.max_in_flight:
+            await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+        # workaround for circular import
+        from .nats import get_jetstream_core_client
+
+        core_client: JetStreamContext = get_jetstream_core_client()
+        publish_task = asyncio.create_task(
+            _publish_message(core_client, subject, stream, payload, headers)
+        )
+        self._in_flight.add(publish_task)
+        publish_task.add_done_callback(
+            partial(self._publish_done, f"{stream}:{subject}")
+        )
+        return publish_task
+
+    def _publish_done(self, target: str, publish_task: asyncio.Task):
+        """
+        Releases the in-flight slot for a completed publish, and logs publishing errors.
+        Retrieving the exception ensures that unobserved failures are not reported as unhandled.
+
+        :param target: The stream and subject, used for logging
+        :param publish_task: The completed publish task
+        """
+        self._in_flight.discard(publish_task)
+
+        if publish_task.cancelled():
+            return
+
+        if publish_task.exception() is not None:
+            logger.error(f"Unable to publish message to {target}")
+            logger.error(f"NATS publish error {publish_task.exception()!r}")
+        elif publish_task.result() is None:
+            logger.debug(f"spooled message for {target}")
+        else:
+            logger.debug(f"received NATS Ack {publish_task.result()}")
+
+    async def flush(self):
+        """Waits for all in-flight publishes to complete"""
+        if self._in_flight:
+            logger.info(f"Waiting for {len(self._in_flight)} in-flight publishes")
+            await asyncio.wait(set(self._in_flight))
+
+
+class BatchingPublisher(JetStreamPublisher):
+    """
+    Buffers messages and publishes them as a batch when the batch reaches its maximum message count or size,
+    or when the oldest buffered message has waited for the linger time.
+    Batched publishes remain subject to the in-flight window.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_batch_count: int = DEFAULT_MAX_IN_FLIGHT,
+        max_batch_bytes: int = DEFAULT_BATCH_MAX_BYTES,
+        linger: float = DEFAULT_BATCH_LINGER,
+    ):
+        """
+        Configures the BatchingPublisher instance.
+
+        :param max_in_flight: The maximum number of publishes awaiting an ack.
+        :param max_batch_count: The maximum number of messages in a batch.
+        :param max_batch_bytes: The maximum size of a batch's message payloads, in bytes.
+        :param linger: The maximum time, in seconds, a message is buffered before its batch is published.
+        """
+        super().__init__(max_in_flight)
+        self.max_batch_count = max_batch_count
+        self.max_batch_bytes = max_batch_bytes
+        self.linger = linger
+
+        self._batch: List[BatchEntry] = []
+        self._batch_bytes = 0
+        self._linger_timer: Optional[asyncio.TimerHandle] = None
+        self._linger_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def buffered(self) -> int:
+        """Returns the number of messages buffered for the next batch"""
+        return len(self._batch)
+
+    async def publish(
+        self,
+        subject: str,
+        stream: str,
+        payload: bytes,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> "asyncio.Future[api.PubAck]":
+        """
+        Buffers a message for publishing. The batch is published when it reaches its count or size limit,
+        in which case the caller waits while the batch is submitted to the in-flight window.
+
+        :param subject: The NATS subject
+        :param stream: The NATS Jetstream stream name
+        :param payload: The message body
+        :param headers: The message headers, if any
+        :return: a future resolved with the Jetstream ack. The future raises NoStreamResponseError if the
+            message is not acknowledged by the stream.
+        """
+        loop = asyncio.get_running_loop()
+        ack_future = loop.create_future()
+        # publishing errors are logged when the batch is published, so the future's exception is retrieved
+        # to ensure that callers which do not await the ack are not reported as unhandled
+        ack_future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        self._batch.append((subject, stream, payload, headers, ack_future))
+        self._batch_bytes += len(payload)
+
+        if (
+            len(self._batch) >= self.max_batch_count
+            or self._batch_bytes >= self.max_batch_bytes
+        ):
+            await self._publish_batch()
+        elif self._linger_timer is None:
+            self._linger_timer = loop.call_later(self.linger, self._linger_expired)
+
+        return ack_future
+
+    def _linger_expired(self):
+        """Publishes the buffered batch once the linger time has elapsed"""
+        self._linger_timer = None
+        linger_task = asyncio.create_task(self._publish_batch())
+        self._linger_tasks.add(linger_task)
+        linger_task.add_done_callback(self._linger_tasks.discard)
+
+    async def _publish_batch(self):
+        """Submits the buffered messages to the in-flight window, resolving each message's ack future"""
+        if self._linger_timer is not None:
+            self._linger_timer.cancel()
+            self._linger_timer = None
+
+        batch, self._batch, self._batch_bytes = self._batch, [], 0
+        if not batch:
+            return
+
+        logger.debug(f"publishing batch of {len(batch)} messages")
+        for subject, stream, payload, headers, ack_future in batch:
+            try:
+                publish_task = await super().publish(subject, stream, payload, headers)
+            except Exception as ex:
+                if not ack_future.done():
+                    ack_future.set_exception(ex)
+                continue
+            publish_task.add_done_callback(partial(_resolve_ack, ack_future))
+
+    async def flush(self):
+        """Publishes the buffered batch and waits for all in-flight publishes to complete"""
+        if self._linger_tasks:
+            await asyncio.wait(set(self._linger_tasks))
+        await self._publish_batch()
+        await super().flush()
+
+
+def _resolve_ack(ack_future: asyncio.Future, publish_task: asyncio.Task):
+    """
+    Resolves a buffered message's ack future with the outcome of its publish task.
+
+    :param ack_future: The ack future returned to the caller
+    :param publish_task: The completed publish task
+    """
+    if ack_future.done():
+        return
+    if publish_task.cancelled():
+        ack_future.cancel()
+    elif publish_task.exception() is not None:
+        ack_future.set_exception(publish_task.exception())
+    else:
+        ack_future.set_result(publish_task.result())
+
+
+async def _publish_message(
+    core_client: JetStreamContext,
+    subject: str,
+    stream: str,
+    payload: bytes,
+    headers: Optional[Dict[str, str]],
+) -> Optional[api.PubAck]:
+    """
+    Publishes a message to the core Jetstream client.
+    If the core stream is unreachable, the message is appended to the core spool, if configured. While the spool
+    has pending messages, the message is appended to the spool so that it is replayed after them.
+
+    :param core_client: The core Jetstream client
+    :param subject: The NATS subject
+    :param stream: The NATS Jetstream stream name
+    :param payload: The message body
+    :param headers: The message headers, if any
+    :return: the Jetstream ack, or None if the message was spooled
+    """
+    spool = get_core_spool()
+    if spool is not None and spool.pending:
+        await spool.append(subject, stream, payload, headers)
+        return None
+
+    try:
+        return await core_client.publish(
+            subject=subject, stream=stream, payload=payload, headers=headers
+        )
+    except SPOOLED_ERRORS as ex:
+        if spool is None:
+            raise
+        logger.warning(f"Core stream unavailable, spooling message {ex!r}")
+        await spool.append(subject, stream, payload, headers)
+        return None
+
+
+# publisher used for core messaging
+core_publisher: JetStreamPublisher = JetStreamPublisher()
+
+
+def create_core_publisher(
+    max_in_flight: int,
+    batch_max_count: int = 0,
+    batch_max_bytes: int = DEFAULT_BATCH_MAX_BYTES,
+    batch_linger: float = DEFAULT_BATCH_LINGER,
+):
+    """
+    Creates the publisher used for core messaging.
+
+    :param max_in_flight: The maximum number of publishes awaiting an ack.
+    :param batch_max_count: The maximum number of messages in a batch. Defaults to 0, which publishes each
+        message as it is submitted.
+    :param batch_max_bytes: The maximum size of a batch's message payloads, in bytes.
+    :param batch_linger: The maximum time, in seconds, a message is buffered before its batch is published.
+    """
+    global core_publisher
+    if batch_max_count > 0:
+        core_publisher = BatchingPublisher(
+            max_in_flight, batch_max_count, batch_max_bytes, batch_linger
+        )
+        logger.info(
+            f"Created batching core publisher with {max_in_flight} in-flight publishes, "
+            + f"{batch_max_count} messages or {batch_max_bytes} bytes per batch, and {batch_linger}s linger"
+        )
+    else:
+        core_publisher = JetStreamPublisher(max_in_flight)
+        logger.info(f"Created core publisher with {max_in_flight} in-flight publishes")
+
+
+def get_core_publisher() -> JetStreamPublisher:
+    """Returns the publisher used for core messaging"""
+    global core_publisher
+    return core_publisher
+
+
+async def flush_core_publisher():
+    """Publishes buffered messages and waits for the core publisher's in-flight publishes to complete"""
+    await get_core_publisher().flush()
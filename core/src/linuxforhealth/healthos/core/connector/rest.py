@@ -4,16 +4,16 @@ rest.py
 Implements Rest API connectors
 """
 import logging
-import uuid
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import HTTPException
+from fastapi import Header, HTTPException
 from fastapi.routing import APIRouter
 from nats.js.errors import NoStreamResponseError
 from pydantic import BaseModel, Field
 
-from ..detect import ContentType
-from .processor import process_data
+from ..detect import ContentType, ValidationMode
+from ..ids import generate_data_id
+from .processor import process_batch
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +44,12 @@ class RestEndpointResponse(BaseModel):
         description="The data message's content type. The content type is "
         + "not provided if the data fails validation."
     )
-    data_id: str = Field(description="The unique id assigned to the data message")
+    data_id: str = Field(
+        description="The unique id assigned to the data message. The batch id is provided for HL7v2 batches."
+    )
+    data_ids: Optional[List[str]] = Field(
+        description="The unique ids assigned to each message within a HL7v2 batch"
+    )
 
     class Config:
         extra = "ignore"
@@ -60,6 +65,8 @@ class RestEndpointResponse(BaseModel):
 
 async def endpoint_template(
     request_model: RestEndpointRequest,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+    idempotency_key: Optional[str] = None,
 ):
     """
     Provides an asyncio based template for core connector RestEndpoint implementations.
@@ -69,36 +76,67 @@ async def endpoint_template(
     - 200 for successful processing which includes valid and invalid data messages
     - 500 if an error occurs transmitting to NATS
 
+    HL7v2 batches are split into member messages, which are published independently.
+    Clients may provide an Idempotency-Key header so that retried requests are deduplicated by the stream.
+
     :param request_model: The RestEndpoint request model.
+    :param validation_mode: The validation mode configured for the connector.
+    :param idempotency_key: The client supplied Idempotency-Key header, if provided.
     :return: a 200 status for completed processing or 500 status if an error occurred publishing to NATS
     """
     try:
-        publish_model = await process_data(request_model.data)
+        publish_models = await process_batch(
+            request_model.data, validation_mode, upstream_id=idempotency_key
+        )
+        publish_model = publish_models[0]
         logger.debug(
             f"Generated data id {publish_model.data_id} for {publish_model.content_type}"
         )
+
+        if publish_model.batch_id is None:
+            return RestEndpointResponse(
+                data_id=str(publish_model.data_id),
+                content_type=publish_model.content_type,
+                status="received",
+            )
+
         return RestEndpointResponse(
-            data_id=str(publish_model.data_id),
+            data_id=str(publish_model.batch_id),
+            data_ids=[str(m.data_id) for m in publish_models],
             content_type=publish_model.content_type,
             status="received",
         )
     except ValueError:
-        return RestEndpointResponse(data_id=str(uuid.uuid4()), status="failed")
+        return RestEndpointResponse(data_id=str(generate_data_id()), status="failed")
     except NoStreamResponseError:
         raise HTTPException(
             status_code=500, detail="An internal messaging error occurred"
         )
 
 
-def create_inbound_connector_route(url: str, http_method: str) -> APIRouter:
+def create_inbound_connector_route(
+    url: str,
+    http_method: str,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+) -> APIRouter:
     """
     Creates an API route for an inbound RestEndpoint connector.
 
     :param url: The target URL
     :param http_method: The http method to support
+    :param validation_mode: The validation mode applied to inbound data
     :return: Fast API APIRouter
     """
+
+    async def endpoint(
+        request_model: RestEndpointRequest,
+        idempotency_key: Optional[str] = Header(default=None),
+    ):
+        return await endpoint_template(request_model, validation_mode, idempotency_key)
+
     router = APIRouter(prefix=url)
     router_func = getattr(router, http_method)
-    router_func("", response_model=RestEndpointResponse)(endpoint_template)
+    router_func(
+        "", response_model=RestEndpointResponse, description=endpoint_template.__doc__
+    )(endpoint)
     return router
@@ -0,0 +1,102 @@
+"""
+routing.py
+
+Routes data messages to ingress subjects within HealthOS Core Messaging.
+
+By default, data messages are published to a single ingress subject. An ingress subject template distributes
+messages across subjects by content type and shard, so that downstream consumers may partition their work.
+A message's shard is derived from a stable hash of its routing key, so that messages with the same routing key
+are published to the same subject, in order.
+"""
+import zlib
+from typing import Optional
+
+from ..config.app import CoreAppMessaging
+from ..detect import ContentType
+from .processor import PublishDataModel
+
+# subject tokens used for the {content_type} placeholder
+CONTENT_TYPE_TOKENS = {
+    ContentType.ASC_X12: "x12",
+    ContentType.FHIR_JSON: "fhir",
+    ContentType.HL7_TEXT: "hl7v2",
+}
+UNKNOWN_CONTENT_TYPE_TOKEN = "unknown"
+
+
+def shard_for(routing_key: str, shard_count: int) -> int:
+    """
+    Returns the shard for a routing key.
+    The shard is stable across processes and restarts.
+
+    :param routing_key: The routing key
+    :param shard_count: The number of shards
+    :return: the shard number, from 0 to shard_count - 1
+    """
+    return zlib.crc32(routing_key.encode()) % shard_count
+
+
+def routing_key_for(
+    messaging_config: CoreAppMessaging,
+    publish_model: PublishDataModel,
+    upstream_key: Optional[str] = None,
+) -> str:
+    """
+    Returns the routing key for a data message, based on the configured routing key type.
+    Messages without the configured routing key are routed by their batch id, if applicable, or data id.
+
+    :param messaging_config: The core messaging configuration
+    :param publish_model: The data message
+    :param upstream_key: The key assigned to the data by the upstream system, if available
+    :return: the routing key
+    """
+    if messaging_config.ingress_routing_key == "upstream_key" and upstream_key:
+        return upstream_key
+
+    if (
+        messaging_config.ingress_routing_key in ("batch_id", "upstream_key")
+        and publish_model.batch_id is not None
+    ):
+        return str(publish_model.batch_id)
+
+    return str(publish_model.data_id)
+
+
+def ingress_subject(
+    messaging_config: CoreAppMessaging,
+    publish_model: PublishDataModel,
+    upstream_key: Optional[str] = None,
+) -> str:
+    """
+    Returns the ingress subject for a data message.
+
+    :param messaging_config: The core messaging configuration
+    :param publish_model: The data message
+    :param upstream_key: The key assigned to the data by the upstream system, if available
+    :return: the ingress subject
+    """
+    template = messaging_config.ingress_subject_template
+    if template is None:
+        return messaging_config.ingress_subject
+
+    routing_key = routing_key_for(messaging_config, publish_model, upstream_key)
+    return template.format(
+        content_type=CONTENT_TYPE_TOKENS.get(
+            publish_model.content_type, UNKNOWN_CONTENT_TYPE_TOKEN
+        ),
+        shard=shard_for(routing_key, messaging_config.ingress_shards),
+    )
+
+
+def ingress_stream_subject(messaging_config: CoreAppMessaging) -> str:
+    """
+    Returns the stream subject which captures each ingress subject.
+    Template placeholders are replaced with wildcards.
+
+    :param messaging_config: The core messaging configuration
+    :return: the stream subject
+    """
+    template = messaging_config.ingress_subject_template
+    if template is None:
+        return messaging_config.ingress_subject
+    return template.format(content_type="*", shard="*")
@@ -0,0 +1,392 @@
+"""
+spool.py
+
+A durable, disk backed spool for data messages which cannot be published to HealthOS Core Messaging.
+
+Messages are appended to segment files within the spool directory. Appends are synced to disk in groups, so that
+concurrent appends share a single fsync. A background task replays spooled messages, in the order they were
+spooled, once the core stream is reachable. Segments are removed once each of their messages is acknowledged.
+While the spool has pending messages, new messages are appended to the spool rather than published, so that
+they are published after the messages spooled before them.
+
+Messages are replayed at least once. A message may be published again if the service stops while its segment is
+replayed, which may be handled with stream deduplication.
+
+A replayed message which fails with an error other than an unreachable core stream, such as a message which
+exceeds the server's maximum payload, cannot be published by retrying. It is moved to the dead letter segment,
+so that it does not block the messages spooled after it, and is logged.
+"""
+import asyncio
+import json
+import logging
+import os
+import struct
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import nats.errors
+from nats.js import JetStreamContext
+from nats.js.errors import NoStreamResponseError
+
+logger = logging.getLogger(__name__)
+
+# publishing errors which indicate that the core stream is unreachable
+SPOOLED_ERRORS = (
+    NoStreamResponseError,
+    nats.errors.TimeoutError,
+    nats.errors.NoRespondersError,
+    nats.errors.ConnectionClosedError,
+    nats.errors.ConnectionReconnectingError,
+    nats.errors.OutboundBufferLimitError,
+)
+
+SEGMENT_SUFFIX = ".spool"
+
+# file containing messages which could not be replayed, in the segment record format
+DEAD_LETTER_SEGMENT = "dead-letter.segment"
+
+# record header: metadata length, payload length, CRC32 of the metadata and payload
+RECORD_HEADER = struct.Struct(">III")
+
+# a spooled message: subject, stream, payload, and headers
+SpooledMessage = Tuple[str, str, bytes, Optional[Dict[str, str]]]
+
+
+def _encode_record(
+    subject: str, stream: str, payload: bytes, headers: Optional[Dict[str, str]]
+) -> bytes:
+    """
+    Encodes a spooled message as a length prefixed, checksummed record.
+
+    :param subject: The NATS subject
+    :param stream: The NATS Jetstream stream name
+    :param payload: The message body
+    :param headers: The message headers, if any
+    :return: the encoded record
+    """
+    metadata = json.dumps(
+        {"subject": subject, "stream": stream, "headers": headers}
+    ).encode()
+    checksum = zlib.crc32(payload, zlib.crc32(metadata))
+    return (
+        RECORD_HEADER.pack(len(metadata), len(payload), checksum) + metadata + payload
+    )
+
+
+def read_segment(segment_path: str) -> Iterator[SpooledMessage]:
+    """
+    Reads the messages within a segment file.
+    Reading stops at a truncated or corrupt record, such as a record partially written prior to a crash.
+
+    :param segment_path: The segment file path
+    :return: iterator of spooled messages
+    """
+    with open(segment_path, "rb") as f:
+        while record_header := f.read(RECORD_HEADER.size):
+            if len(record_header) < RECORD_HEADER.size:
+                logger.warning(
+                    f"Truncated record header in spool segment {segment_path}"
+                )
+                return
+
+            metadata_length, payload_length, checksum = RECORD_HEADER.unpack(
+                record_header
+            )
+            metadata = f.read(metadata_length)
+            payload = f.read(payload_length)
+            if (
+                len(metadata) < metadata_length
+                or len(payload) < payload_length
+                or zlib.crc32(payload, zlib.crc32(metadata)) != checksum
+            ):
+                logger.warning(f"Invalid record in spool segment {segment_path}")
+                return
+
+            message_metadata = json.loads(metadata)
+            yield (
+                message_metadata["subject"],
+                message_metadata["stream"],
+                payload,
+                message_metadata["headers"],
+            )
+
+
+class Spool:
+    """
+    Appends messages to segment files, and replays them in order.
+    A segment is closed when it reaches its maximum size, or when replay begins.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 67_108_864,
+        sync_interval: float = 0.01,
+    ):
+        """
+        Configures the Spool instance, creating the directory if it does not exist.
+        Segments remaining from a previous run are replayed.
+
+        :param directory: The spool directory path
+        :param segment_max_bytes: The size, in bytes, at which a segment is closed
+        :param sync_interval: The time, in seconds, appends wait to share an fsync
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.sync_interval = sync_interval
+        os.makedirs(directory, exist_ok=True)
+
+        existing_segments = self.segments()
+        self._next_segment = (
+            int(os.path.basename(existing_segments[-1]).removesuffix(SEGMENT_SUFFIX))
+            + 1
+            if existing_segments
+            else 0
+        )
+        self._segment: Optional[BinaryIO] = None
+        self._segment_bytes = 0
+
+        self._sync_lock = asyncio.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+        self._sync_waiters: List[asyncio.Future] = []
+
+        # the number of messages replayed from the oldest segment
+        self._replay_position = 0
+
+        # tracks whether messages are spooled, so that publishers need not list the directory
+        self._pending = len(existing_segments) > 0
+
+    def segments(self) -> List[str]:
+        """Returns the segment file paths, oldest first"""
+        return sorted(
+            os.path.join(self.directory, f)
+            for f in os.listdir(self.directory)
+            if f.endswith(SEGMENT_SUFFIX)
+        )
+
+    @property
+    def pending(self) -> bool:
+        """Returns True if the spool contains messages which have not been replayed"""
+        return self._pending
+
+    async def append(
+        self,
+        subject: str,
+        stream: str,
+        payload: bytes,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Appends a message to the spool, returning once the message is synced to disk.
+
+        :param subject: The NATS subject
+        :param stream: The NATS Jetstream stream name
+        :param payload: The message body
+        :param headers: The message headers, if any
+        """
+        self._pending = True
+        if self._segment is None:
+            segment_path = os.path.join(
+                self.directory, f"{self._next_segment:020d}{SEGMENT_SUFFIX}"
+            )
+            self._segment = open(segment_path, "ab")
+            self._segment_bytes = 0
+            self._next_segment += 1
+
+        record = _encode_record(subject, stream, payload, headers)
+        self._segment.write(record)
+        self._segment_bytes += len(record)
+
+        sync_waiter = asyncio.get_running_loop().create_future()
+        self._sync_waiters.append(sync_waiter)
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync())
+        await sync_waiter
+
+    async def _sync(self):
+        """Syncs pending appends to disk after the sync interval, closing the segment if it is full"""
+        await asyncio.sleep(self.sync_interval)
+
+        async with self._sync_lock:
+            self._sync_task = None
+            sync_waiters, self._sync_waiters = self._sync_waiters, []
+            try:
+                await self._sync_segment()
+                if self._segment_bytes >= self.segment_max_bytes:
+                    self._close_segment()
+            except Exception as ex:
+                logger.error(f"Unable to sync spool segment {ex!r}")
+                for w in sync_waiters:
+                    w.set_exception(ex)
+                return
+
+        for w in sync_waiters:
+            w.set_result(None)
+
+    async def _sync_segment(self):
+        """Flushes and syncs the current segment"""
+        if self._segment is not None:
+            self._segment.flush()
+            await asyncio.to_thread(os.fsync, self._segment.fileno())
+
+    def _close_segment(self):
+        """
+        Syncs and closes the current segment. The next append opens a new segment.
+        The segment is synced within the event loop, so that appends made while a sync is in progress are
+        not lost when the segment is closed.
+        """
+        if self._segment is not None:
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._segment.close()
+            self._segment = None
+
+    async def rotate(self):
+        """Syncs and closes the current segment, so that each of its messages may be replayed"""
+        async with self._sync_lock:
+            self._close_segment()
+
+    async def close(self):
+        """Syncs pending appends and closes the current segment"""
+        if self._sync_task is not None:
+            await self._sync_task
+        await self.rotate()
+
+    def _dead_letter(
+        self,
+        subject: str,
+        stream: str,
+        payload: bytes,
+        headers: Optional[Dict[str, str]],
+    ):
+        """
+        Appends a message which could not be replayed to the dead letter segment.
+
+        :param subject: The NATS subject
+        :param stream: The NATS Jetstream stream name
+        :param payload: The message body
+        :param headers: The message headers, if any
+        """
+        dead_letter_path = os.path.join(self.directory, DEAD_LETTER_SEGMENT)
+        with open(dead_letter_path, "ab") as f:
+            f.write(_encode_record(subject, stream, payload, headers))
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def replay(self, core_client: JetStreamContext) -> int:
+        """
+        Publishes spooled messages in order, waiting for each message's Jetstream ack.
+        Messages appended while the spool is replayed are replayed in turn, until the spool is empty.
+        Replay stops at the first error which indicates the core stream is unreachable, and resumes from that
+        message when next called. Messages which fail with other errors are moved to the dead letter segment.
+
+        :param core_client: The core Jetstream client
+        :return: the number of messages replayed
+        """
+        replay_count = 0
+
+        while True:
+            await self.rotate()
+            segments = self.segments()
+            if not segments:
+                self._pending = False
+                return replay_count
+
+            for segment_path in segments:
+                for position, (subject, stream, payload, headers) in enumerate(
+                    read_segment(segment_path)
+                ):
+                    if position < self._replay_position:
+                        continue
+                    try:
+                        await core_client.publish(
+                            subject=subject,
+                            stream=stream,
+                            payload=payload,
+                            headers=headers,
+                        )
+                        replay_count += 1
+                    except SPOOLED_ERRORS:
+                        raise
+                    except Exception as ex:
+                        await asyncio.to_thread(
+                            self._dead_letter, subject, stream, payload, headers
+                        )
+                        logger.error(
+                            f"Moved spooled message for {subject} to {DEAD_LETTER_SEGMENT} {ex!r}"
+                        )
+                    self._replay_position = position + 1
+
+                os.remove(segment_path)
+                self._replay_position = 0
+                logger.info(f"Replayed spool segment {segment_path}")
+
+
+async def replay_spool_task(spool: Spool, replay_interval: float):
+    """
+    AsyncIO task used to replay spooled messages once the core stream is reachable.
+
+    :param spool: The spool
+    :param replay_interval: The time, in seconds, between replay attempts
+    """
+    # workaround for circular import
+    from .nats import get_jetstream_core_client
+
+    while True:
+        if spool.pending:
+            try:
+                replay_count = await spool.replay(get_jetstream_core_client())
+                logger.info(f"Replayed {replay_count} spooled messages")
+            except SPOOLED_ERRORS as ex:
+                logger.warning(f"Unable to replay spooled messages {ex!r}")
+            # other errors, such as spool file errors, are retried so that spooled messages are not abandoned
+            except Exception as ex:
+                logger.error(f"Exception occurred replaying spooled messages {ex!r}")
+        await asyncio.sleep(replay_interval)
+
+
+# spool used for core messaging
+core_spool: Spool | None = None
+
+
+async def create_core_spool(
+    directory: Optional[str],
+    segment_max_bytes: int,
+    sync_interval: float,
+    replay_interval: float,
+):
+    """
+    Creates the spool used for core messaging, and starts the task which replays spooled messages.
+
+    :param directory: The spool directory path. If None, messages are not spooled.
+    :param segment_max_bytes: The size, in bytes, at which a segment is closed
+    :param sync_interval: The time, in seconds, appends wait to share an fsync
+    :param replay_interval: The time, in seconds, between replay attempts
+    """
+    global core_spool
+
+    if directory is None:
+        core_spool = None
+        return
+
+    core_spool = Spool(directory, segment_max_bytes, sync_interval)
+    replay_task = asyncio.get_running_loop().create_task(
+        replay_spool_task(core_spool, replay_interval),
+        name="healthos_spool_replay",
+    )
+    logger.info(
+        f"Created core spool in {directory}, replay task {replay_task.get_name()}"
+    )
+
+
+def get_core_spool() -> Spool | None:
+    """Returns the spool used for core messaging, or None if spooling is disabled"""
+    global core_spool
+    return core_spool
+
+
+async def close_core_spool():
+    """Syncs and closes the spool used for core messaging"""
+    spool = get_core_spool()
+    if spool is not None:
+        await spool.close()
@@ -2,19 +2,59 @@
 detect.py
 Provides functions pertaining to message format detection and validation.
 """
+import hashlib
+import importlib
+import io
 import json
 import logging
+import pkgutil
+import re
+import time
+from collections import OrderedDict
 from enum import Enum
-from typing import Dict, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 
-import hl7
-from fhir.resources import construct_fhir_element
-from hl7 import ParseException
-from linuxforhealth.x12.io import X12ModelReader
-from pydantic import ValidationError
+from pydantic import BaseModel, Field, ValidationError
+
+# parsing libraries are imported on demand, or when pre-warmed, as their model trees are expensive to load
+if TYPE_CHECKING:
+    import hl7
 
 logger = logging.getLogger(__name__)
 
+# the number of leading bytes examined when detecting a message's content type
+SNIFF_WINDOW_SIZE = 1024
+
+# matches a FHIR resourceType key with a non-empty value
+FHIR_RESOURCE_TYPE_PATTERN = re.compile(rb'"resourceType"\s*:\s*"[^"\s]')
+FHIR_RESOURCE_TYPE_TEXT_PATTERN = re.compile(r'"resourceType"\s*:\s*"[^"\s]')
+
+# FHIR Bundles and X12 messages larger than this size are validated one component at a time
+STREAMING_THRESHOLD = 1_048_576
+FHIR_BUNDLE_PATTERN = re.compile(rb'"resourceType"\s*:\s*"Bundle"')
+
+# the ISA segment is fixed length, and conveys the X12 delimiters
+X12_ISA_SEGMENT_LENGTH = 106
+
+# HL7v2 segment names are three upper case alphanumeric characters
+HL7_SEGMENT_NAME_PATTERN = re.compile(r"[A-Z][A-Z0-9]{2}")
+HL7_SEGMENT_SEPARATOR_PATTERN = re.compile(r"[\r\n]+")
+
+# HL7v2 batch files start with a file header (FHS) or batch header (BHS) segment
+HL7_BATCH_HEADERS = (b"fhs", b"bhs")
+
 
 class ContentTypeError(Exception):
     """
@@ -49,10 +89,82 @@ class ContentType(str, Enum):
     # HL7_XML = "application/hl7v2+xml"]
 
 
-def detect_content_type(input_message: str) -> ContentType:
+class ValidationMode(str, Enum):
+    """
+    Supported validation modes, ordered from least to most strict.
+
+    - sniff: detects the content type only
+    - structural: checks message structure such as envelopes, segments and JSON well-formedness
+    - full: validates the message against its data model
+    """
+
+    SNIFF = "sniff"
+    STRUCTURAL = "structural"
+    FULL = "full"
+
+
+class ParsedMessage(BaseModel):
+    """
+    The result of a single detect and validate pass over an input message.
+
+    Downstream processing stages reuse the parsed representation and metadata rather than
+    parsing the input message again.
+    """
+
+    content_type: ContentType = Field(description="The message's content type")
+    parsed: Any = Field(
+        description="The parsed message. A dict for FHIR, a hl7.Message for HL7v2 and a list of "
+        + "transaction set models for X12. Structural validation parses HL7v2 and X12 messages into "
+        + "lists of segments. None if the message is sniffed or fails validation."
+    )
+    metadata: Dict[str, str] = Field(
+        default={},
+        description="Identifiers extracted from the message such as the FHIR resource type or the "
+        + "HL7v2 message control id.",
+    )
+    error: Optional[str] = Field(description="Contains message validation errors.")
+
+    class Config:
+        frozen = True
+
+
+def _sniff_prefix(input_message: str | bytes | memoryview) -> bytes:
+    """
+    Returns the leading bytes of an input message, up to SNIFF_WINDOW_SIZE, used for content type detection.
+
+    :param input_message: The message to analyze
+    :return: the message prefix as bytes
+    """
+    if isinstance(input_message, str):
+        return input_message[:SNIFF_WINDOW_SIZE].encode("utf-8", errors="replace")
+    return bytes(memoryview(input_message)[:SNIFF_WINDOW_SIZE])
+
+
+def _has_resource_type(input_message: str | bytes | memoryview, prefix: bytes) -> bool:
+    """
+    Returns True if a JSON message contains a non-empty resourceType.
+    The message prefix is searched first, since FHIR resources conventionally lead with resourceType.
+    Larger messages are searched in place, without decoding or copying the message.
+
+    :param input_message: The message to analyze
+    :param prefix: The message prefix
+    :return: True if the message contains a resourceType, otherwise False
+    """
+    if FHIR_RESOURCE_TYPE_PATTERN.search(prefix):
+        return True
+
+    if len(input_message) <= len(prefix):
+        return False
+
+    if isinstance(input_message, str):
+        return FHIR_RESOURCE_TYPE_TEXT_PATTERN.search(input_message) is not None
+    return FHIR_RESOURCE_TYPE_PATTERN.search(input_message) is not None
+
+
+def detect_content_type(input_message: str | bytes | memoryview) -> ContentType:
     """
     Returns the content type of the input message.
-    If the content type cannot be determined, a ValueError is raised.
+    Detection is limited to the message prefix, and does not decode the message.
     :param input_message: The message to analyze
     :return: ContentType
     :raises: ContentTypeError if the content type cannot be determined
@@ -62,16 +174,16 @@ def detect_content_type(input_message: str) -> ContentType:
         logger.error(msg)
         raise ContentTypeError(msg)
 
-    first_chars = input_message.lstrip()[0:3].lower()
+    prefix = _sniff_prefix(input_message)
+    first_chars = prefix.lstrip()[0:3].lower()
     content_type: ContentType | None = None
 
-    if first_chars.startswith("{"):
-        json_data: Dict = json.loads(input_message)
-        if json_data.get("resourceType"):
+    if first_chars.startswith(b"{"):
+        if _has_resource_type(input_message, prefix):
             content_type = ContentType.FHIR_JSON
-    elif first_chars.startswith("isa"):
+    elif first_chars.startswith(b"isa"):
         content_type = ContentType.ASC_X12
-    elif first_chars.startswith("msh"):
+    elif first_chars.startswith(b"msh") or first_chars in HL7_BATCH_HEADERS:
         content_type = ContentType.HL7_TEXT
 
     if content_type is None:
@@ -82,37 +194,877 @@ def detect_content_type(input_message: str) -> ContentType:
     return content_type
 
 
-def validate_message(input_message: str, content_type: Optional[ContentType] = None):
+def is_hl7_batch(input_message: str | bytes | memoryview) -> bool:
     """
-    Validates an input message based on it's detected content type.
-    :param input_message: The input message to validate
+    Returns True if the input message is a HL7v2 batch file, wrapped in FHS or BHS segments.
+    Detection is limited to the message prefix.
+
+    :param input_message: The message to analyze
+    :return: True if the message is a HL7v2 batch, otherwise False
+    """
+    first_chars = _sniff_prefix(input_message).lstrip()[0:3].lower()
+    return first_chars in HL7_BATCH_HEADERS
+
+
+def split_hl7_batch(input_message: str | bytes | memoryview) -> Iterator[str]:
+    """
+    Splits a HL7v2 batch file into its member messages.
+    File (FHS/FTS) and batch (BHS/BTS) segments are removed, and the message counts conveyed in BTS-1 and
+    FTS-1 are validated. Member message segments are separated with carriage returns.
+
+    :param input_message: The HL7v2 batch file
+    :return: iterator of HL7v2 messages, each starting with a MSH segment
+    :raises: DataValidationError if the batch structure is invalid, or the batch does not contain messages
+    """
+    message_segments: List[str] = []
+    message_count = 0
+    message_total = 0
+    batch_count = 0
+    field_separator: str | None = None
+
+    for line in HL7_SEGMENT_SEPARATOR_PATTERN.split(_decode(input_message).strip()):
+        segment_name = line[0:3]
+
+        if field_separator is None:
+            if segment_name not in ("FHS", "BHS") or len(line) < 4:
+                raise DataValidationError(
+                    "HL7v2 batch does not start with a FHS or BHS segment"
+                )
+            field_separator = line[3]
+
+        match segment_name:
+            case "MSH":
+                if message_segments:
+                    yield "\r".join(message_segments)
+                message_segments = [line]
+                message_count += 1
+                message_total += 1
+            case "FHS" | "BHS" | "BTS" | "FTS":
+                if message_segments:
+                    yield "\r".join(message_segments)
+                message_segments = []
+
+                trailer = line.split(field_separator)
+                if segment_name == "BHS":
+                    message_count = 0
+                    batch_count += 1
+                elif segment_name == "BTS":
+                    _hl7_count(trailer, message_count)
+                elif segment_name == "FTS":
+                    _hl7_count(trailer, batch_count)
+            case _:
+                if not message_segments:
+                    raise DataValidationError(
+                        f"HL7v2 batch segment {segment_name} precedes a MSH segment"
+                    )
+                message_segments.append(line)
+
+    if message_segments:
+        yield "\r".join(message_segments)
+
+    if message_total == 0:
+        raise DataValidationError("HL7v2 batch does not contain a MSH segment")
+
+
+def _hl7_count(trailer: List[str], expected_count: int):
+    """
+    Validates the count conveyed in a HL7v2 batch or file trailer segment.
+    The count is optional, and is not validated if it is not present.
+
+    :param trailer: The BTS or FTS segment fields
+    :param expected_count: The number of messages or batches read
+    :raises: DataValidationError if the count does not match
+    """
+    if len(trailer) < 2 or not trailer[1]:
+        return
+
+    if trailer[1] != str(expected_count):
+        raise DataValidationError(
+            f"{trailer[0]} count {trailer[1]} does not match {expected_count}"
+        )
+
+
+def _decode(input_message: str | bytes | memoryview) -> str:
+    """
+    Decodes a binary input message to a string.
+
+    :param input_message: The input message
+    :return: the input message as a string
+    :raises: UnicodeDecodeError if the message is not valid UTF-8
+    """
+    if isinstance(input_message, str):
+        return input_message
+    return bytes(input_message).decode("utf-8")
+
+
+def _x12_metadata(models: List) -> Dict[str, str]:
+    """
+    Returns metadata for a X12 message.
+    :param models: The X12 transaction set models
+    :return: dictionary containing the transaction set codes and the first transaction set control number
+    """
+    if not models:
+        return {}
+
+    st_segments = [m.header.st_segment for m in models]
+    return {
+        "transaction_set_codes": ",".join(
+            sorted({s.transaction_set_identifier_code for s in st_segments})
+        ),
+        "transaction_set_control_number": st_segments[0].transaction_set_control_number,
+    }
+
+
+def _hl7_metadata(hl7_message: "hl7.Message") -> Dict[str, str]:
+    """
+    Returns metadata for a HL7v2 message.
+    :param hl7_message: The parsed HL7v2 message
+    :return: dictionary containing the message type and message control id, if available
+    """
+    try:
+        msh_segment = hl7_message.segment("MSH")
+        return {
+            "message_type": str(msh_segment[9]),
+            "message_control_id": str(msh_segment[10]),
+        }
+    except (KeyError, IndexError):
+        return {}
+
+
+def _fhir_metadata(fhir_data: Dict) -> Dict[str, str]:
+    """
+    Returns metadata for a FHIR resource.
+    :param fhir_data: The FHIR resource data
+    :return: dictionary containing the resource type and resource id, if available
+    """
+    metadata = {"resource_type": fhir_data["resourceType"]}
+    if fhir_data.get("id"):
+        metadata["resource_id"] = str(fhir_data["id"])
+    return metadata
+
+
+def _x12_count(segment: List[str]) -> int:
+    """
+    Returns the count conveyed in the first element of a X12 trailer segment (SE, GE, IEA).
+
+    :param segment: The trailer segment
+    :return: the count
+    :raises: DataValidationError if the count is not numeric
+    """
+    if len(segment) < 2 or not segment[1].strip().isdigit():
+        raise DataValidationError(
+            f"{segment[0]} segment does not contain a valid count"
+        )
+    return int(segment[1])
+
+
+class X12EnvelopeValidator:
+    """
+    Validates the structure of a X12 interchange one segment at a time.
+    Validation includes envelope nesting, control numbers, and the segment, transaction set and functional
+    group counts conveyed in the SE, GE and IEA trailers.
+    """
+
+    def __init__(self):
+        """Configures the X12EnvelopeValidator instance"""
+        self.interchange_header: List[str] | None = None
+        self.group_header: List[str] | None = None
+        self.transaction_header: List[str] | None = None
+        self.group_count = 0
+        self.transaction_count = 0
+        self.segment_count = 0
+        self.is_complete = False
+
+    def validate_segment(self, segment: List[str]):
+        """
+        Validates the next segment within the interchange.
+
+        :param segment: The segment, as a list of elements
+        :raises: DataValidationError if the segment is not valid within the interchange structure
+        """
+        if self.interchange_header is None:
+            if segment[0] != "ISA":
+                raise DataValidationError(
+                    "X12 message does not start with an ISA segment"
+                )
+            self.interchange_header = segment
+            return
+
+        if self.is_complete:
+            raise DataValidationError(
+                f"{segment[0]} segment found after the IEA segment"
+            )
+
+        match segment[0]:
+            case "IEA":
+                if self.group_header is not None:
+                    raise DataValidationError(
+                        "X12 functional group is missing a GE segment"
+                    )
+                if _x12_count(segment) != self.group_count:
+                    raise DataValidationError(
+                        f"IEA segment {segment} does not match the functional group count {self.group_count}"
+                    )
+                self.is_complete = True
+            case "GS":
+                if self.group_header is not None:
+                    raise DataValidationError(
+                        "GS segment found within a functional group"
+                    )
+                self.group_header = segment
+                self.group_count += 1
+                self.transaction_count = 0
+            case "GE":
+                if self.group_header is None or self.transaction_header is not None:
+                    raise DataValidationError(
+                        "GE segment found outside of a functional group"
+                    )
+                if (
+                    _x12_count(segment) != self.transaction_count
+                    or segment[2] != self.group_header[6]
+                ):
+                    raise DataValidationError(
+                        f"GE segment {segment} does not match functional group {self.group_header[6]}"
+                    )
+                self.group_header = None
+            case "ST":
+                if self.group_header is None or self.transaction_header is not None:
+                    raise DataValidationError(
+                        "ST segment found outside of a functional group"
+                    )
+                self.transaction_header = segment
+                self.transaction_count += 1
+                self.segment_count = 1
+            case "SE":
+                if self.transaction_header is None:
+                    raise DataValidationError(
+                        "SE segment found outside of a transaction set"
+                    )
+                self.segment_count += 1
+                if (
+                    _x12_count(segment) != self.segment_count
+                    or segment[2] != self.transaction_header[2]
+                ):
+                    raise DataValidationError(
+                        f"SE segment {segment} does not match transaction set {self.transaction_header[2]} "
+                        + f"containing {self.segment_count} segments"
+                    )
+                self.transaction_header = None
+            case _:
+                if self.transaction_header is None:
+                    raise DataValidationError(
+                        f"{segment[0]} segment found outside of a transaction set"
+                    )
+                self.segment_count += 1
+
+    def finish(self):
+        """
+        Validates that the interchange is complete.
+
+        :raises: DataValidationError if the interchange is incomplete
+        """
+        if not self.is_complete:
+            raise DataValidationError("X12 message does not end with an IEA segment")
+
+
+def _parse_x12_structure(input_message: str) -> List[List[str]]:
+    """
+    Parses a X12 message into segments and validates the interchange structure.
+
+    :param input_message: The X12 message
+    :return: list of segments, where each segment is a list of elements
+    :raises: DataValidationError if the message structure is invalid
+    """
+    input_message = input_message.lstrip()
+    if len(input_message) < X12_ISA_SEGMENT_LENGTH:
+        raise DataValidationError("X12 message is shorter than the ISA segment")
+
+    element_separator = input_message[3]
+    segment_terminator = input_message[X12_ISA_SEGMENT_LENGTH - 1]
+
+    segments = [
+        s.strip().split(element_separator)
+        for s in input_message.split(segment_terminator)
+        if s.strip()
+    ]
+
+    envelope_validator = X12EnvelopeValidator()
+    for segment in segments:
+        envelope_validator.validate_segment(segment)
+    envelope_validator.finish()
+
+    return segments
+
+
+def _parse_hl7_structure(input_message: str) -> List[List[str]]:
+    """
+    Parses a HL7v2 message into segments and validates the segment structure.
+
+    :param input_message: The HL7v2 message
+    :return: list of segments, where each segment is a list of fields
+    :raises: DataValidationError if the message structure is invalid
+    """
+    lines = [s for s in re.split(r"[\r\n]+", input_message.strip()) if s]
+    if not lines or not lines[0].startswith("MSH") or len(lines[0]) < 8:
+        raise DataValidationError("HL7v2 message does not start with a MSH segment")
+
+    field_separator = lines[0][3]
+    segments = [line.split(field_separator) for line in lines]
+
+    for segment in segments:
+        if not HL7_SEGMENT_NAME_PATTERN.fullmatch(segment[0]):
+            raise DataValidationError(f"Invalid HL7v2 segment name {segment[0]}")
+
+    return segments
+
+
+def _parse_structure(
+    input_message: str | bytes | memoryview, content_type: ContentType
+) -> ParsedMessage:
+    """
+    Parses an input message and validates its structure without constructing data models.
+
+    :param input_message: The input message
+    :param content_type: The content type of the message
+    :return: ParsedMessage
+    :raises: DataValidationError if the message structure is invalid
+    """
+    match content_type:
+        case ContentType.ASC_X12:
+            parsed = _parse_x12_structure(_decode(input_message))
+            st_segments = [s for s in parsed if s[0] == "ST"]
+            metadata = {}
+            if st_segments:
+                metadata = {
+                    "transaction_set_codes": ",".join(
+                        sorted({s[1] for s in st_segments})
+                    ),
+                    "transaction_set_control_number": st_segments[0][2],
+                }
+
+        case ContentType.FHIR_JSON:
+            if isinstance(input_message, memoryview):
+                input_message = input_message.tobytes()
+            parsed = json.loads(input_message)
+            if not isinstance(parsed, dict) or not isinstance(
+                parsed.get("resourceType"), str
+            ):
+                raise DataValidationError(
+                    "FHIR resource does not contain a resourceType"
+                )
+            metadata = _fhir_metadata(parsed)
+
+        case ContentType.HL7_TEXT:
+            parsed = _parse_hl7_structure(_decode(input_message))
+            msh_segment = parsed[0]
+            metadata = {}
+            # MSH-1 is the field separator, so MSH fields are offset by one
+            if len(msh_segment) > 9:
+                metadata = {
+                    "message_type": msh_segment[8],
+                    "message_control_id": msh_segment[9],
+                }
+
+    return ParsedMessage(content_type=content_type, parsed=parsed, metadata=metadata)
+
+
+def _is_streamed(
+    input_message: str | bytes | memoryview, content_type: ContentType
+) -> bool:
+    """
+    Returns True if a message is validated one component at a time.
+    FHIR Bundles and X12 messages exceeding STREAMING_THRESHOLD are streamed.
+
+    :param input_message: The input message
+    :param content_type: The content type of the message
+    :return: True if the message is streamed, otherwise False
+    """
+    if len(input_message) <= STREAMING_THRESHOLD:
+        return False
+
+    match content_type:
+        case ContentType.ASC_X12:
+            return True
+        case ContentType.FHIR_JSON:
+            return FHIR_BUNDLE_PATTERN.search(_sniff_prefix(input_message)) is not None
+        case _:
+            return False
+
+
+def _parse_message_stream(
+    input_message: str | bytes | memoryview, content_type: ContentType
+) -> ParsedMessage:
+    """
+    Validates a FHIR Bundle one entry at a time, or a X12 message one transaction set at a time, without
+    constructing the message's complete object graph. The parsed representation is not retained.
+
+    :param input_message: The input message
+    :param content_type: The content type of the message
+    :return: ParsedMessage
+    """
+    # workaround for circular import
+    from .stream import (
+        TextSliceReader,
+        summarize_errors,
+        validate_fhir_bundle_stream,
+        validate_x12_stream,
+    )
+
+    if content_type == ContentType.FHIR_JSON:
+        # the allow-list is applied before the Bundle is streamed
+        get_fhir_model_registry().get_model("Bundle")
+
+    # the message is read in slices, rather than copied into a stream
+    if isinstance(input_message, str):
+        stream = TextSliceReader(input_message)
+    else:
+        stream = io.BytesIO(input_message)
+
+    if content_type == ContentType.ASC_X12:
+        result = validate_x12_stream(stream)
+        error = summarize_errors(result, "transaction set")
+    else:
+        result = validate_fhir_bundle_stream(stream)
+        error = summarize_errors(result, "entry")
+
+    return ParsedMessage(
+        content_type=content_type, metadata=result.metadata, error=error
+    )
+
+
+def parse_message(
+    input_message: str | bytes | memoryview,
+    content_type: Optional[ContentType] = None,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+) -> ParsedMessage:
+    """
+    Detects, parses and validates an input message in a single pass.
+    Validation errors are returned within the ParsedMessage rather than raised, so that the content type and
+    metadata remain available to the caller.
+
+    :param input_message: The input message to parse
     :param content_type: The content type of the message. If not provided, the content type will be detected.
-    :raises: ContentTypeError if the content type is unsupported or invalid.
-    :raises: DataValidationError if the content type cannot be detected, or if the message is invalid.
+    :param validation_mode: The validation mode. Defaults to full model validation.
+    :return: ParsedMessage
+    :raises: ContentTypeError if the content type cannot be detected.
     """
     if content_type is None:
-        content_type: ContentType = detect_content_type(input_message)
+        content_type = detect_content_type(input_message)
+
+    if validation_mode == ValidationMode.SNIFF:
+        return ParsedMessage(content_type=content_type)
 
     try:
+        if validation_mode == ValidationMode.STRUCTURAL:
+            return _parse_structure(input_message, content_type)
+
+        if _is_streamed(input_message, content_type):
+            return _parse_message_stream(input_message, content_type)
+
         match content_type:
             case ContentType.ASC_X12:
-                with X12ModelReader(input_message) as r:
-                    for _ in r.models():
-                        pass
+                from linuxforhealth.x12.io import X12ModelReader
+
+                with X12ModelReader(_decode(input_message)) as r:
+                    parsed = list(r.models())
+                metadata = _x12_metadata(parsed)
 
             case ContentType.FHIR_JSON:
-                fhir_data = json.loads(input_message)
-                resource_type = fhir_data.get("resourceType")
-                construct_fhir_element(resource_type, fhir_data)
+                if isinstance(input_message, memoryview):
+                    input_message = input_message.tobytes()
+                parsed = json.loads(input_message)
+                resource_type = parsed.get("resourceType")
+                get_fhir_model_registry().get_model(resource_type).parse_obj(parsed)
+                metadata = _fhir_metadata(parsed)
 
             case ContentType.HL7_TEXT:
-                hl7.parse(input_message)
+                import hl7
+
+                try:
+                    parsed = hl7.parse(_decode(input_message))
+                except hl7.ParseException as ex:
+                    raise DataValidationError(str(ex)) from ex
+                metadata = _hl7_metadata(parsed)
     # aggregate exception handling for the 3rd party model libraries
     # ValidationError is a catch-all for Pydantic based models (fhir, x12)
-    # ParseException is raised by the hl7 library
+    # DataValidationError wraps hl7 library ParseExceptions
     # KeyError and AttributeError are additional exceptions which may be raised by x12
-    except (ValidationError, ParseException, KeyError, AttributeError) as ex:
+    # JSONDecodeError and UnicodeDecodeError are raised for malformed input
+    # DataValidationError and IndexError are raised by structural validation
+    except (
+        DataValidationError,
+        IndexError,
+        ValidationError,
+        KeyError,
+        AttributeError,
+        json.JSONDecodeError,
+        UnicodeDecodeError,
+    ) as ex:
         logger.error(f"Unable to load {content_type} due to {ex}")
-        raise DataValidationError(str(ex))
+        return ParsedMessage(content_type=content_type, error=str(ex))
 
-    return content_type
+    return ParsedMessage(content_type=content_type, parsed=parsed, metadata=metadata)
+
+
+class FhirModelRegistry:
+    """
+    Resolves and caches the FHIR model classes used to validate FHIR resources.
+
+    Resource types may be limited to an allow-list, which applies to a message's top-level resourceType.
+    Unknown and disallowed resource types are rejected before any model classes are loaded.
+    """
+
+    # the resource type pre-warmed when an allow-list is not configured
+    DEFAULT_WARM_RESOURCE_TYPES = ("Bundle",)
+
+    def __init__(self, resource_types: Optional[Iterable[str]] = None):
+        """
+        Configures the FhirModelRegistry instance.
+
+        :param resource_types: The allowed resource types. Defaults to None, which allows all resource types.
+        """
+        self.resource_types: FrozenSet[str] | None = (
+            frozenset(resource_types) if resource_types else None
+        )
+        self._models: Dict[str, Type] = {}
+
+    def get_model(self, resource_type: Any) -> Type:
+        """
+        Returns the model class for a message's top-level resource type.
+
+        :param resource_type: The resource type
+        :return: the FHIR model class
+        :raises: DataValidationError if the resource type is invalid, unknown, or not allowed
+        """
+        if not isinstance(resource_type, str):
+            raise DataValidationError(f"Invalid FHIR resourceType {resource_type!r}")
+
+        if self.resource_types is not None and resource_type not in self.resource_types:
+            raise DataValidationError(
+                f"FHIR resource type {resource_type} is not supported"
+            )
+
+        return self.get_element_model(resource_type)
+
+    def get_element_model(self, type_name: Any) -> Type:
+        """
+        Returns the model class for a FHIR element or a nested resource, such as a Bundle entry and its
+        resource. The allow-list is not applied, as it applies only to a message's top-level resource type.
+
+        :param type_name: The element or resource type
+        :return: the FHIR model class
+        :raises: DataValidationError if the type is invalid or unknown
+        """
+        if not isinstance(type_name, str):
+            raise DataValidationError(f"Invalid FHIR resourceType {type_name!r}")
+
+        model = self._models.get(type_name)
+        if model is not None:
+            return model
+
+        from fhir.resources.fhirtypesvalidators import (
+            MODEL_CLASSES,
+            get_fhir_model_class,
+        )
+
+        if type_name not in MODEL_CLASSES:
+            raise DataValidationError(f"Unknown FHIR resource type {type_name}")
+
+        model = get_fhir_model_class(type_name)
+        self._models[type_name] = model
+        return model
+
+    def warm(self) -> int:
+        """
+        Resolves the model classes for the allowed resource types, including the element models used by their
+        fields. The fhir.resources library otherwise resolves element models when they are first validated.
+        The Bundle model is warmed if an allow-list is not configured.
+
+        :return: the number of resolved model classes
+        """
+        from fhir.resources.fhirtypes import AbstractType
+        from fhir.resources.fhirtypesvalidators import get_fhir_model_class
+
+        resolved: Set[str] = set()
+        models = [
+            self.get_model(r)
+            for r in sorted(self.resource_types or self.DEFAULT_WARM_RESOURCE_TYPES)
+        ]
+
+        while models:
+            model = models.pop()
+            for field in model.__fields__.values():
+                field_type = field.type_
+                if (
+                    isinstance(field_type, type)
+                    and issubclass(field_type, AbstractType)
+                    and field_type.fhir_type_name() not in resolved
+                ):
+                    resolved.add(field_type.fhir_type_name())
+                    models.append(get_fhir_model_class(field_type.fhir_type_name()))
+
+        return len(resolved)
+
+
+# resolves FHIR model classes, configured at startup
+fhir_model_registry = FhirModelRegistry()
+
+
+def configure_fhir_model_registry(resource_types: Optional[Iterable[str]] = None):
+    """
+    Configures the FHIR model registry.
+
+    :param resource_types: The allowed resource types. Defaults to None, which allows all resource types.
+    """
+    global fhir_model_registry
+
+    fhir_model_registry = FhirModelRegistry(resource_types)
+    if fhir_model_registry.resource_types is not None:
+        logger.info(
+            f"Configured FHIR resource types {sorted(fhir_model_registry.resource_types)}"
+        )
+
+
+def get_fhir_model_registry() -> FhirModelRegistry:
+    """Returns the FHIR model registry"""
+    global fhir_model_registry
+    return fhir_model_registry
+
+
+def _prewarm_x12():
+    """Loads the X12 parser and the transaction set models supported by the x12 library"""
+    import linuxforhealth.x12.io  # noqa: F401
+    import linuxforhealth.x12.v5010 as x12_v5010
+
+    for module_info in pkgutil.iter_modules(x12_v5010.__path__):
+        if module_info.ispkg and module_info.name.startswith("x12_"):
+            for module_name in ("transaction_set", "parsing"):
+                importlib.import_module(
+                    f"{x12_v5010.__name__}.{module_info.name}.{module_name}"
+                )
+
+
+def _prewarm_fhir():
+    """Resolves the FHIR model classes for the allowed resource types"""
+    model_count = get_fhir_model_registry().warm()
+    logger.debug(f"Resolved {model_count} FHIR element models")
+
+
+def _prewarm_hl7():
+    """Loads the HL7v2 parser"""
+    import hl7  # noqa: F401
+
+
+def prewarm(content_types: Iterable[ContentType | str]):
+    """
+    Loads the parsers and data models used to validate the specified content types.
+    Parsers are otherwise loaded on demand when the first message of a content type is validated. Pre-warming
+    moves this cost to service startup, and limits memory use to the content types the service accepts.
+
+    :param content_types: The content types to pre-warm
+    """
+    for content_type in content_types:
+        start_time = time.perf_counter()
+
+        match ContentType(content_type):
+            case ContentType.ASC_X12:
+                _prewarm_x12()
+            case ContentType.FHIR_JSON:
+                _prewarm_fhir()
+            case ContentType.HL7_TEXT:
+                _prewarm_hl7()
+
+        elapsed_time = time.perf_counter() - start_time
+        logger.info(f"Pre-warmed {content_type} parser in {elapsed_time:.3f}s")
+
+
+def validate_message(
+    input_message: str | bytes | memoryview,
+    content_type: Optional[ContentType] = None,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+):
+    """
+    Validates an input message based on it's detected content type.
+    :param input_message: The input message to validate
+    :param content_type: The content type of the message. If not provided, the content type will be detected.
+    :param validation_mode: The validation mode. Defaults to full model validation.
+    :raises: ContentTypeError if the content type is unsupported or invalid.
+    :raises: DataValidationError if the content type cannot be detected, or if the message is invalid.
+    """
+    parsed_message = parse_message(input_message, content_type, validation_mode)
+
+    if parsed_message.error is not None:
+        raise DataValidationError(parsed_message.error)
+
+    return parsed_message.content_type
+
+
+def content_hash(input_message: str | bytes | memoryview) -> str:
+    """
+    Returns a hash of the input message content, used to identify repeated messages.
+
+    :param input_message: The input message
+    :return: the hash as a hex string
+    """
+    if isinstance(input_message, str):
+        input_message = input_message.encode("utf-8")
+    return hashlib.blake2b(input_message, digest_size=16).hexdigest()
+
+
+class ValidationCache:
+    """
+    LRU cache of message validation outcomes keyed by a hash of the message content.
+    Cached outcomes include the content type, metadata and validation error. The parsed representation is
+    not cached.
+
+    Entries are evicted in least recently used order when the maximum number of entries or bytes is exceeded,
+    and expire after the configured time to live.
+    """
+
+    # approximate per entry overhead, in bytes, for the entry's key, timestamp and model
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        """
+        Configures the ValidationCache instance.
+
+        :param max_entries: The maximum number of cached outcomes.
+        :param max_bytes: The maximum approximate size, in bytes, of the cached outcomes.
+        :param ttl: The time to live, in seconds, for a cached outcome.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # maps a cache key to the entry's expiry time, size, and validation outcome
+        self._entries: OrderedDict[
+            str, Tuple[float, int, ParsedMessage]
+        ] = OrderedDict()
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Returns the number of cached entries"""
+        return len(self._entries)
+
+    @staticmethod
+    def key(
+        input_message: str | bytes | memoryview,
+        content_type: Optional[ContentType] = None,
+        validation_mode: ValidationMode = ValidationMode.FULL,
+    ) -> str:
+        """
+        Returns the cache key for an input message.
+
+        :param input_message: The input message
+        :param content_type: The content type the message is validated against, if provided.
+        :param validation_mode: The validation mode applied to the message.
+        :return: the cache key
+        """
+        key = f"{validation_mode.value}:{content_hash(input_message)}"
+        return f"{content_type.value}:{key}" if content_type else key
+
+    def get(self, key: str) -> Optional[ParsedMessage]:
+        """
+        Returns the cached validation outcome for a key, or None if the key is not cached.
+
+        :param key: The cache key
+        :return: ParsedMessage or None
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, size, parsed_message = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return parsed_message
+
+    def put(self, key: str, parsed_message: ParsedMessage):
+        """
+        Caches a validation outcome, evicting least recently used entries if the cache is full.
+
+        :param key: The cache key
+        :param parsed_message: The validation outcome
+        """
+        if parsed_message.parsed is not None:
+            parsed_message = parsed_message.copy(update={"parsed": None})
+
+        size = self.ENTRY_OVERHEAD + len(key) + len(parsed_message.error or "")
+        size += sum(len(k) + len(v) for k, v in parsed_message.metadata.items())
+
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl, size, parsed_message)
+        self._size += size
+
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        """
+        Removes a cache entry.
+
+        :param key: The cache key
+        """
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def clear(self):
+        """Removes all cached entries"""
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache's counters and current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+
+# cache used for validation outcomes, None if caching is disabled
+validation_cache: ValidationCache | None = None
+
+
+def configure_validation_cache(max_entries: int, max_bytes: int, ttl: float):
+    """
+    Configures the validation cache. Caching is disabled if max_entries is 0.
+
+    :param max_entries: The maximum number of cached outcomes.
+    :param max_bytes: The maximum approximate size, in bytes, of the cached outcomes.
+    :param ttl: The time to live, in seconds, for a cached outcome.
+    """
+    global validation_cache
+
+    if max_entries == 0:
+        validation_cache = None
+        return
+
+    validation_cache = ValidationCache(max_entries, max_bytes, ttl)
+    logger.info(f"Configured validation cache with {max_entries} entries")
+
+
+def get_validation_cache() -> ValidationCache | None:
+    """Returns the validation cache, or None if caching is disabled"""
+    global validation_cache
+    return validation_cache
@@ -0,0 +1,214 @@
+"""
+executor.py
+
+Provides the process pool used to validate data messages outside of the core service's event loop.
+Message validation is CPU bound. Running validation within worker processes keeps large messages from
+stalling the event loop shared by the Admin API and the core service connectors.
+
+A worker process which exits unexpectedly, such as when it runs out of memory validating a very large message,
+breaks the process pool. The process pool is then recreated, and the messages submitted to the broken pool
+are returned with an error.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, List, Optional
+
+from .detect import (
+    ContentType,
+    ParsedMessage,
+    ValidationMode,
+    configure_fhir_model_registry,
+    detect_content_type,
+    get_validation_cache,
+    parse_message,
+    prewarm,
+)
+
+logger = logging.getLogger(__name__)
+
+# process pool used for validation, None if validation runs within the event loop
+validation_executor: ProcessPoolExecutor | None = None
+
+# creates the validation process pool, used to replace a broken process pool
+validation_executor_factory: Callable[[], ProcessPoolExecutor] | None = None
+
+# bounds the number of messages submitted to the process pool
+validation_slots: asyncio.Semaphore | None = None
+
+
+def create_validation_executor(
+    max_workers: int,
+    max_pending: int,
+    prewarm_content_types: Optional[List[str]] = None,
+    fhir_resource_types: Optional[List[str]] = None,
+):
+    """
+    Creates the process pool used to validate data messages.
+    A process pool is not created if max_workers is 0.
+
+    :param max_workers: The number of worker processes.
+    :param max_pending: The maximum number of messages submitted to the process pool at one time.
+    :param prewarm_content_types: The content types pre-warmed when a worker process starts.
+    :param fhir_resource_types: The FHIR resource types accepted by the worker processes.
+    """
+    global validation_executor
+    global validation_executor_factory
+    global validation_slots
+
+    if max_workers == 0:
+        logger.info("Validating data messages within the core service event loop")
+        return
+
+    # worker processes are spawned, rather than forked, since the core service runs threads
+    validation_executor_factory = partial(
+        ProcessPoolExecutor,
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_initialize_worker,
+        initargs=(prewarm_content_types or [], fhir_resource_types or []),
+    )
+    validation_executor = validation_executor_factory()
+    validation_slots = asyncio.Semaphore(max_pending)
+    logger.info(f"Created validation process pool with {max_workers} workers")
+
+
+def get_validation_executor() -> ProcessPoolExecutor | None:
+    """Returns the validation process pool, or None if validation runs within the event loop"""
+    global validation_executor
+    return validation_executor
+
+
+def shutdown_validation_executor():
+    """Shuts down the validation process pool, if it exists"""
+    global validation_executor
+    global validation_executor_factory
+    global validation_slots
+
+    if validation_executor is not None:
+        logger.info("Shutting down validation process pool")
+        validation_executor.shutdown(wait=True, cancel_futures=True)
+
+    validation_executor = None
+    validation_executor_factory = None
+    validation_slots = None
+
+
+def _replace_broken_executor(broken_executor: ProcessPoolExecutor):
+    """
+    Replaces a broken validation process pool with a new process pool.
+    The process pool is replaced once, by the first caller to find it broken.
+
+    :param broken_executor: The broken process pool
+    """
+    global validation_executor
+
+    if validation_executor is not broken_executor:
+        return
+
+    logger.error("Validation process pool is broken, creating a new process pool")
+    broken_executor.shutdown(wait=False, cancel_futures=True)
+    validation_executor = validation_executor_factory()
+
+
+def _initialize_worker(
+    prewarm_content_types: List[str], fhir_resource_types: List[str]
+):
+    """
+    Initializes a worker process, applying the core service's validation settings.
+
+    :param prewarm_content_types: The content types to pre-warm.
+    :param fhir_resource_types: The FHIR resource types accepted for validation.
+    """
+    configure_fhir_model_registry(fhir_resource_types)
+    prewarm(prewarm_content_types)
+
+
+def _parse_message_worker(
+    input_message: str | bytes,
+    content_type: ContentType,
+    validation_mode: ValidationMode,
+) -> ParsedMessage:
+    """
+    Parses a message within a worker process.
+    The parsed representation is dropped to avoid pickling large object graphs back to the event loop.
+
+    :param input_message: The input message to parse
+    :param content_type: The content type of the message
+    :param validation_mode: The validation mode
+    :return: ParsedMessage without the parsed representation
+    """
+    parsed_message = parse_message(input_message, content_type, validation_mode)
+    return parsed_message.copy(update={"parsed": None})
+
+
+async def submit_parse_message(
+    input_message: str | bytes | memoryview,
+    content_type: Optional[ContentType] = None,
+    validation_mode: ValidationMode = ValidationMode.FULL,
+) -> ParsedMessage:
+    """
+    Parses and validates a message using the validation process pool.
+    Callers wait for a submission slot if the maximum number of pending messages has been reached.
+    The message is parsed within the event loop if a process pool has not been created.
+
+    Messages with a cached validation outcome are not parsed. Cached outcomes do not include the parsed
+    representation. Sniffed messages are neither cached nor submitted to the process pool.
+
+    :param input_message: The input message to parse
+    :param content_type: The content type of the message. If not provided, the content type will be detected.
+    :param validation_mode: The validation mode. Defaults to full model validation.
+    :return: ParsedMessage, with an error if the process pool breaks while the message is validated.
+    :raises: ContentTypeError if the content type cannot be detected.
+    """
+    global validation_slots
+
+    if validation_mode == ValidationMode.SNIFF:
+        return parse_message(input_message, content_type, validation_mode)
+
+    executor = get_validation_executor()
+    cache = get_validation_cache()
+
+    cache_key: str | None = None
+    if cache is not None:
+        cache_key = cache.key(input_message, content_type, validation_mode)
+        parsed_message = cache.get(cache_key)
+        if parsed_message is not None:
+            return parsed_message
+
+    if executor is None:
+        parsed_message = parse_message(input_message, content_type, validation_mode)
+    else:
+        # content type detection is inexpensive, and avoids submitting undetectable messages to the pool
+        if content_type is None:
+            content_type = detect_content_type(input_message)
+
+        if isinstance(input_message, memoryview):
+            input_message = input_message.tobytes()
+
+        async with validation_slots:
+            # the process pool may have been replaced while waiting for a slot
+            executor = get_validation_executor()
+            try:
+                parsed_message = await asyncio.get_running_loop().run_in_executor(
+                    executor,
+                    _parse_message_worker,
+                    input_message,
+                    content_type,
+                    validation_mode,
+                )
+            except BrokenProcessPool as ex:
+                # the message is not retried, as it may have caused the worker process to exit
+                _replace_broken_executor(executor)
+                return ParsedMessage(
+                    content_type=content_type,
+                    error=f"Validation worker process exited unexpectedly {ex}",
+                )
+
+    if cache is not None:
+        cache.put(cache_key, parsed_message)
+
+    return parsed_message
@@ -0,0 +1,112 @@
+"""
+ids.py
+
+Generates the unique ids assigned to HealthOS data messages.
+Ids are time-ordered UUIDv7 values (RFC 9562), so that ids generated later sort after earlier ids. This provides
+index locality for downstream stores.
+"""
+import os
+import threading
+import time
+import uuid
+
+# the number of random bytes read from the operating system at a time
+RANDOM_BUFFER_SIZE = 4096
+
+# UUIDv7 layout: 48 bit unix timestamp (ms), 4 bit version, 12 bit counter, 2 bit variant, 62 bits random
+UUID_VERSION_BITS = 0x7 << 76
+UUID_VARIANT_BITS = 0x2 << 62
+COUNTER_MAX = 0xFFF
+RANDOM_MASK = (1 << 62) - 1
+
+
+class DataIdGenerator:
+    """
+    Generates monotonic UUIDv7 ids.
+
+    Ids generated within the same millisecond are ordered using a 12 bit counter, which is seeded with a random
+    value at each new millisecond. If the counter is exhausted, or the system clock moves backwards, the
+    timestamp of the previous id is advanced so that ids remain ordered. Random bits are read from the
+    operating system in batches to reduce system calls.
+    """
+
+    def __init__(self):
+        """Configures the DataIdGenerator instance"""
+        self._lock = threading.Lock()
+        self._last_timestamp = 0
+        self._counter = 0
+        self._random_buffer = b""
+        self._random_offset = 0
+
+    def _random_bits(self, byte_count: int) -> int:
+        """
+        Returns random bits from the buffered random bytes, refilling the buffer as needed.
+
+        :param byte_count: The number of random bytes
+        :return: the random bytes as an integer
+        """
+        if self._random_offset + byte_count > len(self._random_buffer):
+            self._random_buffer = os.urandom(RANDOM_BUFFER_SIZE)
+            self._random_offset = 0
+
+        start = self._random_offset
+        self._random_offset += byte_count
+        return int.from_bytes(self._random_buffer[start : self._random_offset], "big")
+
+    def reset(self):
+        """Discards buffered random bytes. Used to ensure that forked processes do not share random values."""
+        with self._lock:
+            self._random_buffer = b""
+            self._random_offset = 0
+
+    def generate(self) -> uuid.UUID:
+        """
+        Returns a new id.
+
+        :return: UUIDv7
+        """
+        with self._lock:
+            timestamp = time.time_ns() // 1_000_000
+
+            if timestamp > self._last_timestamp:
+                self._last_timestamp = timestamp
+                # the counter's leading bit is clear, leaving room for increments within the millisecond
+                self._counter = self._random_bits(2) & (COUNTER_MAX >> 1)
+            elif self._counter < COUNTER_MAX:
+                self._counter += 1
+            else:
+                self._last_timestamp += 1
+                self._counter = 0
+
+            random_bits = self._random_bits(8) & RANDOM_MASK
+
+            value = (
+                (self._last_timestamp << 80)
+                | UUID_VERSION_BITS
+                | (self._counter << 64)
+                | UUID_VARIANT_BITS
+                | random_bits
+            )
+        return uuid.UUID(int=value)
+
+
+# generates data ids for the current process
+data_id_generator = DataIdGenerator()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=data_id_generator.reset)
+
+
+def generate_data_id() -> uuid.UUID:
+    """Returns a new time-ordered data id"""
+    return data_id_generator.generate()
+
+
+def data_id_timestamp(data_id: uuid.UUID) -> float:
+    """
+    Returns the unix timestamp, in seconds, encoded within a data id.
+
+    :param data_id: The UUIDv7 data id
+    :return: the unix timestamp
+    """
+    return (data_id.int >> 80) / 1000
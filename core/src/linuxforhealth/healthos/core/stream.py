@@ -0,0 +1,559 @@
+"""
+stream.py
+Provides functions used to validate large messages incrementally.
+Messages are read from a stream and validated one component at a time, so that peak memory use is bounded by
+the largest component rather than the entire message.
+"""
+import codecs
+import json
+import logging
+from typing import IO, Any, Dict, Iterator, List, Optional, Type
+
+from pydantic import BaseModel, Field, ValidationError
+
+from .detect import (
+    X12_ISA_SEGMENT_LENGTH,
+    ContentType,
+    DataValidationError,
+    FhirModelRegistry,
+    X12EnvelopeValidator,
+    get_fhir_model_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+# the default number of characters or bytes read from a stream at a time
+STREAM_CHUNK_SIZE = 65_536
+
+# the maximum number of component errors included in an error summary
+MAX_SUMMARIZED_ERRORS = 10
+
+
+class ItemValidationResult(BaseModel):
+    """
+    The validation outcome for a single component of a streamed message, such as a FHIR Bundle entry.
+    """
+
+    index: int = Field(
+        description="The component's zero based position within the message"
+    )
+    id: Optional[str] = Field(description="Identifies the component within the message")
+    error: Optional[str] = Field(description="Contains validation errors.")
+
+
+class StreamValidationResult(BaseModel):
+    """
+    The validation outcome for a streamed message.
+    Only failed components are retained, to keep the result's size independent of the message size.
+    """
+
+    content_type: ContentType = Field(description="The message's content type")
+    item_count: int = Field(default=0, description="The number of components validated")
+    errors: List[ItemValidationResult] = Field(
+        default=[], description="Validation results for the components which failed"
+    )
+    error: Optional[str] = Field(
+        description="Contains errors which apply to the message as a whole, such as malformed envelopes."
+    )
+    metadata: Dict[str, str] = Field(
+        default={}, description="Identifiers extracted from the message"
+    )
+
+    @property
+    def is_valid(self) -> bool:
+        """Returns True if the message and each of its components are valid"""
+        return self.error is None and not self.errors
+
+
+class TextSliceReader:
+    """
+    Reads a string as a text stream, one slice at a time.
+
+    Unlike io.StringIO, the string is not copied, so a large message is held in memory only once.
+    """
+
+    def __init__(self, text: str):
+        """
+        Configures the TextSliceReader instance.
+
+        :param text: The text to read
+        """
+        self._text = text
+        self._position = 0
+
+    def read(self, size: int = -1) -> str:
+        """
+        Reads the next slice of text.
+
+        :param size: The maximum number of characters to read. Reads the remaining text if negative.
+        :return: the text read, or an empty string if the text is exhausted
+        """
+        start = self._position
+        end = len(self._text) if size < 0 else min(start + size, len(self._text))
+        self._position = end
+        return self._text[start:end]
+
+
+class JsonStreamReader:
+    """
+    Reads JSON values incrementally from a text or binary stream.
+
+    The reader buffers the stream only until the next value is complete, so a large JSON document may be
+    walked one value at a time.
+    """
+
+    def __init__(self, stream: IO, chunk_size: int = STREAM_CHUNK_SIZE):
+        """
+        Configures the JsonStreamReader instance.
+
+        :param stream: The text or binary stream containing the JSON document.
+        :param chunk_size: The number of characters or bytes to read from the stream at a time.
+        """
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        """
+        Appends data from the stream to the buffer, discarding data which has been consumed.
+
+        :param size: The number of characters or bytes to read
+        :return: True if data was read, False if the stream is exhausted
+        """
+        if self._eof:
+            return False
+
+        data = self._stream.read(size)
+        if not data:
+            self._eof = True
+
+        if isinstance(data, bytes):
+            # a multi-byte character split across reads is decoded once it is complete
+            data = self._text_decoder.decode(data, final=self._eof)
+
+        self._buffer = self._buffer[self._position :] + data
+        self._position = 0
+        return not self._eof
+
+    def peek(self) -> str:
+        """
+        Returns the next non-whitespace character without consuming it.
+
+        :return: the next character, or an empty string if the stream is exhausted
+        """
+        while True:
+            while self._position < len(self._buffer):
+                if not self._buffer[self._position].isspace():
+                    return self._buffer[self._position]
+                self._position += 1
+
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """
+        Consumes the next non-whitespace character, which must be one of the expected characters.
+
+        :param characters: The expected characters
+        :return: the consumed character
+        :raises: DataValidationError if the next character is not expected
+        """
+        next_character = self.peek()
+        if not next_character or next_character not in characters:
+            raise DataValidationError(
+                f"Expected one of {characters!r}, found {next_character!r}"
+            )
+        self._position += 1
+        return next_character
+
+    def read_value(self) -> Any:
+        """
+        Reads and decodes the next JSON value.
+
+        :return: the decoded value
+        :raises: DataValidationError if the value is not valid JSON
+        """
+        self.peek()
+        read_size = self._chunk_size
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as ex:
+                if not self._fill(read_size):
+                    raise DataValidationError(str(ex))
+            else:
+                # a number or literal at the end of the buffer may continue in the stream
+                if end < len(self._buffer) or not self._fill(read_size):
+                    self._position = end
+                    return value
+
+            # grow reads geometrically so that large values are not re-scanned many times
+            read_size = max(read_size, len(self._buffer) - self._position)
+
+
+def _entry_id(entry: Any) -> Optional[str]:
+    """
+    Returns an identifier for a Bundle entry.
+
+    :param entry: The bundle entry
+    :return: The resource type and id, the full url, or None
+    """
+    if not isinstance(entry, dict):
+        return None
+
+    resource = entry.get("resource")
+    if isinstance(resource, dict) and resource.get("resourceType"):
+        resource_id = resource.get("id")
+        resource_type = resource["resourceType"]
+        return f"{resource_type}/{resource_id}" if resource_id else resource_type
+
+    return entry.get("fullUrl")
+
+
+def _validate_bundle_entry(
+    registry: FhirModelRegistry, entry_model: Type, entry: Any
+) -> None:
+    """
+    Validates a Bundle entry, resolving the model for the entry's resource through the FHIR model registry.
+
+    :param registry: The FHIR model registry
+    :param entry_model: The BundleEntry model class
+    :param entry: The bundle entry
+    :raises: DataValidationError if the entry is not an object, or its resource type is invalid or unknown
+    :raises: ValidationError if the entry or its resource is invalid
+    """
+    if not isinstance(entry, dict):
+        raise DataValidationError(f"Expected a Bundle entry object, found {entry!r}")
+
+    resource = entry.get("resource")
+    if resource is None:
+        entry_model.parse_obj(entry)
+        return
+
+    if not isinstance(resource, dict):
+        raise DataValidationError(
+            f"Expected a FHIR resource object, found {resource!r}"
+        )
+
+    # the resource is validated once, by its own model, rather than again within the entry
+    registry.get_element_model(resource.get("resourceType")).parse_obj(resource)
+    entry_model.parse_obj({k: v for k, v in entry.items() if k != "resource"})
+
+
+def iter_fhir_bundle_entries(
+    reader: JsonStreamReader, bundle_fields: Dict
+) -> Iterator[ItemValidationResult]:
+    """
+    Validates the entries within a FHIR Bundle stream, one entry at a time.
+    Bundle fields other than entry are added to bundle_fields as they are read.
+
+    :param reader: The JSON stream reader, positioned at the start of the Bundle.
+    :param bundle_fields: Receives the Bundle's fields, excluding entries.
+    :return: iterator of entry validation results
+    :raises: DataValidationError if the Bundle is malformed
+    """
+    registry = get_fhir_model_registry()
+    entry_model = registry.get_element_model("BundleEntry")
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        return
+
+    index = 0
+    while True:
+        key = reader.read_value()
+        if not isinstance(key, str):
+            raise DataValidationError(f"Expected a JSON object key, found {key!r}")
+        reader.expect(":")
+
+        if key == "entry":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    entry = reader.read_value()
+                    try:
+                        _validate_bundle_entry(registry, entry_model, entry)
+                    except (
+                        DataValidationError,
+                        ValidationError,
+                        KeyError,
+                        AttributeError,
+                    ) as ex:
+                        yield ItemValidationResult(
+                            index=index, id=_entry_id(entry), error=str(ex)
+                        )
+                    else:
+                        yield ItemValidationResult(index=index, id=_entry_id(entry))
+
+                    index += 1
+                    if reader.expect(",]") == "]":
+                        break
+        else:
+            bundle_fields[key] = reader.read_value()
+
+        if reader.expect(",}") == "}":
+            break
+
+
+def validate_fhir_bundle_stream(
+    stream: IO, chunk_size: int = STREAM_CHUNK_SIZE
+) -> StreamValidationResult:
+    """
+    Validates a FHIR Bundle from a stream, one entry at a time.
+    The Bundle's entries are validated individually, and the remaining Bundle fields are validated once the
+    stream is exhausted. Peak memory use is bounded by the largest entry. Models are resolved through the FHIR
+    model registry, so a Bundle is rejected if the Bundle resource type is not allowed.
+
+    :param stream: The text or binary stream containing the FHIR Bundle
+    :param chunk_size: The number of characters or bytes to read from the stream at a time.
+    :return: StreamValidationResult
+    """
+    reader = JsonStreamReader(stream, chunk_size)
+    bundle_fields = {}
+    item_count = 0
+    errors: List[ItemValidationResult] = []
+    error: Optional[str] = None
+
+    try:
+        bundle_model = get_fhir_model_registry().get_model("Bundle")
+
+        for item in iter_fhir_bundle_entries(reader, bundle_fields):
+            item_count += 1
+            if item.error is not None:
+                errors.append(item)
+
+        if reader.peek():
+            raise DataValidationError("Unexpected data after the end of the Bundle")
+
+        if bundle_fields.get("resourceType") != "Bundle":
+            raise DataValidationError("FHIR resource is not a Bundle")
+
+        bundle_model.parse_obj(bundle_fields)
+    except (DataValidationError, ValidationError) as ex:
+        logger.error(f"Unable to load FHIR Bundle due to {ex}")
+        error = str(ex)
+
+    metadata = {"resource_type": "Bundle"}
+    if bundle_fields.get("id"):
+        metadata["resource_id"] = str(bundle_fields["id"])
+
+    return StreamValidationResult(
+        content_type=ContentType.FHIR_JSON,
+        item_count=item_count,
+        errors=errors,
+        error=error,
+        metadata=metadata,
+    )
+
+
+def _iter_text(stream: IO, chunk_size: int) -> Iterator[str]:
+    """
+    Reads text from a text or binary stream, one chunk at a time.
+
+    :param stream: The text or binary stream
+    :param chunk_size: The number of characters or bytes to read from the stream at a time.
+    :return: iterator of text chunks
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    while True:
+        data = stream.read(chunk_size)
+        text = data
+        if isinstance(data, bytes):
+            text = text_decoder.decode(data, final=not data)
+
+        if text:
+            yield text
+        if not data:
+            return
+
+
+class X12StreamReader:
+    """
+    Reads X12 segments from a text or binary stream, one segment at a time.
+    Delimiters are parsed from the ISA segment, which is conveyed in the first 106 characters of the stream.
+    """
+
+    def __init__(self, stream: IO, chunk_size: int = STREAM_CHUNK_SIZE):
+        """
+        Configures the X12StreamReader instance.
+
+        :param stream: The text or binary stream containing the X12 message.
+        :param chunk_size: The number of characters or bytes to read from the stream at a time.
+        """
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self.element_separator: str | None = None
+        self.segment_terminator: str | None = None
+
+    def segments(self) -> Iterator[List[str]]:
+        """
+        Returns the stream's segments.
+
+        :return: iterator of segments, where each segment is a list of elements
+        :raises: DataValidationError if the stream does not contain an ISA segment
+        """
+        buffer = ""
+
+        for text in _iter_text(self._stream, self._chunk_size):
+            buffer += text
+
+            if self.segment_terminator is None:
+                buffer = buffer.lstrip()
+                if len(buffer) < X12_ISA_SEGMENT_LENGTH:
+                    continue
+                self.element_separator = buffer[3]
+                self.segment_terminator = buffer[X12_ISA_SEGMENT_LENGTH - 1]
+
+            *segments, buffer = buffer.split(self.segment_terminator)
+            for segment in segments:
+                segment = segment.strip()
+                if segment:
+                    yield segment.split(self.element_separator)
+
+        if self.segment_terminator is None:
+            raise DataValidationError("X12 message is shorter than the ISA segment")
+
+        if buffer.strip():
+            yield buffer.strip().split(self.element_separator)
+
+
+def _validate_x12_transaction(
+    reader: X12StreamReader,
+    envelope_validator: X12EnvelopeValidator,
+    transaction_segments: List[List[str]],
+    index: int,
+) -> ItemValidationResult:
+    """
+    Validates a single X12 transaction set against its data model.
+    The transaction set is wrapped within the current interchange and functional group headers so that it may
+    be parsed independently of the other transaction sets within the stream.
+
+    :param reader: The X12 stream reader, used to provide message delimiters.
+    :param envelope_validator: The envelope validator, used to provide the current ISA and GS segments.
+    :param transaction_segments: The transaction set segments, from ST through SE.
+    :param index: The transaction set's zero based position within the stream.
+    :return: ItemValidationResult
+    """
+    # model packages are imported when first used, rather than when the module is loaded
+    from linuxforhealth.x12.io import X12ModelReader
+
+    interchange_header = envelope_validator.interchange_header
+    group_header = envelope_validator.group_header
+    segments = [
+        interchange_header,
+        group_header,
+        *transaction_segments,
+        ["GE", "1", group_header[6]],
+        ["IEA", "1", interchange_header[13]],
+    ]
+    x12_message = "".join(
+        reader.element_separator.join(s) + reader.segment_terminator for s in segments
+    )
+
+    st_segment = transaction_segments[0]
+    transaction_id = f"{st_segment[1]}/{st_segment[2]}"
+
+    try:
+        with X12ModelReader(x12_message) as r:
+            for _ in r.models():
+                pass
+    # aggregate exception handling for the x12 library, aligned with detect.parse_message
+    except (ValidationError, KeyError, AttributeError, IndexError) as ex:
+        return ItemValidationResult(index=index, id=transaction_id, error=str(ex))
+
+    return ItemValidationResult(index=index, id=transaction_id)
+
+
+def validate_x12_stream(
+    stream: IO, chunk_size: int = STREAM_CHUNK_SIZE
+) -> StreamValidationResult:
+    """
+    Validates a X12 interchange from a stream, one transaction set at a time.
+    The interchange envelope is validated as segments are read, and validation stops at the first envelope
+    error. Each transaction set is validated against its data model once its SE segment is read, so peak
+    memory use is bounded by the largest transaction set.
+
+    :param stream: The text or binary stream containing the X12 interchange
+    :param chunk_size: The number of characters or bytes to read from the stream at a time.
+    :return: StreamValidationResult
+    """
+    reader = X12StreamReader(stream, chunk_size)
+    envelope_validator = X12EnvelopeValidator()
+    transaction_segments: List[List[str]] = []
+    transaction_codes = set()
+    metadata = {}
+    item_count = 0
+    errors: List[ItemValidationResult] = []
+    error: Optional[str] = None
+
+    try:
+        for segment in reader.segments():
+            envelope_validator.validate_segment(segment)
+
+            match segment[0]:
+                case "ST":
+                    transaction_segments = [segment]
+                    transaction_codes.add(segment[1])
+                    metadata.setdefault("transaction_set_control_number", segment[2])
+                case "SE":
+                    transaction_segments.append(segment)
+                    item = _validate_x12_transaction(
+                        reader, envelope_validator, transaction_segments, item_count
+                    )
+                    item_count += 1
+                    if item.error is not None:
+                        errors.append(item)
+                    transaction_segments = []
+                case _ if envelope_validator.transaction_header is not None:
+                    transaction_segments.append(segment)
+
+        envelope_validator.finish()
+    except (DataValidationError, IndexError) as ex:
+        logger.error(f"Unable to load X12 interchange due to {ex}")
+        error = str(ex)
+
+    if transaction_codes:
+        metadata["transaction_set_codes"] = ",".join(sorted(transaction_codes))
+
+    return StreamValidationResult(
+        content_type=ContentType.ASC_X12,
+        item_count=item_count,
+        errors=errors,
+        error=error,
+        metadata=metadata,
+    )
+
+
+def summarize_errors(result: StreamValidationResult, item_name: str) -> Optional[str]:
+    """
+    Returns a summary of a streamed message's validation errors.
+    The summary is limited to the first MAX_SUMMARIZED_ERRORS component errors.
+
+    :param result: The stream validation result
+    :param item_name: The name used for the message's components, such as "entry"
+    :return: the error summary, or None if the message is valid
+    """
+    if result.error is not None:
+        return result.error
+
+    if not result.errors:
+        return None
+
+    summary = [
+        f"{item_name} {e.index} ({e.id}): {e.error}"
+        for e in result.errors[:MAX_SUMMARIZED_ERRORS]
+    ]
+    if len(result.errors) > MAX_SUMMARIZED_ERRORS:
+        summary.append(
+            f"and {len(result.errors) - MAX_SUMMARIZED_ERRORS} additional {item_name} errors"
+        )
+    return "\n".join(summary)
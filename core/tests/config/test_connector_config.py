@@ -99,3 +99,25 @@ def test_validate_connector_type_config():
     }
     with pytest.raises(ValidationError):
         ConnectorConfig(**config_data)
+
+
+def test_validation_mode():
+    """Validates the connector validation_mode field"""
+    config_data = {
+        "type": "inbound",
+        "id": "rest-endpoint-1",
+        "name": "REST Endpoint",
+        "config": {
+            "type": "RestEndpoint",
+            "url": "/ingress",
+        },
+    }
+    assert ConnectorConfig(**config_data).validation_mode == "full"
+
+    for validation_mode in ("sniff", "structural", "full"):
+        config_data["validation_mode"] = validation_mode
+        assert ConnectorConfig(**config_data).validation_mode == validation_mode
+
+    config_data["validation_mode"] = "invalid"
+    with pytest.raises(ValidationError):
+        ConnectorConfig(**config_data)
@@ -6,6 +6,7 @@ Test cases for the Core App Messaging configuration.
 from typing import Dict
 
 import pytest
+from pydantic import ValidationError
 
 from linuxforhealth.healthos.core.config.app import CoreAppMessaging
 
@@ -33,3 +34,148 @@ def test_defaults(config_data: Dict):
     assert config.stream_name == "healthos"
     assert config.ingress_subject == "core.ingress"
     assert config.error_subject == "core.error"
+    assert config.ingress_subject_template is None
+    assert config.ingress_shards == 1
+    assert config.ingress_routing_key == "data_id"
+    assert config.envelope_format == "body"
+    assert config.envelope_codec == "json"
+    assert config.max_in_flight == 64
+    assert config.batch_max_count == 0
+    assert config.batch_max_bytes == 1_048_576
+    assert config.batch_linger == 0.005
+    assert config.dedupe_key == "none"
+    assert config.dedupe_window == 120.0
+    assert config.compression == "none"
+    assert config.compression_threshold == 65_536
+    assert config.claim_check == "none"
+    assert config.claim_check_threshold == 1_000_000
+    assert config.spool_directory is None
+    assert config.spool_segment_max_bytes == 67_108_864
+
+
+def test_envelope_format(config_data: Dict):
+    """Validates the envelope_format field"""
+    config = CoreAppMessaging(**config_data, envelope_format="headers")
+    assert config.envelope_format == "headers"
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, envelope_format="xml")
+
+
+def test_envelope_codec(config_data: Dict):
+    """Validates the envelope_codec field"""
+    for codec_name in ("json", "orjson", "msgpack", "cbor"):
+        config = CoreAppMessaging(**config_data, envelope_codec=codec_name)
+        assert config.envelope_codec == codec_name
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, envelope_codec="avro")
+
+
+def test_max_in_flight(config_data: Dict):
+    """Validates the max_in_flight field"""
+    assert CoreAppMessaging(**config_data, max_in_flight=1).max_in_flight == 1
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, max_in_flight=0)
+
+
+def test_batch_limits(config_data: Dict):
+    """Validates the batch_max_count, batch_max_bytes, and batch_linger fields"""
+    config = CoreAppMessaging(
+        **config_data, batch_max_count=100, batch_max_bytes=65536, batch_linger=0.01
+    )
+    assert config.batch_max_count == 100
+    assert config.batch_max_bytes == 65536
+    assert config.batch_linger == 0.01
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, batch_max_count=-1)
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, batch_linger=0)
+
+
+def test_dedupe(config_data: Dict):
+    """Validates the dedupe_key and dedupe_window fields"""
+    for dedupe_key in ("none", "content_hash", "upstream_id"):
+        config = CoreAppMessaging(**config_data, dedupe_key=dedupe_key)
+        assert config.dedupe_key == dedupe_key
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, dedupe_key="data_id")
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, dedupe_window=0)
+
+
+def test_compression(config_data: Dict):
+    """Validates the compression and compression_threshold fields"""
+    config = CoreAppMessaging(
+        **config_data, compression="zstd", compression_threshold=1024
+    )
+    assert config.compression == "zstd"
+    assert config.compression_threshold == 1024
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, compression="brotli")
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, compression_threshold=-1)
+
+
+def test_claim_check(config_data: Dict):
+    """Validates the claim check fields"""
+    config = CoreAppMessaging(
+        **config_data,
+        claim_check="object_store",
+        claim_check_threshold=500_000,
+        claim_check_bucket="claims",
+    )
+    assert config.claim_check == "object_store"
+    assert config.claim_check_threshold == 500_000
+    assert config.claim_check_bucket == "claims"
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, claim_check="s3")
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, claim_check_threshold=0)
+
+
+def test_spool(config_data: Dict):
+    """Validates the spool fields"""
+    config = CoreAppMessaging(
+        **config_data, spool_directory="/var/spool/healthos", spool_sync_interval=0
+    )
+    assert config.spool_directory == "/var/spool/healthos"
+    assert config.spool_sync_interval == 0
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, spool_segment_max_bytes=0)
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, spool_replay_interval=0)
+
+
+def test_ingress_subject_template(config_data: Dict):
+    """Validates the ingress_subject_template field"""
+    config = CoreAppMessaging(
+        **config_data,
+        ingress_subject_template="core.ingress.{content_type}.{shard}",
+        ingress_shards=8,
+    )
+    assert config.ingress_subject_template == "core.ingress.{content_type}.{shard}"
+    assert config.ingress_shards == 8
+
+    for invalid_template in (
+        "ingress.{shard}",
+        "core.ingress.{tenant}",
+        "core.ingress.shard-{shard}",
+        "core.ingress.{content_type}{shard}",
+    ):
+        with pytest.raises(ValidationError):
+            CoreAppMessaging(**config_data, ingress_subject_template=invalid_template)
+
+    with pytest.raises(ValidationError):
+        CoreAppMessaging(**config_data, ingress_shards=0)
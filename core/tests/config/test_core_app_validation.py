@@ -0,0 +1,54 @@
+"""
+test_core_app_validation.py
+
+Test cases for the Core App Validation configuration.
+"""
+import pytest
+from pydantic import ValidationError
+
+from linuxforhealth.healthos.core.config.app import CoreApp, CoreAppValidation
+
+
+def test_defaults():
+    """Validates the defaults for CoreAppValidation"""
+    config = CoreAppValidation()
+    assert config.max_workers == 0
+    assert config.max_pending == 64
+    assert config.cache_max_entries == 0
+    assert config.cache_max_bytes == 16_777_216
+    assert config.cache_ttl == 300.0
+    assert config.prewarm_content_types == [
+        "application/EDI-X12",
+        "application/fhir+json",
+        "text/hl7v2",
+    ]
+    assert config.fhir_resource_types == []
+
+    assert CoreApp().validation == config
+
+
+@pytest.mark.parametrize(
+    "field_name, invalid_value",
+    [
+        ("max_workers", -1),
+        ("max_pending", 0),
+        ("cache_max_entries", -1),
+        ("cache_max_bytes", -1),
+        ("cache_ttl", 0),
+    ],
+)
+def test_invalid_values(field_name: str, invalid_value: int):
+    """Validates that out of range values raise a ValidationError"""
+    with pytest.raises(ValidationError):
+        CoreAppValidation(**{field_name: invalid_value})
+
+
+def test_prewarm_content_types():
+    """Validates that pre-warmed content types are limited to supported content types"""
+    config = CoreAppValidation(prewarm_content_types=["text/hl7v2"])
+    assert config.prewarm_content_types == ["text/hl7v2"]
+
+    assert CoreAppValidation(prewarm_content_types=[]).prewarm_content_types == []
+
+    with pytest.raises(ValidationError):
+        CoreAppValidation(prewarm_content_types=["text/csv"])
@@ -68,6 +68,28 @@ def test_inbound_kafka_connectors_property(core_configuration: CoreServiceConfig
     assert len(kafka_connectors) == 1
 
 
+def test_outbound_kafka_connectors_property(core_configuration: CoreServiceConfig):
+    """
+    Validates the outbound_kafka_connectors property.
+
+    :param core_configuration: The core service configuration model
+    """
+    assert core_configuration.outbound_kafka_connectors == []
+
+    producer_connector = ConnectorConfig(
+        type="outbound",
+        id="kafka-producer",
+        name="Test Kafka Producer",
+        config={"type": "KafkaProducer", "bootstrap_servers": "localhost:9092"},
+    )
+    config = CoreServiceConfig(
+        connectors=[*core_configuration.connectors, producer_connector],
+        app=core_configuration.app,
+        logging_config=core_configuration.logging_config,
+    )
+    assert config.outbound_kafka_connectors == [producer_connector]
+
+
 def test_load_core_service_configuration(core_configuration: CoreServiceConfig):
     """
     Validates the core service configuration model
@@ -103,6 +103,13 @@ def test_default_values(config_data):
     assert config.connections_max_idle_ms == 540000
     assert config.isolation_level == "read_uncommitted"
     assert config.sasl_mechanism == "PLAIN"
+    assert config.batch_max_records is None
+    assert config.batch_timeout_ms == 1000
+    assert config.workers == 0
+    assert config.queue_high_water is None
+    assert config.queue_low_water is None
+    assert config.commit_max_records == 500
+    assert config.commit_interval_ms == 1000
 
 
 @pytest.mark.parametrize(
@@ -120,6 +127,13 @@ def test_default_values(config_data):
         "heartbeat_interval_ms",
         "consumer_timeout_ms",
         "connections_max_idle_ms",
+        "batch_max_records",
+        "batch_timeout_ms",
+        "commit_max_records",
+        "commit_interval_ms",
+        "queue_high_water",
+        "queue_low_water",
+        "workers",
     ],
 )
 def test_positive_numeric_fields(config_data: Dict, field_name: str):
@@ -127,3 +141,26 @@ def test_positive_numeric_fields(config_data: Dict, field_name: str):
     config_data[field_name] = -1
     with pytest.raises(ValidationError):
         KafkaConsumerConfig(**config_data)
+
+
+def test_queue_water_marks(config_data: Dict):
+    """Validates that the queue low water mark is less than the high water mark"""
+    config_data["queue_high_water"] = 100
+    config_data["queue_low_water"] = 50
+    config = KafkaConsumerConfig(**config_data)
+    assert config.queue_low_water == 50
+
+    config_data["queue_low_water"] = 100
+    with pytest.raises(ValidationError):
+        KafkaConsumerConfig(**config_data)
+
+
+def test_workers_group_id(config_data: Dict):
+    """Validates that a group_id is required if worker processes are used"""
+    config_data["workers"] = 2
+    with pytest.raises(ValidationError):
+        KafkaConsumerConfig(**config_data)
+
+    config_data["group_id"] = "healthos"
+    config = KafkaConsumerConfig(**config_data)
+    assert config.workers == 2
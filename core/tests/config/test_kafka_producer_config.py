@@ -74,6 +74,7 @@ def test_validate_defaulting_acks(config_data: Dict):
     config_data["enable_idempotence"] = True
     config = KafkaProducerConfig(**config_data)
     assert config.acks == "all"
+    assert config.enable_idempotence is True
 
 
 def test_validate_idempotence_error(config_data: Dict):
@@ -99,6 +100,9 @@ def test_default_values(config_data: Dict):
     assert config.security_protocol == "PLAINTEXT"
     assert config.connections_max_idle_ms == 540000
     assert config.sasl_mechanism == "PLAIN"
+    assert config.topic == "healthos"
+    assert config.subjects is None
+    assert config.max_ack_pending == 1000
 
 
 @pytest.mark.parametrize(
@@ -111,6 +115,7 @@ def test_default_values(config_data: Dict):
         "request_timeout_ms",
         "retry_backoff_ms",
         "connections_max_idle_ms",
+        "max_ack_pending",
     ],
 )
 def test_positive_numeric_fields(config_data: Dict, field_name: str):
@@ -0,0 +1,145 @@
+"""
+test_claimcheck.py
+
+Tests offloading oversized messages to a claim check store.
+"""
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from nats.js import JetStreamContext
+from nats.js.api import StreamConfig
+from nats.js.errors import BucketNotFoundError
+
+from linuxforhealth.healthos.core.connector import claimcheck
+from linuxforhealth.healthos.core.connector.claimcheck import (
+    CLAIM_CHECK_HEADER,
+    ClaimCheckStore,
+    FileSystemClaimCheckStore,
+    ObjectStoreClaimCheckStore,
+    check_in,
+    create_claim_check_store,
+    get_claim_check_store,
+    resolve_claim_check,
+)
+
+
+@pytest.mark.asyncio
+async def test_filesystem_claim_check(tmp_path):
+    """
+    Validates that a message body is checked in to a filesystem store and resolved from the reference message.
+
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    store = FileSystemClaimCheckStore(str(tmp_path / "claim-check"))
+    headers = {"Content-Type": "application/json"}
+
+    body, reference_headers = await check_in("data-id-1", b"large body", headers, store)
+    assert body == b""
+    assert reference_headers == {**headers, CLAIM_CHECK_HEADER: "data-id-1"}
+    assert (tmp_path / "claim-check" / "data-id-1").read_bytes() == b"large body"
+
+    assert await resolve_claim_check(body, reference_headers, store) == (
+        b"large body",
+        headers,
+    )
+
+
+@pytest.mark.asyncio
+async def test_filesystem_claim_check_expiry(tmp_path):
+    """
+    Validates that a filesystem store deletes message bodies older than the TTL as message bodies are stored.
+
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    store = FileSystemClaimCheckStore(str(tmp_path), ttl=60.0, expiry_interval=0.0)
+    await store.put("data-id-1", b"expired body")
+    expired_time = time.time() - 120
+    os.utime(tmp_path / "data-id-1", (expired_time, expired_time))
+
+    await store.put("data-id-2", b"large body")
+    assert sorted(os.listdir(tmp_path)) == ["data-id-2"]
+    assert store.delete_expired() == 0
+
+    # abstract stores may not be created
+    with pytest.raises(TypeError):
+        ClaimCheckStore()
+
+
+@pytest.mark.asyncio
+async def test_resolve_claim_check(monkeypatch):
+    """
+    Validates that messages without a claim check are returned as received, and that reference messages
+    require a claim check store.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    monkeypatch.setattr(claimcheck, "claim_check_store", None)
+
+    assert await resolve_claim_check(b"body", {"Content-Type": "x"}) == (
+        b"body",
+        {"Content-Type": "x"},
+    )
+    assert await resolve_claim_check(b"body") == (b"body", {})
+
+    with pytest.raises(ValueError):
+        await resolve_claim_check(b"", {CLAIM_CHECK_HEADER: "data-id-1"})
+
+
+@pytest.mark.asyncio
+async def test_create_object_store_claim_check_store(monkeypatch):
+    """
+    Validates that the object store claim check store creates its bucket if it does not exist.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    monkeypatch.setattr(claimcheck, "claim_check_store", None)
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    mock_js_client.object_store.side_effect = BucketNotFoundError()
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    await create_claim_check_store("object_store", "claims", "claim-check", ttl=3600.0)
+    create_call = mock_js_client.create_object_store.call_args
+    assert create_call.kwargs["bucket"] == "claims"
+    assert create_call.kwargs["config"].ttl == 3600.0
+
+    store = get_claim_check_store()
+    assert isinstance(store, ObjectStoreClaimCheckStore)
+
+    store.object_store.get.return_value = MagicMock(data=b"large body")
+    await store.put("data-id-1", b"large body")
+    assert await store.get("data-id-1") == b"large body"
+
+    await create_claim_check_store("none", "claims", "claim-check")
+    assert get_claim_check_store() is None
+
+
+@pytest.mark.asyncio
+async def test_create_object_store_bucket(monkeypatch):
+    """
+    Validates that the object store bucket is created by the Jetstream client with its name and TTL.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    monkeypatch.setattr(claimcheck, "claim_check_store", None)
+    js_client = JetStreamContext(MagicMock())
+    monkeypatch.setattr(
+        js_client, "object_store", AsyncMock(side_effect=BucketNotFoundError())
+    )
+    monkeypatch.setattr(js_client, "add_stream", AsyncMock())
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: js_client,
+    )
+
+    await create_claim_check_store("object_store", "claims", "claim-check", ttl=3600.0)
+    store = get_claim_check_store()
+    assert store.object_store._name == "claims"
+
+    stream_config: StreamConfig = js_client.add_stream.call_args.args[0]
+    assert stream_config.name == "OBJ_claims"
+    assert stream_config.as_dict()["max_age"] == 3_600_000_000_000
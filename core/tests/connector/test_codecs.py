@@ -0,0 +1,88 @@
+"""
+test_codecs.py
+
+Tests the envelope codecs.
+"""
+import uuid
+
+import pytest
+
+from linuxforhealth.healthos.core.connector import codecs
+from linuxforhealth.healthos.core.connector.codecs import (
+    EnvelopeCodec,
+    get_envelope_codec,
+    get_envelope_codec_for_media_type,
+)
+from linuxforhealth.healthos.core.detect import ContentType
+
+
+@pytest.mark.parametrize("codec_name", ["json", "orjson", "msgpack", "cbor"])
+def test_codec_round_trip(codec_name: str):
+    """
+    Validates that codecs encode UUID and enum values as strings.
+
+    :param codec_name: The envelope codec name
+    """
+    try:
+        codec = get_envelope_codec(codec_name)
+    except ImportError:
+        pytest.skip(f"{codec_name} codec package is not installed")
+
+    data_id = uuid.uuid4()
+    envelope = {
+        "data_id": data_id,
+        "data": 'PID|||"quoted"',
+        "error": None,
+        "content_type": ContentType.HL7_TEXT,
+    }
+
+    assert codec.decode(codec.encode(envelope)) == {
+        "data_id": str(data_id),
+        "data": 'PID|||"quoted"',
+        "error": None,
+        "content_type": "text/hl7v2",
+    }
+    assert get_envelope_codec(codec_name) is codec
+
+
+def test_get_envelope_codec_errors(monkeypatch):
+    """
+    Validates errors raised for unsupported codecs, and codecs without their required package.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    with pytest.raises(ValueError):
+        get_envelope_codec("xml")
+
+    monkeypatch.setattr(codecs, "codec_instances", {})
+    monkeypatch.setitem(codecs.ENVELOPE_CODECS, "msgpack", (codecs.MsgpackCodec, None))
+    with pytest.raises(ImportError, match="msgpack package"):
+        get_envelope_codec("msgpack")
+
+    # codecs implement encode and decode
+    with pytest.raises(TypeError):
+        EnvelopeCodec()
+
+
+@pytest.mark.parametrize(
+    "media_type,codec_names",
+    [
+        ("application/json", {"json", "orjson"}),
+        ("application/msgpack", {"msgpack"}),
+        ("application/cbor", {"cbor"}),
+    ],
+)
+def test_get_envelope_codec_for_media_type(media_type: str, codec_names: set):
+    """
+    Validates codec lookup by media type.
+
+    :param media_type: The envelope media type
+    :param codec_names: The codecs which may decode the media type
+    """
+    try:
+        codec = get_envelope_codec_for_media_type(media_type)
+    except ImportError:
+        pytest.skip(f"{media_type} codec package is not installed")
+
+    assert codec.name in codec_names
+    assert codec.media_type == media_type
@@ -0,0 +1,67 @@
+"""
+test_compression.py
+
+Tests threshold based message compression.
+"""
+import pytest
+
+from linuxforhealth.healthos.core.connector import compression
+from linuxforhealth.healthos.core.connector.compression import (
+    compress_payload,
+    decompress_payload,
+    validate_compression,
+)
+
+LARGE_PAYLOAD = b"ISA*00*          *00*          *ZZ*890069730~" * 1000
+
+
+@pytest.mark.parametrize("algorithm", ["gzip", "zstd"])
+def test_compression_round_trip(algorithm: str):
+    """
+    Validates that payloads at or above the threshold are compressed, and decompressed from their headers.
+
+    :param algorithm: The compression algorithm
+    """
+    try:
+        validate_compression(algorithm)
+    except ImportError:
+        pytest.skip(f"{algorithm} compression package is not installed")
+
+    body, headers = compress_payload(
+        LARGE_PAYLOAD, {"Nats-Msg-Id": "1"}, algorithm, len(LARGE_PAYLOAD)
+    )
+    assert len(body) < len(LARGE_PAYLOAD)
+    assert headers == {"Nats-Msg-Id": "1", "Content-Encoding": algorithm}
+    assert decompress_payload(body, headers) == LARGE_PAYLOAD
+
+
+def test_compression_skipped():
+    """
+    Validates that payloads are not compressed when compression is disabled, the payload is below the
+    threshold, or compression does not reduce the payload's size.
+    """
+    assert compress_payload(LARGE_PAYLOAD, {}, "none", 0) == (LARGE_PAYLOAD, {})
+    assert compress_payload(LARGE_PAYLOAD, {}, "gzip", len(LARGE_PAYLOAD) + 1) == (
+        LARGE_PAYLOAD,
+        {},
+    )
+    assert compress_payload(b"MSH|", {}, "gzip", 0) == (b"MSH|", {})
+    assert decompress_payload(b"MSH|", {}) == b"MSH|"
+    assert decompress_payload(b"MSH|") == b"MSH|"
+
+
+def test_compression_errors(monkeypatch):
+    """
+    Validates errors raised for unsupported algorithms, and algorithms without their required package.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    with pytest.raises(ValueError):
+        validate_compression("brotli")
+
+    with pytest.raises(ValueError):
+        decompress_payload(b"data", {"Content-Encoding": "brotli"})
+
+    monkeypatch.setattr(compression, "zstandard", None)
+    with pytest.raises(ImportError, match="zstandard package"):
+        compress_payload(LARGE_PAYLOAD, {}, "zstd", 0)
@@ -0,0 +1,146 @@
+"""
+test_envelope.py
+
+Tests encoding and decoding the envelope used to publish data messages.
+"""
+import json
+import uuid
+
+import pytest
+
+from linuxforhealth.healthos.core.connector.codecs import get_envelope_codec
+from linuxforhealth.healthos.core.connector.compression import compress_payload
+from linuxforhealth.healthos.core.connector.envelope import (
+    BATCH_ID_HEADER,
+    CONTENT_TYPE_HEADER,
+    DATA_ID_HEADER,
+    ENVELOPE_CONTENT_TYPE_HEADER,
+    ERROR_HEADER,
+    EnvelopeFormat,
+    decode_envelope,
+    encode_envelope,
+)
+from linuxforhealth.healthos.core.connector.processor import PublishDataModel
+
+HL7_MESSAGE = (
+    'MSH|^~\\&|SE050|050|PACS|050|20120912011230||ADT^A01|102|T|2.6\rPID|||"quoted"'
+)
+
+
+def test_encode_body_envelope(publish_model: PublishDataModel):
+    """
+    Validates that the default body envelope format publishes the legacy double encoded JSON document.
+
+    :param publish_model: The publish model fixture
+    """
+    body, headers = encode_envelope(publish_model)
+    assert body == json.dumps(publish_model.json()).encode()
+    assert headers == {}
+    assert decode_envelope(body, headers) == publish_model
+
+    body, headers = encode_envelope(
+        publish_model, EnvelopeFormat.BODY, codec=get_envelope_codec("json")
+    )
+    assert body == json.dumps(publish_model.json()).encode()
+    assert headers == {}
+
+
+@pytest.mark.parametrize("codec_name", ["orjson", "msgpack", "cbor"])
+def test_encode_body_envelope_codecs(publish_model: PublishDataModel, codec_name: str):
+    """
+    Validates that body envelopes are decoded using the codec identified in the Content-Type header.
+
+    :param publish_model: The publish model fixture
+    :param codec_name: The envelope codec name
+    """
+    try:
+        codec = get_envelope_codec(codec_name)
+    except ImportError:
+        pytest.skip(f"{codec_name} codec package is not installed")
+
+    body, headers = encode_envelope(publish_model, EnvelopeFormat.BODY, codec=codec)
+    assert headers == {ENVELOPE_CONTENT_TYPE_HEADER: codec.media_type}
+    assert decode_envelope(body, headers) == publish_model
+
+
+def test_decode_legacy_body_envelope(publish_model: PublishDataModel):
+    """
+    Validates that double encoded body envelopes, published without a Content-Type header, are decoded.
+
+    :param publish_model: The publish model fixture
+    """
+    body = json.dumps(publish_model.json()).encode()
+    assert decode_envelope(body) == publish_model
+    assert decode_envelope(body, {}) == publish_model
+
+
+@pytest.mark.parametrize(
+    "envelope_format", [EnvelopeFormat.BODY, EnvelopeFormat.HEADERS]
+)
+def test_decode_compressed_envelope(envelope_format: EnvelopeFormat):
+    """
+    Validates that compressed envelopes are decompressed prior to decoding.
+
+    :param envelope_format: The envelope format
+    """
+    publish_model = PublishDataModel(data=HL7_MESSAGE * 100, content_type="text/hl7v2")
+    body, headers = compress_payload(
+        *encode_envelope(publish_model, envelope_format), "gzip", 0
+    )
+    assert headers["Content-Encoding"] == "gzip"
+    assert decode_envelope(body, headers) == publish_model
+
+
+def test_decode_unsupported_media_type(publish_model: PublishDataModel):
+    """
+    Validates that a ValueError is raised for an unsupported envelope media type.
+
+    :param publish_model: The publish model fixture
+    """
+    with pytest.raises(ValueError):
+        decode_envelope(b"<xml/>", {ENVELOPE_CONTENT_TYPE_HEADER: "application/xml"})
+
+
+def test_encode_headers_envelope():
+    """
+    Validates the headers envelope format, which publishes the original payload with metadata headers.
+    """
+    publish_model = PublishDataModel(
+        data=HL7_MESSAGE, content_type="text/hl7v2", batch_id=uuid.uuid4()
+    )
+    body, headers = encode_envelope(
+        publish_model, EnvelopeFormat.HEADERS, HL7_MESSAGE.encode()
+    )
+
+    assert body == HL7_MESSAGE.encode()
+    assert headers == {
+        DATA_ID_HEADER: str(publish_model.data_id),
+        CONTENT_TYPE_HEADER: "text/hl7v2",
+        BATCH_ID_HEADER: str(publish_model.batch_id),
+    }
+    assert decode_envelope(body, headers) == publish_model
+
+
+@pytest.mark.parametrize("payload", [None, HL7_MESSAGE, HL7_MESSAGE.encode()])
+def test_encode_headers_envelope_error(payload: str | bytes | None):
+    """
+    Validates that errors are conveyed within a single line header.
+
+    :param payload: The original data payload
+    """
+    publish_model = PublishDataModel(
+        data=HL7_MESSAGE,
+        content_type="text/hl7v2",
+        error="entry 0 (Patient/1): invalid\nentry 1 (Patient/2): invalid\n",
+    )
+    body, headers = encode_envelope(publish_model, EnvelopeFormat.HEADERS, payload)
+
+    assert body == HL7_MESSAGE.encode()
+    assert headers[ERROR_HEADER] == (
+        "entry 0 (Patient/1): invalid | entry 1 (Patient/2): invalid"
+    )
+    assert BATCH_ID_HEADER not in headers
+
+    decoded_model = decode_envelope(body, headers)
+    assert decoded_model.data_id == publish_model.data_id
+    assert decoded_model.error == headers[ERROR_HEADER]
@@ -3,19 +3,25 @@ test_kafka_consumer_connector.py
 
 Tests the KafkaConsumer connector.
 """
+import asyncio
 from typing import List
 from unittest.mock import AsyncMock, call
 
 import pytest
+from aiokafka import ConsumerRecord, TopicPartition
 
 from linuxforhealth.healthos.core.config import ConnectorConfig
 from linuxforhealth.healthos.core.connector.kafka import (
     AIOKafkaConsumer,
+    KafkaBatchConsumer,
+    OffsetCommitter,
     consume_message,
     create_kafka_consumer_connector,
     get_kafka_consumer_connectors,
-    process_data,
+    start_kafka_consumer,
+    submit_batch,
 )
+from linuxforhealth.healthos.core.detect import ValidationMode
 
 
 @pytest.fixture
@@ -80,15 +86,331 @@ async def test_consume_message(monkeypatch, mock_kafka_consumer, publish_model):
     """
     Tests consume messages when processing completes as expected
     """
-    process_data_mock = AsyncMock(spec=process_data)
-    process_data_mock.return_value = publish_model
+    submit_batch_mock = AsyncMock(spec=submit_batch)
+    submit_batch_mock.return_value = [(publish_model, AsyncMock())]
     monkeypatch.setattr(
-        "linuxforhealth.healthos.core.connector.kafka.process_data", process_data_mock
+        "linuxforhealth.healthos.core.connector.kafka.submit_batch", submit_batch_mock
     )
 
     mock_consumer = mock_kafka_consumer([b"ADT-hl7v2-message", b"ORU-hl7v2-message"])
     await consume_message(mock_consumer)
 
-    expected_calls = [call("ADT-hl7v2-message"), call("ORU-hl7v2-message")]
-    assert process_data_mock.call_count == 2
-    process_data_mock.assert_has_calls(expected_calls)
+    expected_calls = [
+        call(
+            b"ADT-hl7v2-message",
+            ValidationMode.FULL,
+            upstream_id="healthy-data:1:0",
+            upstream_key="healthy-data:1",
+        ),
+        call(
+            b"ORU-hl7v2-message",
+            ValidationMode.FULL,
+            upstream_id="healthy-data:1:0",
+            upstream_key="healthy-data:1",
+        ),
+    ]
+    assert submit_batch_mock.call_count == 2
+    submit_batch_mock.assert_has_calls(expected_calls)
+
+
+def _consumer_record(topic: str, partition: int, offset: int) -> ConsumerRecord:
+    """Returns a ConsumerRecord whose value identifies its partition and offset"""
+    return ConsumerRecord(
+        topic=topic,
+        partition=partition,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=0,
+        key=None,
+        value=f"{partition}-{offset}".encode(),
+        checksum=None,
+        serialized_key_size=0,
+        serialized_value_size=4,
+        headers=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_consumer(monkeypatch, publish_model):
+    """
+    Validates that the batch consumer processes partitions concurrently, and records in order within a
+    partition.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param publish_model: The publish model fixture
+    """
+    slow_partition_release = asyncio.Event()
+    processed: List[bytes] = []
+
+    async def submit_batch_mock(msg, validation_mode, upstream_id, upstream_key):
+        if msg == b"0-0":
+            await slow_partition_release.wait()
+        processed.append(msg)
+        return [(publish_model, AsyncMock())]
+
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.kafka.submit_batch", submit_batch_mock
+    )
+
+    mock_consumer = AsyncMock(spec=AIOKafkaConsumer)
+    mock_consumer.getmany.return_value = {
+        TopicPartition("topic-a", p): [
+            _consumer_record("topic-a", p, o) for o in range(3)
+        ]
+        for p in range(2)
+    }
+
+    batch_consumer = KafkaBatchConsumer(mock_consumer, max_records=10)
+    await batch_consumer.consume_batch()
+    mock_consumer.getmany.assert_called_once_with(timeout_ms=1000, max_records=10)
+
+    # partition 1 completes while partition 0 waits on its first record
+    await asyncio.sleep(0.01)
+    assert processed == [b"1-0", b"1-1", b"1-2"]
+
+    slow_partition_release.set()
+    await batch_consumer.join()
+    assert processed[3:] == [b"0-0", b"0-1", b"0-2"]
+
+    await batch_consumer.stop()
+
+
+@pytest.mark.asyncio
+async def test_offset_committer():
+    """
+    Validates that offsets are committed once records are acknowledged, and that commits are coalesced per
+    partition.
+    """
+    mock_consumer = AsyncMock(spec=AIOKafkaConsumer)
+    committer = OffsetCommitter(mock_consumer, max_records=3)
+    loop = asyncio.get_running_loop()
+
+    acks = [loop.create_future() for _ in range(3)]
+    for offset, ack in enumerate(acks):
+        committer.track(_consumer_record("topic-a", 0, offset), [ack])
+    # invalid records without acks are committed in turn
+    committer.track(_consumer_record("topic-a", 1, 0), [])
+    await asyncio.sleep(0.01)
+
+    # offset 0 is not acknowledged, so its partition is not committed
+    acks[1].set_result(None)
+    acks[2].set_result(None)
+    await asyncio.sleep(0.01)
+    assert committer._commit_requested.is_set()
+    await committer.commit()
+    mock_consumer.commit.assert_called_once_with({TopicPartition("topic-a", 1): 1})
+
+    acks[0].set_result(None)
+    await asyncio.sleep(0.01)
+    await committer.commit()
+    mock_consumer.commit.assert_called_with({TopicPartition("topic-a", 0): 3})
+    assert mock_consumer.commit.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_offset_committer_failure():
+    """
+    Validates that a partition is rewound to a record which is not acknowledged, and that records fetched
+    prior to the rewind are not tracked.
+    """
+    mock_consumer = AsyncMock(spec=AIOKafkaConsumer)
+    committer = OffsetCommitter(mock_consumer)
+    partition = TopicPartition("topic-a", 0)
+    loop = asyncio.get_running_loop()
+
+    committer.track(_consumer_record("topic-a", 0, 0), [])
+    committer.track_failure(_consumer_record("topic-a", 0, 1), ValueError("failed"))
+    committer.track(_consumer_record("topic-a", 0, 2), [loop.create_future()])
+    await asyncio.sleep(0.01)
+
+    await committer.commit()
+    mock_consumer.commit.assert_called_once_with({partition: 1})
+    mock_consumer.seek.assert_called_once_with(partition, 1)
+
+    # records fetched prior to the rewind are ignored until the failed record is consumed again
+    committer.track(_consumer_record("topic-a", 0, 3), [])
+    committer.track(_consumer_record("topic-a", 0, 1), [])
+    await asyncio.sleep(0.01)
+    await committer.commit()
+    mock_consumer.commit.assert_called_with({partition: 2})
+
+
+@pytest.mark.asyncio
+async def test_offset_committer_rebalance():
+    """
+    Validates that the committer drops the pending and rewound state of revoked partitions, so that commits
+    include only assigned partitions.
+    """
+    mock_consumer = AsyncMock(spec=AIOKafkaConsumer)
+    committer = OffsetCommitter(mock_consumer)
+    revoked_partition = TopicPartition("topic-a", 0)
+    assigned_partition = TopicPartition("topic-a", 1)
+
+    committer.track(_consumer_record("topic-a", 0, 0), [])
+    committer.track_failure(_consumer_record("topic-a", 0, 1), ValueError("failed"))
+    committer.track(_consumer_record("topic-a", 1, 0), [])
+    await asyncio.sleep(0.01)
+    await committer.commit()
+    assert committer._rewound == {revoked_partition: 1}
+
+    committer.track(_consumer_record("topic-a", 0, 1), [])
+    committer.track(_consumer_record("topic-a", 1, 1), [])
+    await committer.on_partitions_revoked({revoked_partition})
+    assert revoked_partition not in committer._pending
+    assert revoked_partition not in committer._rewound
+
+    # records queued prior to the rebalance are not tracked for revoked partitions
+    committer.track(_consumer_record("topic-a", 0, 2), [])
+    await asyncio.sleep(0.01)
+    await committer.commit()
+    mock_consumer.commit.assert_called_with({assigned_partition: 2})
+
+    await committer.on_partitions_assigned({revoked_partition, assigned_partition})
+    committer.track(_consumer_record("topic-a", 0, 5), [])
+    await asyncio.sleep(0.01)
+    await committer.commit()
+    mock_consumer.commit.assert_called_with({revoked_partition: 6})
+
+
+@pytest.mark.asyncio
+async def test_start_kafka_consumer_rebalance_listener(monkeypatch):
+    """
+    Validates that the offset committer is the consumer's rebalance listener when auto commit is disabled.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    monkeypatch.setattr(AIOKafkaConsumer, "start", AsyncMock())
+    connector_config = ConnectorConfig(
+        type="inbound",
+        id="kafka-consumer-1",
+        name="Test Kafka Consumer 1",
+        config={
+            "type": "KafkaConsumer",
+            "topics": ["topic-a"],
+            "bootstrap_servers": "somehost:9092",
+            "group_id": "healthos",
+            "enable_auto_commit": False,
+        },
+    )
+
+    kafka_consumer = await start_kafka_consumer(connector_config, "rebalance")
+    assert kafka_consumer.subscription() == {"topic-a"}
+    assert isinstance(kafka_consumer._subscription.listener, OffsetCommitter)
+
+    tasks = [t for t in asyncio.all_tasks() if t.get_name().endswith("_rebalance")]
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_batch_consumer_backpressure(monkeypatch, publish_model):
+    """
+    Validates that the batch consumer pauses its partitions at the high water mark, and resumes them at the
+    low water mark.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param publish_model: The publish model fixture
+    """
+    release = asyncio.Event()
+
+    async def submit_batch_mock(msg, validation_mode, upstream_id, upstream_key):
+        await release.wait()
+        return [(publish_model, AsyncMock())]
+
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.kafka.submit_batch", submit_batch_mock
+    )
+
+    partitions = {TopicPartition("topic-a", p) for p in range(2)}
+    mock_consumer = AsyncMock(spec=AIOKafkaConsumer)
+    mock_consumer.assignment.return_value = partitions
+    mock_consumer.paused.return_value = partitions
+    mock_consumer.getmany.return_value = {
+        partition: [
+            _consumer_record("topic-a", partition.partition, o) for o in range(3)
+        ]
+        for partition in partitions
+    }
+
+    batch_consumer = KafkaBatchConsumer(
+        mock_consumer, max_records=10, high_water=10, low_water=2
+    )
+    await batch_consumer.consume_batch()
+    assert batch_consumer.queued == 6
+    assert not batch_consumer.paused
+
+    await batch_consumer.consume_batch()
+    assert batch_consumer.queued == 12
+    assert batch_consumer.paused
+    mock_consumer.pause.assert_called_once_with(*partitions)
+
+    release.set()
+    await batch_consumer.join()
+    assert batch_consumer.queued == 0
+    assert not batch_consumer.paused
+    mock_consumer.resume.assert_called_once_with(*partitions)
+
+    await batch_consumer.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_consumer_backpressure_rebalance(monkeypatch, publish_model):
+    """
+    Validates that partitions assigned by a rebalance while the batch consumer is paused are paused before
+    the next fetch.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param publish_model: The publish model fixture
+    """
+    release = asyncio.Event()
+
+    async def submit_batch_mock(msg, validation_mode, upstream_id, upstream_key):
+        await release.wait()
+        return [(publish_model, AsyncMock())]
+
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.kafka.submit_batch", submit_batch_mock
+    )
+
+    # tracks the consumer's assigned and paused partitions
+    assigned = {TopicPartition("topic-a", p) for p in range(2)}
+    paused = set()
+    mock_consumer = AsyncMock(spec=AIOKafkaConsumer)
+    mock_consumer.assignment.side_effect = lambda: set(assigned)
+    mock_consumer.paused.side_effect = lambda: set(paused)
+    mock_consumer.pause.side_effect = lambda *p: paused.update(p)
+    mock_consumer.resume.side_effect = lambda *p: paused.difference_update(p)
+
+    fetched_while_paused = []
+
+    async def getmany(timeout_ms, max_records):
+        fetched_while_paused.append(set(paused))
+        return {
+            partition: [_consumer_record("topic-a", partition.partition, 0)]
+            for partition in assigned - paused
+        }
+
+    mock_consumer.getmany.side_effect = getmany
+
+    batch_consumer = KafkaBatchConsumer(
+        mock_consumer, max_records=10, high_water=2, low_water=0
+    )
+    await batch_consumer.consume_batch()
+    assert batch_consumer.paused
+    assert paused == assigned
+
+    # a rebalance assigns partitions unpaused
+    assigned = {TopicPartition("topic-a", p) for p in range(1, 3)}
+    paused = set()
+
+    await batch_consumer.consume_batch()
+    assert fetched_while_paused[-1] == assigned
+    assert batch_consumer.queued == 2
+
+    release.set()
+    await batch_consumer.join()
+    assert not batch_consumer.paused
+    assert paused == set()
+
+    await batch_consumer.stop()
@@ -0,0 +1,191 @@
+"""
+test_kafka_producer_connector.py
+
+Tests the KafkaProducer connector.
+"""
+import asyncio
+from typing import Callable
+from unittest.mock import AsyncMock
+
+import pytest
+from aiokafka import AIOKafkaProducer
+from nats.aio.msg import Msg
+from nats.js import JetStreamContext
+
+from linuxforhealth.healthos.core.config import ConnectorConfig
+from linuxforhealth.healthos.core.connector import kafka as kafka_module
+from linuxforhealth.healthos.core.connector.envelope import encode_envelope
+from linuxforhealth.healthos.core.connector.kafka import (
+    KafkaProducerConnector,
+    ProducerMetrics,
+    create_kafka_producer_connector,
+    get_kafka_producer_connectors,
+)
+
+
+def _core_message(body: bytes, headers) -> AsyncMock:
+    """Returns a mock core stream message"""
+    msg = AsyncMock(spec=Msg)
+    msg.data = body
+    msg.headers = headers
+    return msg
+
+
+@pytest.fixture
+def mock_producer() -> AsyncMock:
+    """Returns a mock aiokafka producer whose send returns a delivery future"""
+    producer = AsyncMock(spec=AIOKafkaProducer)
+    producer.deliveries = []
+
+    async def send(topic, value=None, key=None, headers=None):
+        delivery = asyncio.get_running_loop().create_future()
+        producer.deliveries.append(delivery)
+        return delivery
+
+    producer.send.side_effect = send
+    return producer
+
+
+@pytest.mark.asyncio
+async def test_produce(mock_producer: AsyncMock, publish_model):
+    """
+    Validates that a data message is produced with its payload and metadata headers, and is acknowledged on
+    the core stream once it is delivered.
+
+    :param mock_producer: The mock aiokafka producer
+    :param publish_model: The publish model fixture
+    """
+    connector = KafkaProducerConnector(mock_producer, "healthos-data")
+    msg = _core_message(*encode_envelope(publish_model))
+
+    await connector.produce(msg)
+    mock_producer.send.assert_called_once_with(
+        "healthos-data",
+        b"valid-hl7v2-data-payload",
+        key=b"397a48ce-088d-4354-9b15-9d47806440cd",
+        headers=[
+            ("HealthOS-Data-Id", b"397a48ce-088d-4354-9b15-9d47806440cd"),
+            ("HealthOS-Content-Type", b"text/hl7v2"),
+        ],
+    )
+    msg.ack.assert_not_called()
+
+    mock_producer.deliveries[0].set_result(None)
+    await connector.stop()
+    msg.ack.assert_called_once()
+    assert connector.metrics.delivered == 1
+    assert connector.metrics.delivered_bytes == len(b"valid-hl7v2-data-payload")
+
+
+@pytest.mark.asyncio
+async def test_produce_failure(mock_producer: AsyncMock, publish_model):
+    """
+    Validates that a data message is redelivered if it is not delivered, and terminated if it is invalid.
+
+    :param mock_producer: The mock aiokafka producer
+    :param publish_model: The publish model fixture
+    """
+    connector = KafkaProducerConnector(mock_producer, "healthos-data")
+
+    msg = _core_message(*encode_envelope(publish_model))
+    await connector.produce(msg)
+    mock_producer.deliveries[0].set_exception(ConnectionError("broker unavailable"))
+    await connector.stop()
+    msg.nak.assert_called_once()
+    msg.ack.assert_not_called()
+    assert connector.metrics.failed == 1
+
+    invalid_msg = _core_message(b"invalid", {"Content-Type": "application/json"})
+    await connector.produce(invalid_msg)
+    invalid_msg.term.assert_called_once()
+    assert mock_producer.send.call_count == 1
+
+
+def test_producer_metrics():
+    """Validates producer throughput and latency metrics"""
+    metrics = ProducerMetrics()
+    assert metrics.stats()["latency_p99_ms"] == 0.0
+
+    for latency in (0.001, 0.002, 0.003, 0.004):
+        metrics.record_delivery(100, latency)
+    metrics.record_failure()
+
+    stats = metrics.stats()
+    assert stats["delivered"] == 4
+    assert stats["delivered_bytes"] == 400
+    assert stats["failed"] == 1
+    assert stats["messages_per_second"] > 0
+    assert stats["latency_mean_ms"] == pytest.approx(2.5)
+    assert stats["latency_max_ms"] == pytest.approx(4.0)
+    assert 1.0 <= stats["latency_p50_ms"] <= stats["latency_p99_ms"] <= 4.0
+
+
+@pytest.mark.asyncio
+async def test_create_kafka_producer_connector(
+    monkeypatch, core_configuration: Callable
+):
+    """
+    Validates that producer connectors are created, and subscribe to core stream subjects with durable
+    consumers.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param core_configuration: The core configuration fixture
+    """
+    core_config = core_configuration("core-service.yml")
+    monkeypatch.setattr(kafka_module, "get_core_configuration", lambda: core_config)
+    core_client = AsyncMock(spec=JetStreamContext)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: core_client,
+    )
+    monkeypatch.setattr(AIOKafkaProducer, "start", AsyncMock())
+
+    connector_config = ConnectorConfig(
+        type="outbound",
+        id="kafka-producer-1",
+        name="Test Kafka Producer",
+        config={
+            "type": "KafkaProducer",
+            "bootstrap_servers": "localhost:9092",
+            "topic": "healthos-data",
+            "subjects": ["core.ingress", "core.error"],
+            "enable_idempotence": True,
+        },
+    )
+    await create_kafka_producer_connector([connector_config])
+
+    producer_connectors = get_kafka_producer_connectors()
+    assert len(producer_connectors) == 1
+    assert producer_connectors[0].topic == "healthos-data"
+    assert kafka_module.get_kafka_producer_metrics()["healthos-data"] is (
+        producer_connectors[0].metrics
+    )
+
+    subscriptions = core_client.subscribe.call_args_list
+    assert [c.args[0] for c in subscriptions] == ["core.ingress", "core.error"]
+    assert [c.kwargs["durable"] for c in subscriptions] == [
+        "kafka-producer-1-0",
+        "kafka-producer-1-1",
+    ]
+    assert all(c.kwargs["manual_ack"] for c in subscriptions)
+    assert subscriptions[0].kwargs["config"].max_ack_pending == 1000
+
+
+def test_producer_parameters():
+    """Validates that connector fields are excluded from the producer parameters, and acks are converted"""
+    connector_config = ConnectorConfig(
+        type="outbound",
+        id="kafka-producer-1",
+        name="Test Kafka Producer",
+        config={
+            "type": "KafkaProducer",
+            "bootstrap_servers": "localhost:9092",
+            "acks": "1",
+            "compression_type": "gzip",
+        },
+    )
+    parameters = kafka_module._producer_parameters(connector_config)
+    assert parameters["acks"] == 1
+    assert parameters["compression_type"] == "gzip"
+    assert not {"type", "topic", "subjects", "max_ack_pending"} & parameters.keys()
+    assert "enable_idempotence" not in parameters
@@ -0,0 +1,232 @@
+"""
+test_kafka_workers.py
+
+Tests the supervision of Kafka Consumer Connector worker processes.
+"""
+import asyncio
+import signal
+from typing import Callable, List
+from unittest.mock import AsyncMock
+
+import pytest
+
+from linuxforhealth.healthos.core.config import ConnectorConfig
+from linuxforhealth.healthos.core.connector import kafka as kafka_module
+from linuxforhealth.healthos.core.connector import kafka_workers
+from linuxforhealth.healthos.core.connector.kafka import (
+    create_kafka_consumer_connector,
+    get_kafka_consumer_connectors,
+    get_kafka_worker_supervisors,
+)
+from linuxforhealth.healthos.core.connector.kafka_workers import (
+    KafkaWorkerSupervisor,
+    kafka_worker,
+    run_kafka_worker,
+)
+
+
+class StandInProcess:
+    """Stands in for a worker process, which is alive until it is terminated"""
+
+    def __init__(self, target, args, name, daemon):
+        self.target = target
+        self.args = args
+        self.name = name
+        self.pid = None
+        self.exitcode = None
+
+    def start(self):
+        self.pid = 1
+
+    def is_alive(self) -> bool:
+        return self.exitcode is None
+
+    def terminate(self):
+        self.exitcode = 0
+
+    def join(self, timeout=None):
+        pass
+
+
+class StandInContext:
+    """Stands in for the spawn multiprocessing context, recording started processes"""
+
+    def __init__(self):
+        self.processes: List[StandInProcess] = []
+
+    def Process(self, **kwargs) -> StandInProcess:
+        process = StandInProcess(**kwargs)
+        self.processes.append(process)
+        return process
+
+
+@pytest.fixture
+def connector_config() -> ConnectorConfig:
+    """Returns a KafkaConsumer ConnectorConfig model which uses worker processes"""
+    return ConnectorConfig(
+        type="inbound",
+        id="kafka-consumer-1",
+        name="Test Kafka Consumer 1",
+        config={
+            "type": "KafkaConsumer",
+            "topics": ["topic-a"],
+            "bootstrap_servers": "somehost:9092",
+            "group_id": "healthos",
+            "workers": 2,
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_supervisor(core_configuration: Callable, connector_config):
+    """
+    Validates that the supervisor starts the configured worker processes, restarts worker processes which exit,
+    and terminates the worker processes when stopped.
+
+    :param core_configuration: The core configuration fixture
+    :param connector_config: The KafkaConsumer connector configuration fixture
+    """
+    core_config = core_configuration("core-service.yml")
+    supervisor = KafkaWorkerSupervisor(core_config, connector_config)
+    context = StandInContext()
+    supervisor._context = context
+
+    supervisor.start()
+    assert [p.name for p in context.processes] == [
+        "healthos_kafka_workers_0",
+        "healthos_kafka_workers_1",
+    ]
+    assert all(p.target is run_kafka_worker for p in context.processes)
+    assert context.processes[1].args == (core_config, connector_config, 1)
+
+    # a worker process exits, and is restarted
+    context.processes[0].exitcode = 1
+    supervisor.restart_exited()
+    assert supervisor.restarts == 1
+    assert len(context.processes) == 3
+    assert supervisor.workers[0] is context.processes[2]
+
+    await supervisor.stop()
+    assert all(not p.is_alive() for p in context.processes)
+    assert supervisor.workers == {}
+
+    for task in asyncio.all_tasks():
+        if task.get_name() == supervisor.name:
+            task.cancel()
+
+
+def test_supervisor_restart_backoff(
+    monkeypatch, core_configuration: Callable, connector_config
+):
+    """
+    Validates that a worker process which exits repeatedly is restarted with an exponential backoff, which is
+    capped, and reset once the worker process runs for the maximum backoff.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param core_configuration: The core configuration fixture
+    :param connector_config: The KafkaConsumer connector configuration fixture
+    """
+    clock = [100.0]
+    monkeypatch.setattr(kafka_workers.time, "monotonic", lambda: clock[0])
+
+    supervisor = KafkaWorkerSupervisor(
+        core_configuration("core-service.yml"),
+        connector_config,
+        restart_backoff=1.0,
+        restart_backoff_max=4.0,
+    )
+    context = StandInContext()
+    supervisor._context = context
+    supervisor._start_worker(0)
+
+    def crash_and_restart(delay: float):
+        """Exits the worker process, and validates that it is restarted once the delay elapses"""
+        process_count = len(context.processes)
+        context.processes[-1].exitcode = 1
+        supervisor.restart_exited()
+        if delay > 0:
+            assert len(context.processes) == process_count
+            clock[0] += delay - 0.5
+            supervisor.restart_exited()
+            assert len(context.processes) == process_count
+            clock[0] += 0.5
+            supervisor.restart_exited()
+        assert len(context.processes) == process_count + 1
+
+    for delay in (0.0, 1.0, 2.0, 4.0, 4.0):
+        crash_and_restart(delay)
+    assert supervisor.restarts == 5
+
+    # a worker process which runs stably is restarted without delay
+    clock[0] += 4.0
+    crash_and_restart(0.0)
+
+
+@pytest.mark.asyncio
+async def test_kafka_worker_startup_failure(
+    monkeypatch, core_configuration: Callable, connector_config
+):
+    """
+    Validates that a worker which fails to start releases its resources, and raises the startup error.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param core_configuration: The core configuration fixture
+    :param connector_config: The KafkaConsumer connector configuration fixture
+    """
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.app.configure_logging", lambda config: None
+    )
+    monkeypatch.setattr(kafka_workers, "set_core_configuration", lambda config: None)
+    monkeypatch.setattr(
+        kafka_workers,
+        "create_jetstream_core_client",
+        AsyncMock(side_effect=ConnectionRefusedError("nats unavailable")),
+    )
+    flush_mock = AsyncMock()
+    close_spool_mock = AsyncMock()
+    monkeypatch.setattr(kafka_workers, "flush_core_publisher", flush_mock)
+    monkeypatch.setattr(kafka_workers, "close_core_spool", close_spool_mock)
+
+    try:
+        with pytest.raises(ConnectionRefusedError):
+            await kafka_worker(
+                core_configuration("core-service.yml"), connector_config, 0
+            )
+    finally:
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(signal_number)
+
+    flush_mock.assert_awaited_once()
+    close_spool_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_kafka_consumer_connector_workers(
+    monkeypatch, core_configuration: Callable, connector_config
+):
+    """
+    Validates that a connector configured with workers is consumed by worker processes, rather than within the
+    event loop.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param core_configuration: The core configuration fixture
+    :param connector_config: The KafkaConsumer connector configuration fixture
+    """
+    monkeypatch.setattr(
+        kafka_module,
+        "get_core_configuration",
+        lambda: core_configuration("core-service.yml"),
+    )
+    start_mock = AsyncMock()
+    monkeypatch.setattr(kafka_module, "start_kafka_consumer", start_mock)
+    monkeypatch.setattr(KafkaWorkerSupervisor, "start", lambda self: None)
+
+    await create_kafka_consumer_connector([connector_config])
+
+    start_mock.assert_not_called()
+    assert get_kafka_consumer_connectors() == []
+    supervisors = get_kafka_worker_supervisors()
+    assert len(supervisors) == 1
+    assert supervisors[0].connector_config == connector_config
+    assert supervisors[0].name == "healthos_kafka_workers_0"
@@ -11,12 +11,12 @@ import pytest
 from linuxforhealth.healthos.core.connector.nats import (
     ConnectorConfig,
     CoreServiceConfig,
-    PublishDataModel,
     create_inbound_jetstream_clients,
     get_jetstream_clients,
     inbound_connector_callback,
-    process_data,
+    submit_batch,
 )
+from linuxforhealth.healthos.core.detect import ValidationMode
 
 
 @pytest.fixture
@@ -83,25 +83,35 @@ async def test_inbound_connector_callback(
     :param monkeypatch: The pytest monkeypatch fixture
     """
     config: CoreServiceConfig = core_configuration("core-service.yml")
-    process_data_mock = AsyncMock(spec=process_data)
-    process_data_mock.return_value = publish_model
+    submit_batch_mock = AsyncMock(spec=submit_batch)
+    submit_batch_mock.return_value = [(publish_model, AsyncMock())]
 
     inbound_message = AsyncMock()
     inbound_ack = AsyncMock()
     inbound_message.ack.return_value = inbound_ack
     inbound_message.data = b"hello world!"
+    inbound_message.subject = "healthy-data"
+    inbound_message.metadata.stream = "external"
+    inbound_message.metadata.sequence.stream = 42
 
     monkeypatch.setattr(
         "linuxforhealth.healthos.core.connector.nats.get_core_configuration",
         lambda: config,
     )
     monkeypatch.setattr(
-        "linuxforhealth.healthos.core.connector.nats.process_data", process_data_mock
+        "linuxforhealth.healthos.core.connector.nats.submit_batch", submit_batch_mock
     )
 
     await inbound_connector_callback(inbound_message)
 
-    assert process_data_mock.call_count == 1
+    assert submit_batch_mock.call_count == 1
 
-    expected_calls = [call("hello world!")]
-    process_data_mock.assert_has_calls(expected_calls)
+    expected_calls = [
+        call(
+            b"hello world!",
+            ValidationMode.FULL,
+            upstream_id="external:42",
+            upstream_key="healthy-data",
+        )
+    ]
+    submit_batch_mock.assert_has_calls(expected_calls)
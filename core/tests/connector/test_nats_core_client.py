@@ -3,9 +3,12 @@ test_nats_core_client.py
 
 Tests the HealthOS NATS Core Client.
 """
-from unittest.mock import AsyncMock
+import json
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from nats.js import JetStreamManager
+from nats.js.api import StreamConfig, StreamInfo
 from nats.js.errors import NotFoundError
 
 from linuxforhealth.healthos.core.connector.nats import (
@@ -31,7 +34,9 @@ async def test_create_jetstream_core_client(monkeypatch, mock_nats):
     core_client = get_jetstream_core_client()
     assert core_client is None
 
-    await create_jetstream_core_client("nats://localhost:4222", "healthos", "ingress")
+    await create_jetstream_core_client(
+        "nats://localhost:4222", "healthos", ["core.ingress"]
+    )
 
     core_client = get_jetstream_core_client()
     assert core_client is not None
@@ -43,6 +48,7 @@ async def test_create_jetstream_core_client_stream_does_not_exist(
 ):
     """
     Validates create_jetstream_core_clients creates a client and a new stream, if the stream does not exist.
+    The stream's duplicate window is sent in nanoseconds, and only when it is configured.
 
     :param monkeypatch: The pytest monkeypatch fixture
     :param mock_nats: The mock nats fixture
@@ -53,16 +59,72 @@ async def test_create_jetstream_core_client_stream_does_not_exist(
     )
     monkeypatch.setattr("linuxforhealth.healthos.core.connector.nats.nats", mock_nats)
 
-    # update mock to raise a NotFoundError to simulate a non-existent stream
+    # the stream is created with a jetstream manager whose API requests are captured
+    jetstream_mgr = JetStreamManager(MagicMock())
+    jetstream_mgr.stream_info = AsyncMock(side_effect=NotFoundError())
+    # stream info is read from the response in place, so each response is a new dict
+    jetstream_mgr._api_request = AsyncMock(
+        side_effect=lambda *args, **kwargs: {
+            "config": {"name": "healthos"},
+            "state": {
+                "messages": 0,
+                "bytes": 0,
+                "first_seq": 0,
+                "last_seq": 0,
+                "consumer_count": 0,
+            },
+        }
+    )
     mock_nats_client: AsyncMock = mock_nats.connect.return_value
-    mock_jsm: AsyncMock = mock_nats_client.jsm.return_value
-    mock_jsm.stream_info.side_effect = NotFoundError()
+    mock_nats_client.jsm.return_value = jetstream_mgr
 
     core_client = get_jetstream_core_client()
     assert core_client is None
 
-    await create_jetstream_core_client("nats://localhost:4222", "healthos", "ingress")
-    assert mock_jsm.add_stream.call_count == 1
+    await create_jetstream_core_client(
+        "nats://localhost:4222", "healthos", ["core.ingress"], duplicate_window=300.0
+    )
+    subject, data = jetstream_mgr._api_request.call_args.args
+    assert subject == "$JS.API.STREAM.CREATE.healthos"
+    stream_config = json.loads(data)
+    assert stream_config["subjects"] == ["core.ingress"]
+    assert stream_config["duplicate_window"] == 300_000_000_000
 
     core_client = get_jetstream_core_client()
     assert core_client is not None
+
+    # without a duplicate window, the server's default is used
+    await create_jetstream_core_client(
+        "nats://localhost:4222", "healthos", ["core.ingress"]
+    )
+    subject, data = jetstream_mgr._api_request.call_args.args
+    assert json.loads(data)["duplicate_window"] == 0
+
+
+@pytest.mark.asyncio
+async def test_create_jetstream_core_client_stream_subjects(monkeypatch, mock_nats):
+    """
+    Validates create_jetstream_core_clients adds missing subjects to an existing stream.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param mock_nats: The mock nats fixture
+    """
+    monkeypatch.setattr("linuxforhealth.healthos.core.connector.nats.nats", mock_nats)
+
+    mock_nats_client: AsyncMock = mock_nats.connect.return_value
+    mock_jsm: AsyncMock = mock_nats_client.jsm.return_value
+    mock_jsm.stream_info.return_value = StreamInfo(
+        config=StreamConfig(name="healthos", subjects=["core.ingress", "core.error"]),
+        state=None,
+    )
+
+    await create_jetstream_core_client(
+        "nats://localhost:4222", "healthos", ["core.ingress", "core.error"]
+    )
+    assert mock_jsm.update_stream.call_count == 0
+
+    await create_jetstream_core_client(
+        "nats://localhost:4222", "healthos", ["core.ingress.*.*", "core.error"]
+    )
+    updated_config: StreamConfig = mock_jsm.update_stream.call_args.args[0]
+    assert updated_config.subjects == ["core.ingress", "core.error", "core.ingress.*.*"]
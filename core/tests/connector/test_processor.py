@@ -3,6 +3,7 @@ test_processor.py
 
 Tests the common functions and routines used to process connector data.
 """
+import asyncio
 import os
 import uuid
 from unittest.mock import AsyncMock
@@ -11,10 +12,18 @@ import pytest
 from nats.js import JetStreamContext
 from nats.js.errors import NoStreamResponseError
 
+from linuxforhealth.healthos.core.connector import claimcheck, processor
+from linuxforhealth.healthos.core.connector.claimcheck import (
+    FileSystemClaimCheckStore,
+    resolve_claim_check,
+)
+from linuxforhealth.healthos.core.connector.envelope import decode_envelope
 from linuxforhealth.healthos.core.connector.processor import (
     ContentTypeError,
     PublishDataModel,
+    ValidationMode,
     get_core_configuration,
+    process_batch,
     process_data,
 )
 
@@ -138,3 +147,261 @@ async def test_process_data_stream_error(
 
     with pytest.raises(NoStreamResponseError):
         await process_data(message)
+
+
+@pytest.mark.asyncio
+async def test_process_data_sniff_validation_mode(
+    monkeypatch, core_configuration, sample_data_path
+):
+    """
+    Validates that process_data skips model validation when the connector uses the sniff validation mode.
+    """
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.processor.get_core_configuration",
+        lambda: core_configuration("core-service.yml"),
+    )
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    file_path = os.path.join(sample_data_path, "invalid-270.x12")
+    with open(file_path, "r") as f:
+        message = f.read()
+
+    publish_model = await process_data(message, ValidationMode.SNIFF)
+    assert publish_model.content_type == "application/EDI-X12"
+    assert publish_model.error is None
+
+    publish_model = await process_data(message, ValidationMode.STRUCTURAL)
+    assert publish_model.error is not None
+
+
+@pytest.mark.asyncio
+async def test_process_batch(monkeypatch, core_configuration, sample_data_path):
+    """
+    Validates that process_batch publishes each HL7v2 batch member as an independent message.
+    """
+    config = core_configuration("core-service.yml")
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.processor.get_core_configuration",
+        lambda: config,
+    )
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    file_path = os.path.join(sample_data_path, "adt_a01_26.hl7")
+    with open(file_path, "r") as f:
+        message = f.read().strip()
+
+    batch = "\r".join(["BHS|^~\\&|LAB", message, message, "MSH|", "BTS|3"])
+    publish_models = await process_batch(batch)
+
+    assert len(publish_models) == 3
+    assert len({m.data_id for m in publish_models}) == 3
+    assert len({m.batch_id for m in publish_models}) == 1
+    assert [m.error is None for m in publish_models] == [True, True, False]
+    assert mock_js_client.publish.call_count == 3
+
+    subjects = [c.kwargs["subject"] for c in mock_js_client.publish.call_args_list]
+    assert subjects.count(config.app.messaging.error_subject) == 1
+
+    # invalid batch structure
+    mock_js_client.publish.reset_mock()
+    publish_models = await process_batch(batch.replace("BTS|3", "BTS|4"))
+    assert len(publish_models) == 1
+    assert publish_models[0].batch_id is None
+    assert publish_models[0].error is not None
+    assert mock_js_client.publish.call_count == 1
+
+    # non batch data
+    publish_models = await process_batch(message)
+    assert len(publish_models) == 1
+    assert publish_models[0].batch_id is None
+
+
+@pytest.mark.asyncio
+async def test_process_batch_order(monkeypatch, core_configuration, sample_data_path):
+    """
+    Validates that HL7v2 batch members are published in batch order when their validation completes out of order.
+    """
+    config = core_configuration("core-service.yml")
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.processor.get_core_configuration",
+        lambda: config,
+    )
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    submit_parse_message = processor.submit_parse_message
+
+    async def delayed_parse_message(msg, **kwargs):
+        # the first member's validation completes last
+        await asyncio.sleep(0.05 if msg.startswith("MSH|^") else 0)
+        return await submit_parse_message(msg, **kwargs)
+
+    monkeypatch.setattr(processor, "submit_parse_message", delayed_parse_message)
+
+    file_path = os.path.join(sample_data_path, "adt_a01_26.hl7")
+    with open(file_path, "r") as f:
+        message = f.read().strip()
+
+    batch = "\r".join(["BHS|^~\\&|LAB", message, "MSH|", "BTS|2"])
+    publish_models = await process_batch(batch)
+    assert [m.error is None for m in publish_models] == [True, False]
+
+    subjects = [c.kwargs["subject"] for c in mock_js_client.publish.call_args_list]
+    assert subjects[0] != config.app.messaging.error_subject
+    assert subjects[1] == config.app.messaging.error_subject
+
+
+@pytest.mark.asyncio
+async def test_process_data_headers_envelope(
+    monkeypatch, core_configuration, sample_data_path
+):
+    """
+    Validates that process_data publishes the original payload when the headers envelope format is configured.
+    """
+    config = core_configuration("core-service.yml")
+    messaging_config = config.app.messaging.copy(update={"envelope_format": "headers"})
+    config = config.copy(
+        update={"app": config.app.copy(update={"messaging": messaging_config})}
+    )
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.processor.get_core_configuration",
+        lambda: config,
+    )
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    file_path = os.path.join(sample_data_path, "270.x12")
+    with open(file_path, "rb") as f:
+        message = f.read()
+
+    publish_model = await process_data(message)
+
+    publish_kwargs = mock_js_client.publish.call_args.kwargs
+    assert publish_kwargs["payload"] is message
+    assert publish_kwargs["headers"] == {
+        "HealthOS-Data-Id": str(publish_model.data_id),
+        "HealthOS-Content-Type": "application/EDI-X12",
+    }
+
+
+@pytest.mark.parametrize(
+    "dedupe_key,upstream_id,expected_ids",
+    [
+        ("none", "topic:0:1", [None, None]),
+        ("upstream_id", "topic:0:1", ["topic:0:1:0", "topic:0:1:1"]),
+        ("upstream_id", None, [None, None]),
+        ("content_hash", None, None),
+    ],
+)
+@pytest.mark.asyncio
+async def test_process_batch_deduplication_id(
+    monkeypatch,
+    core_configuration,
+    sample_data_path,
+    dedupe_key,
+    upstream_id,
+    expected_ids,
+):
+    """
+    Validates the Nats-Msg-Id header set for each configured deduplication key.
+    """
+    config = core_configuration("core-service.yml")
+    messaging_config = config.app.messaging.copy(update={"dedupe_key": dedupe_key})
+    config = config.copy(
+        update={"app": config.app.copy(update={"messaging": messaging_config})}
+    )
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.processor.get_core_configuration",
+        lambda: config,
+    )
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    file_path = os.path.join(sample_data_path, "adt_a01_26.hl7")
+    with open(file_path, "r") as f:
+        message = f.read().strip()
+
+    batch = "\r".join(["BHS|^~\\&|LAB", message, message, "BTS|2"])
+    await process_batch(batch, upstream_id=upstream_id)
+
+    msg_ids = [
+        c.kwargs["headers"].get("Nats-Msg-Id")
+        for c in mock_js_client.publish.call_args_list
+    ]
+    if expected_ids is None:
+        # identical members share a content hash
+        assert msg_ids[0] is not None
+        assert msg_ids[0] == msg_ids[1]
+    else:
+        assert sorted(msg_ids, key=str) == expected_ids
+
+
+@pytest.mark.asyncio
+async def test_process_data_claim_check(
+    monkeypatch, core_configuration, sample_data_path, tmp_path
+):
+    """
+    Validates that messages above the claim check threshold are stored and published as reference messages.
+    """
+    config = core_configuration("core-service.yml")
+    messaging_config = config.app.messaging.copy(update={"claim_check_threshold": 512})
+    config = config.copy(
+        update={"app": config.app.copy(update={"messaging": messaging_config})}
+    )
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.processor.get_core_configuration",
+        lambda: config,
+    )
+    store = FileSystemClaimCheckStore(str(tmp_path))
+    monkeypatch.setattr(claimcheck, "claim_check_store", store)
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    file_path = os.path.join(sample_data_path, "fhir-us-core-patient.json")
+    with open(file_path, "r") as f:
+        message = f.read()
+
+    publish_model = await process_data(message)
+
+    publish_kwargs = mock_js_client.publish.call_args.kwargs
+    assert publish_kwargs["payload"] == b""
+    assert publish_kwargs["headers"]["HealthOS-Claim-Check"] == str(
+        publish_model.data_id
+    )
+
+    body, headers = await resolve_claim_check(
+        publish_kwargs["payload"], publish_kwargs["headers"]
+    )
+    assert decode_envelope(body, headers) == publish_model
+
+    # a claim check store error is raised from the ack
+    store.put = AsyncMock(side_effect=OSError("disk full"))
+    with pytest.raises(OSError):
+        await process_data(message)
+    assert mock_js_client.publish.call_count == 1
@@ -0,0 +1,200 @@
+"""
+test_publisher.py
+
+Tests the pipelined and batching core messaging publishers.
+"""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from nats.js import JetStreamContext
+from nats.js.errors import NoStreamResponseError
+
+from linuxforhealth.healthos.core.connector import publisher as publisher_module
+from linuxforhealth.healthos.core.connector.publisher import (
+    BatchingPublisher,
+    JetStreamPublisher,
+    create_core_publisher,
+    get_core_publisher,
+)
+
+
+@pytest.fixture
+def mock_js_client(monkeypatch) -> AsyncMock:
+    """
+    Returns a mock core Jetstream client whose publishes complete when the client's release event is set.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    js_client = AsyncMock(spec=JetStreamContext)
+    js_client.release = asyncio.Event()
+
+    async def publish(subject, stream, payload, headers):
+        await js_client.release.wait()
+        if payload == b"invalid":
+            raise NoStreamResponseError()
+        return f"ack {payload.decode()}"
+
+    js_client.publish.side_effect = publish
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: js_client,
+    )
+    return js_client
+
+
+@pytest.mark.asyncio
+async def test_publish_window(mock_js_client: AsyncMock):
+    """
+    Validates that publishes wait for a slot when the in-flight window is full.
+
+    :param mock_js_client: The mock core Jetstream client
+    """
+    publisher = JetStreamPublisher(max_in_flight=2)
+
+    acks = [
+        await publisher.publish("core.ingress", "healthos", f"{i}".encode())
+        for i in range(2)
+    ]
+    assert publisher.in_flight == 2
+
+    blocked_publish = asyncio.create_task(
+        publisher.publish("core.ingress", "healthos", b"2")
+    )
+    await asyncio.sleep(0)
+    assert not blocked_publish.done()
+
+    mock_js_client.release.set()
+    acks.append(await blocked_publish)
+
+    assert await asyncio.gather(*acks) == ["ack 0", "ack 1", "ack 2"]
+    assert publisher.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_publish_error(mock_js_client: AsyncMock):
+    """
+    Validates that publishing errors are raised when the ack future is awaited, and release the window slot.
+
+    :param mock_js_client: The mock core Jetstream client
+    """
+    publisher = JetStreamPublisher(max_in_flight=1)
+    mock_js_client.release.set()
+
+    ack = await publisher.publish("core.ingress", "healthos", b"invalid")
+    with pytest.raises(NoStreamResponseError):
+        await ack
+
+    ack = await publisher.publish("core.ingress", "healthos", b"valid")
+    assert await ack == "ack valid"
+
+
+@pytest.mark.asyncio
+async def test_flush(monkeypatch, mock_js_client: AsyncMock):
+    """
+    Validates that flush waits for in-flight publishes.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param mock_js_client: The mock core Jetstream client
+    """
+    monkeypatch.setattr(publisher_module, "core_publisher", JetStreamPublisher())
+    create_core_publisher(max_in_flight=4)
+    publisher = get_core_publisher()
+    assert publisher.max_in_flight == 4
+
+    acks = [
+        await publisher.publish("core.ingress", "healthos", f"{i}".encode())
+        for i in range(3)
+    ]
+    asyncio.get_running_loop().call_soon(mock_js_client.release.set)
+    await publisher.flush()
+
+    assert all(a.done() for a in acks)
+    assert publisher.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_max_count(mock_js_client: AsyncMock):
+    """
+    Validates that a batch is published when it reaches the maximum message count.
+
+    :param mock_js_client: The mock core Jetstream client
+    """
+    publisher = BatchingPublisher(max_batch_count=3, linger=60)
+    mock_js_client.release.set()
+
+    acks = [
+        await publisher.publish("core.ingress", "healthos", f"{i}".encode())
+        for i in range(2)
+    ]
+    assert publisher.buffered == 2
+    assert mock_js_client.publish.call_count == 0
+
+    acks.append(await publisher.publish("core.ingress", "healthos", b"2"))
+    assert publisher.buffered == 0
+    assert await asyncio.gather(*acks) == ["ack 0", "ack 1", "ack 2"]
+
+
+@pytest.mark.asyncio
+async def test_batch_max_bytes(mock_js_client: AsyncMock):
+    """
+    Validates that a batch is published when it reaches the maximum size.
+
+    :param mock_js_client: The mock core Jetstream client
+    """
+    publisher = BatchingPublisher(max_batch_count=100, max_batch_bytes=8, linger=60)
+    mock_js_client.release.set()
+
+    first_ack = await publisher.publish("core.ingress", "healthos", b"abcd")
+    assert publisher.buffered == 1
+
+    second_ack = await publisher.publish("core.ingress", "healthos", b"efgh")
+    assert publisher.buffered == 0
+    assert await first_ack == "ack abcd"
+    assert await second_ack == "ack efgh"
+
+
+@pytest.mark.asyncio
+async def test_batch_linger(mock_js_client: AsyncMock):
+    """
+    Validates that a partial batch is published once the linger time elapses, and that publishing errors are
+    resolved to the affected message only.
+
+    :param mock_js_client: The mock core Jetstream client
+    """
+    publisher = BatchingPublisher(max_batch_count=100, linger=0.01)
+    mock_js_client.release.set()
+
+    valid_ack = await publisher.publish("core.ingress", "healthos", b"valid")
+    invalid_ack = await publisher.publish("core.ingress", "healthos", b"invalid")
+    assert publisher.buffered == 2
+
+    assert await asyncio.wait_for(valid_ack, timeout=1) == "ack valid"
+    with pytest.raises(NoStreamResponseError):
+        await invalid_ack
+    assert publisher.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_flush(monkeypatch, mock_js_client: AsyncMock):
+    """
+    Validates that flush publishes the buffered batch and waits for its acks.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param mock_js_client: The mock core Jetstream client
+    """
+    monkeypatch.setattr(publisher_module, "core_publisher", JetStreamPublisher())
+    create_core_publisher(max_in_flight=4, batch_max_count=10, batch_linger=60)
+    publisher = get_core_publisher()
+    assert isinstance(publisher, BatchingPublisher)
+
+    acks = [
+        await publisher.publish("core.ingress", "healthos", f"{i}".encode())
+        for i in range(6)
+    ]
+    asyncio.get_running_loop().call_soon(mock_js_client.release.set)
+    await publisher.flush()
+
+    assert [a.result() for a in acks] == [f"ack {i}" for i in range(6)]
+    assert publisher.buffered == 0
+    assert publisher.in_flight == 0
@@ -1,6 +1,7 @@
 """
 test_rest_connector.py
 """
+import uuid
 from unittest.mock import AsyncMock
 
 import pytest
@@ -10,6 +11,7 @@ from linuxforhealth.healthos.core.connector.rest import (
     NoStreamResponseError,
     RestEndpointRequest,
     RestEndpointResponse,
+    ValidationMode,
     create_inbound_connector_route,
     endpoint_template,
 )
@@ -27,38 +29,66 @@ async def test_endpoint_template(monkeypatch, publish_model, request_model):
     Tests the Rest Endpoint Template when no errors occur.
 
     :param monkeypatch: The pytest monkeypatch fixture.
-    :param publish_model: The publish model fixture used as a return type for the process_data function.
+    :param publish_model: The publish model fixture used as a return type for the process_batch function.
     :param request_model: The request model fixture used to stand-in for the initial request.
     :return:
     """
-    mock_process_data = AsyncMock()
-    mock_process_data.return_value = publish_model
+    mock_process_batch = AsyncMock()
+    mock_process_batch.return_value = [publish_model]
 
     monkeypatch.setattr(
-        "linuxforhealth.healthos.core.connector.rest.process_data", mock_process_data
+        "linuxforhealth.healthos.core.connector.rest.process_batch", mock_process_batch
     )
 
     endpoint_response: RestEndpointResponse = await endpoint_template(request_model)
     assert endpoint_response.data_id == str(publish_model.data_id)
+    assert endpoint_response.data_ids is None
     assert endpoint_response.content_type == publish_model.content_type
     assert endpoint_response.status == "received"
 
 
+@pytest.mark.asyncio
+async def test_endpoint_template_hl7_batch(monkeypatch, publish_model, request_model):
+    """
+    Tests the Rest Endpoint Template when a HL7v2 batch is received.
+
+    :param monkeypatch: The pytest monkeypatch fixture.
+    :param publish_model: The publish model fixture used as a return type for the process_batch function.
+    :param request_model: The request model fixture used to stand-in for the initial request.
+    """
+    batch_id = uuid.uuid4()
+    publish_models = [
+        publish_model.copy(update={"data_id": uuid.uuid4(), "batch_id": batch_id})
+        for _ in range(3)
+    ]
+    mock_process_batch = AsyncMock()
+    mock_process_batch.return_value = publish_models
+
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.rest.process_batch", mock_process_batch
+    )
+
+    endpoint_response: RestEndpointResponse = await endpoint_template(request_model)
+    assert endpoint_response.data_id == str(batch_id)
+    assert endpoint_response.data_ids == [str(m.data_id) for m in publish_models]
+    assert endpoint_response.status == "received"
+
+
 @pytest.mark.asyncio
 async def test_endpoint_template_value_error(monkeypatch, publish_model, request_model):
     """
     Tests the Rest Endpoint Template when a value error occurs.
 
     :param monkeypatch: The pytest monkeypatch fixture.
-    :param publish_model: The publish model fixture used as a return type for the process_data function.
+    :param publish_model: The publish model fixture used as a return type for the process_batch function.
     :param request_model: The request model fixture used to stand-in for the initial request.
     :return:
     """
-    mock_process_data = AsyncMock()
-    mock_process_data.side_effect = ValueError("Invalid data")
+    mock_process_batch = AsyncMock()
+    mock_process_batch.side_effect = ValueError("Invalid data")
 
     monkeypatch.setattr(
-        "linuxforhealth.healthos.core.connector.rest.process_data", mock_process_data
+        "linuxforhealth.healthos.core.connector.rest.process_batch", mock_process_batch
     )
 
     endpoint_response: RestEndpointResponse = await endpoint_template(request_model)
@@ -74,15 +104,15 @@ async def test_endpoint_template_internal_error(
     Tests the Rest Endpoint Template when an internal error occurs.
 
     :param monkeypatch: The pytest monkeypatch fixture.
-    :param publish_model: The publish model fixture used as a return type for the process_data function.
+    :param publish_model: The publish model fixture used as a return type for the process_batch function.
     :param request_model: The request model fixture used to stand-in for the initial request.
     :return:
     """
-    mock_process_data = AsyncMock()
-    mock_process_data.side_effect = NoStreamResponseError()
+    mock_process_batch = AsyncMock()
+    mock_process_batch.side_effect = NoStreamResponseError()
 
     monkeypatch.setattr(
-        "linuxforhealth.healthos.core.connector.rest.process_data", mock_process_data
+        "linuxforhealth.healthos.core.connector.rest.process_batch", mock_process_batch
     )
 
     with pytest.raises(HTTPException) as e:
@@ -98,3 +128,29 @@ def test_create_inbound_connector_route():
     assert len(actual_route.routes) == 1
     assert actual_route.routes[0].path == "/ingress"
     assert actual_route.routes[0].methods == {"POST"}
+
+
+@pytest.mark.asyncio
+async def test_create_inbound_connector_route_validation_mode(
+    monkeypatch, publish_model
+):
+    """
+    Validates that the inbound connector route processes data with the connector's validation mode.
+
+    :param monkeypatch: The pytest monkeypatch fixture.
+    :param publish_model: The publish model fixture used as a return type for the process_batch function.
+    """
+    mock_process_batch = AsyncMock()
+    mock_process_batch.return_value = [publish_model]
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.rest.process_batch", mock_process_batch
+    )
+
+    route = create_inbound_connector_route("/ingress", "post", ValidationMode.SNIFF)
+    await route.routes[0].endpoint(
+        RestEndpointRequest(data="valid-hl7v2-data-payload"), "request-1"
+    )
+
+    mock_process_batch.assert_called_once_with(
+        "valid-hl7v2-data-payload", ValidationMode.SNIFF, upstream_id="request-1"
+    )
@@ -0,0 +1,74 @@
+"""
+test_routing.py
+
+Tests routing data messages to ingress subjects.
+"""
+import uuid
+
+import pytest
+
+from linuxforhealth.healthos.core.config.app import CoreAppMessaging
+from linuxforhealth.healthos.core.connector.processor import PublishDataModel
+from linuxforhealth.healthos.core.connector.routing import (
+    ingress_stream_subject,
+    ingress_subject,
+    shard_for,
+)
+
+
+@pytest.fixture
+def sharded_config() -> CoreAppMessaging:
+    """Returns a messaging configuration with sharded ingress subjects"""
+    return CoreAppMessaging(
+        ingress_subject_template="core.ingress.{content_type}.{shard}",
+        ingress_shards=4,
+        ingress_routing_key="upstream_key",
+    )
+
+
+def test_shard_for():
+    """Validates that shards are stable and within the shard count"""
+    shards = {shard_for(f"key-{i}", 4) for i in range(100)}
+    assert shards == {0, 1, 2, 3}
+    assert shard_for("key-1", 4) == shard_for("key-1", 4)
+    assert shard_for("key-1", 1) == 0
+
+
+def test_ingress_subject_default():
+    """Validates that messages are published to the ingress subject without a template"""
+    config = CoreAppMessaging()
+    publish_model = PublishDataModel(data="MSH|", content_type="text/hl7v2")
+
+    assert ingress_subject(config, publish_model, "topic-a:0") == "core.ingress"
+    assert ingress_stream_subject(config) == "core.ingress"
+
+
+def test_ingress_subject_template(sharded_config: CoreAppMessaging):
+    """
+    Validates ingress subjects generated from a template, using the configured routing key.
+
+    :param sharded_config: The sharded messaging configuration
+    """
+    assert ingress_stream_subject(sharded_config) == "core.ingress.*.*"
+
+    hl7_model = PublishDataModel(data="MSH|", content_type="text/hl7v2")
+    fhir_model = PublishDataModel(data="{}", content_type="application/fhir+json")
+
+    hl7_subject = ingress_subject(sharded_config, hl7_model, "topic-a:0")
+    assert hl7_subject == f"core.ingress.hl7v2.{shard_for('topic-a:0', 4)}"
+
+    fhir_subject = ingress_subject(sharded_config, fhir_model, "topic-a:0")
+    assert fhir_subject == f"core.ingress.fhir.{shard_for('topic-a:0', 4)}"
+
+    # messages without an upstream key are routed by batch id, then data id
+    batch_id = uuid.uuid4()
+    batch_models = [
+        PublishDataModel(data="MSH|", content_type="text/hl7v2", batch_id=batch_id)
+        for _ in range(10)
+    ]
+    assert {ingress_subject(sharded_config, m) for m in batch_models} == {
+        f"core.ingress.hl7v2.{shard_for(str(batch_id), 4)}"
+    }
+    assert ingress_subject(sharded_config, hl7_model) == (
+        f"core.ingress.hl7v2.{shard_for(str(hl7_model.data_id), 4)}"
+    )
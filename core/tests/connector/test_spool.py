@@ -0,0 +1,256 @@
+"""
+test_spool.py
+
+Tests the durable spool used when the core stream is unreachable.
+"""
+import asyncio
+import os
+from unittest.mock import AsyncMock
+
+import pytest
+from nats.errors import MaxPayloadError
+from nats.js import JetStreamContext
+from nats.js.errors import NoStreamResponseError
+
+from linuxforhealth.healthos.core.connector import spool as spool_module
+from linuxforhealth.healthos.core.connector.publisher import JetStreamPublisher
+from linuxforhealth.healthos.core.connector.spool import (
+    DEAD_LETTER_SEGMENT,
+    Spool,
+    read_segment,
+    replay_spool_task,
+)
+
+
+@pytest.mark.asyncio
+async def test_append(monkeypatch, tmp_path):
+    """
+    Validates that concurrent appends share a single fsync, and are read back in order.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    fsync_calls = []
+    monkeypatch.setattr(os, "fsync", lambda fd: fsync_calls.append(fd))
+
+    spool = Spool(str(tmp_path))
+    assert not spool.pending
+
+    await asyncio.gather(
+        *(
+            spool.append("core.ingress", "healthos", f"{i}".encode(), {"id": f"{i}"})
+            for i in range(5)
+        )
+    )
+    assert len(fsync_calls) == 1
+
+    await spool.close()
+    assert spool.pending
+    segments = spool.segments()
+    assert len(segments) == 1
+    assert list(read_segment(segments[0])) == [
+        ("core.ingress", "healthos", f"{i}".encode(), {"id": f"{i}"}) for i in range(5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_segments(tmp_path):
+    """
+    Validates that full segments are closed, and that a new spool continues after existing segments.
+
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    spool = Spool(str(tmp_path), segment_max_bytes=1, sync_interval=0)
+    await spool.append("core.ingress", "healthos", b"0")
+    await spool.append("core.ingress", "healthos", b"1")
+    assert len(spool.segments()) == 2
+
+    # a truncated record, written prior to a crash
+    with open(spool.segments()[-1], "ab") as f:
+        f.write(b"\x00\x00")
+
+    restarted_spool = Spool(str(tmp_path), sync_interval=0)
+    await restarted_spool.append("core.ingress", "healthos", b"2")
+    await restarted_spool.close()
+
+    segments = restarted_spool.segments()
+    assert [os.path.basename(s) for s in segments] == [
+        f"{i:020d}.spool" for i in range(3)
+    ]
+    assert [m[2] for s in segments for m in read_segment(s)] == [b"0", b"1", b"2"]
+
+
+@pytest.mark.asyncio
+async def test_replay(tmp_path):
+    """
+    Validates that spooled messages are replayed in order, and that replay resumes after a publishing error.
+
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    spool = Spool(str(tmp_path), sync_interval=0)
+    for i in range(4):
+        await spool.append("core.ingress", "healthos", f"{i}".encode())
+
+    published = []
+
+    async def publish(subject, stream, payload, headers):
+        if payload == b"2" and b"2" not in published:
+            published.append(b"2")
+            raise NoStreamResponseError()
+        published.append(payload)
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    mock_js_client.publish.side_effect = publish
+
+    with pytest.raises(NoStreamResponseError):
+        await spool.replay(mock_js_client)
+    assert spool.pending
+
+    assert await spool.replay(mock_js_client) == 2
+    assert published == [b"0", b"1", b"2", b"2", b"3"]
+    assert not spool.pending
+
+
+@pytest.mark.asyncio
+async def test_replay_appended_messages(tmp_path):
+    """
+    Validates that messages appended while the spool is replayed are replayed after the earlier messages.
+
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    spool = Spool(str(tmp_path), sync_interval=0)
+    await spool.append("core.ingress", "healthos", b"0")
+
+    published = []
+
+    async def publish(subject, stream, payload, headers):
+        if payload == b"0":
+            await spool.append("core.ingress", "healthos", b"1")
+        published.append(payload)
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    mock_js_client.publish.side_effect = publish
+
+    assert await spool.replay(mock_js_client) == 2
+    assert published == [b"0", b"1"]
+    assert not spool.pending
+    assert spool.segments() == []
+
+
+@pytest.mark.asyncio
+async def test_replay_dead_letter(tmp_path):
+    """
+    Validates that a spooled message which cannot be published is moved to the dead letter segment, and that
+    the messages spooled after it are replayed.
+
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    spool = Spool(str(tmp_path), sync_interval=0)
+    for payload in (b"0", b"too large", b"2"):
+        await spool.append("core.ingress", "healthos", payload)
+
+    published = []
+
+    async def publish(subject, stream, payload, headers):
+        if payload == b"too large":
+            raise MaxPayloadError()
+        published.append(payload)
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    mock_js_client.publish.side_effect = publish
+
+    assert await spool.replay(mock_js_client) == 2
+    assert published == [b"0", b"2"]
+    assert not spool.pending
+    assert spool.segments() == []
+
+    dead_letters = list(read_segment(os.path.join(tmp_path, DEAD_LETTER_SEGMENT)))
+    assert dead_letters == [("core.ingress", "healthos", b"too large", None)]
+
+    # the dead letter segment is not replayed with later messages
+    await spool.append("core.ingress", "healthos", b"3")
+    assert await spool.replay(mock_js_client) == 1
+    assert not spool.pending
+
+
+@pytest.mark.asyncio
+async def test_replay_spool_task_errors(monkeypatch, tmp_path):
+    """
+    Validates that the replay task continues after unexpected errors, so that spooled messages are replayed.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    spool = Spool(str(tmp_path), sync_interval=0)
+    await spool.append("core.ingress", "healthos", b"data")
+
+    # the first read of the spool fails
+    segment_errors = [OSError("segment unavailable")]
+
+    def read_segment_with_error(segment_path):
+        if segment_errors:
+            raise segment_errors.pop()
+        return read_segment(segment_path)
+
+    monkeypatch.setattr(spool_module, "read_segment", read_segment_with_error)
+
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    replay_task = asyncio.create_task(replay_spool_task(spool, 0.01))
+    for _ in range(100):
+        if not spool.pending:
+            break
+        await asyncio.sleep(0.01)
+
+    assert not spool.pending
+    assert not replay_task.done()
+    assert not segment_errors
+    mock_js_client.publish.assert_called_once()
+
+    replay_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await replay_task
+
+
+@pytest.mark.asyncio
+async def test_publisher_spools_message(monkeypatch, tmp_path):
+    """
+    Validates that the publisher spools messages when the core stream is unreachable.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param tmp_path: The pytest tmp_path fixture
+    """
+    mock_js_client = AsyncMock(spec=JetStreamContext)
+    mock_js_client.publish.side_effect = NoStreamResponseError()
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.connector.nats.get_jetstream_core_client",
+        lambda: mock_js_client,
+    )
+
+    publisher = JetStreamPublisher()
+
+    monkeypatch.setattr(spool_module, "core_spool", None)
+    ack = await publisher.publish("core.ingress", "healthos", b"data")
+    with pytest.raises(NoStreamResponseError):
+        await ack
+
+    spool = Spool(str(tmp_path), sync_interval=0)
+    monkeypatch.setattr(spool_module, "core_spool", spool)
+    ack = await publisher.publish("core.ingress", "healthos", b"data", {"id": "1"})
+    assert await ack is None
+
+    # messages are spooled while the spool has pending messages, even if the stream is reachable
+    mock_js_client.publish.reset_mock(side_effect=True)
+    ack = await publisher.publish("core.ingress", "healthos", b"data", {"id": "2"})
+    assert await ack is None
+    mock_js_client.publish.assert_not_called()
+
+    await spool.close()
+    assert list(read_segment(spool.segments()[0])) == [
+        ("core.ingress", "healthos", b"data", {"id": "1"}),
+        ("core.ingress", "healthos", b"data", {"id": "2"}),
+    ]
@@ -0,0 +1,50 @@
+"""
+test_admin.py
+
+Tests the core service /admin endpoints.
+"""
+import pytest
+
+from linuxforhealth.healthos.core.app.admin import (
+    kafka_producer_metrics,
+    validation_cache_metrics,
+)
+from linuxforhealth.healthos.core.connector.kafka import ProducerMetrics
+from linuxforhealth.healthos.core.detect import configure_validation_cache
+
+
+@pytest.mark.asyncio
+async def test_validation_cache_metrics():
+    """Validates the validation cache metrics endpoint when the cache is enabled and disabled"""
+    configure_validation_cache(max_entries=0, max_bytes=0, ttl=60)
+    assert await validation_cache_metrics() == {"enabled": False}
+
+    configure_validation_cache(max_entries=10, max_bytes=4096, ttl=60)
+    try:
+        metrics = await validation_cache_metrics()
+        assert metrics == {
+            "enabled": True,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "entries": 0,
+            "bytes": 0,
+        }
+    finally:
+        configure_validation_cache(max_entries=0, max_bytes=0, ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_kafka_producer_metrics(monkeypatch):
+    """Validates the Kafka producer metrics endpoint"""
+    metrics = ProducerMetrics()
+    metrics.record_delivery(100, 0.002)
+    monkeypatch.setattr(
+        "linuxforhealth.healthos.core.app.admin.get_kafka_producer_metrics",
+        lambda: {"healthos-data": metrics},
+    )
+
+    topic_metrics = await kafka_producer_metrics()
+    assert list(topic_metrics) == ["healthos-data"]
+    assert topic_metrics["healthos-data"]["delivered"] == 1
+    assert topic_metrics["healthos-data"]["latency_max_ms"] == 2.0
@@ -1,15 +1,32 @@
 """
 test_detect
 """
+import json
 import os
+import subprocess
+import sys
 
 import pytest
 
+from linuxforhealth.healthos.core import detect
 from linuxforhealth.healthos.core.detect import (
     ContentType,
     ContentTypeError,
     DataValidationError,
+    FhirModelRegistry,
+    ParsedMessage,
+    ValidationCache,
+    ValidationMode,
+    configure_fhir_model_registry,
+    configure_validation_cache,
+    content_hash,
     detect_content_type,
+    get_fhir_model_registry,
+    get_validation_cache,
+    is_hl7_batch,
+    parse_message,
+    prewarm,
+    split_hl7_batch,
     validate_message,
 )
 
@@ -45,6 +62,79 @@ def test_detect_content_type(
     assert content_type == actual_content_type
 
 
+@pytest.mark.parametrize(
+    "file_name, content_type",
+    [
+        ("270.x12", ContentType.ASC_X12),
+        ("adt_a01_26.hl7", ContentType.HL7_TEXT),
+        ("fhir-us-core-patient.json", ContentType.FHIR_JSON),
+    ],
+)
+def test_detect_content_type_binary(
+    sample_data_path: str, file_name: str, content_type: ContentType
+):
+    """
+    Validates detect_content_type for bytes and memoryview input messages.
+
+    :param sample_data_path: The path to the sample data directory.
+    :param file_name:  The file name, within the sample data directory, to test.
+    :param content_type: The expected ContentType
+    """
+    file_path = os.path.join(sample_data_path, file_name)
+    with open(file_path, "rb") as f:
+        input_message = f.read()
+
+    assert detect_content_type(input_message) == content_type
+    assert detect_content_type(memoryview(input_message)) == content_type
+
+
+def test_detect_content_type_does_not_decode_json(monkeypatch):
+    """
+    Validates that FHIR detection does not decode the JSON document.
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    def _fail_loads(*args, **kwargs):
+        raise AssertionError("json.loads should not be called during detection")
+
+    monkeypatch.setattr(detect.json, "loads", _fail_loads)
+
+    # the document is not valid JSON beyond the sniffed prefix
+    input_message = b'{"resourceType": "Bundle", "entry": [' + b"x" * 4096
+    assert detect_content_type(input_message) == ContentType.FHIR_JSON
+
+
+@pytest.mark.parametrize(
+    "input_message, expectation",
+    [
+        # resourceType outside of the sniff window
+        (
+            b'{"id": "' + b"a" * 2048 + b'", "resourceType": "Patient"}',
+            ContentType.FHIR_JSON,
+        ),
+        (
+            '{"id": "' + "a" * 2048 + '", "resourceType": "Patient"}',
+            ContentType.FHIR_JSON,
+        ),
+        # JSON documents without a resourceType are not supported
+        (b'{"id": "' + b"a" * 2048 + b'"}', None),
+        (b'{"resourceType": ""}', None),
+    ],
+)
+def test_detect_content_type_json(input_message, expectation):
+    """
+    Validates FHIR detection when the resourceType is not at the start of the document.
+
+    :param input_message: The input message
+    :param expectation: The expected content type, or None if a ContentTypeError is expected
+    """
+    if expectation is None:
+        with pytest.raises(ContentTypeError):
+            detect_content_type(input_message)
+    else:
+        assert detect_content_type(input_message) == expectation
+
+
 def test_detect_content_type_exception(sample_data_path: str):
     """
     Validates detect_content_type raises an exception when appropriate.
@@ -95,3 +185,453 @@ def test_validate_message_exception(sample_data_path: str):
 
     with pytest.raises(DataValidationError):
         validate_message(input_message)
+
+
+@pytest.mark.parametrize(
+    "file_name, content_type, metadata",
+    [
+        (
+            "270.x12",
+            ContentType.ASC_X12,
+            {"transaction_set_codes": "270", "transaction_set_control_number": "0001"},
+        ),
+        (
+            "adt_a01_26.hl7",
+            ContentType.HL7_TEXT,
+            {"message_type": "ADT^A01", "message_control_id": "102"},
+        ),
+        (
+            "fhir-us-core-patient.json",
+            ContentType.FHIR_JSON,
+            {"resource_type": "Patient", "resource_id": "example"},
+        ),
+    ],
+)
+def test_parse_message(
+    sample_data_path: str, file_name: str, content_type: ContentType, metadata: dict
+):
+    """
+    Validates that parse_message returns the content type, parsed data and metadata for valid messages.
+
+    :param sample_data_path: The path to the sample data directory.
+    :param file_name: The file name within the sample data directory to test.
+    :param content_type: The expected content type
+    :param metadata: The expected metadata
+    """
+    file_path = os.path.join(sample_data_path, file_name)
+    with open(file_path) as f:
+        input_message = "".join(f.readlines())
+
+    parsed_message: ParsedMessage = parse_message(input_message)
+    assert parsed_message.content_type == content_type
+    assert parsed_message.parsed is not None
+    assert parsed_message.metadata == metadata
+    assert parsed_message.error is None
+
+
+def test_parse_message_error(sample_data_path: str):
+    """
+    Validates that parse_message returns validation errors rather than raising them.
+    :param sample_data_path: The sample data path
+    """
+    file_path = os.path.join(sample_data_path, "invalid-270.x12")
+    with open(file_path) as f:
+        input_message = "".join(f.readlines())
+
+    parsed_message: ParsedMessage = parse_message(input_message)
+    assert parsed_message.content_type == ContentType.ASC_X12
+    assert parsed_message.parsed is None
+    assert parsed_message.error is not None
+
+
+def test_parse_message_decodes_json_once(monkeypatch, sample_data_path: str):
+    """
+    Validates that FHIR messages are decoded once for both detection and validation.
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param sample_data_path: The sample data path
+    """
+    file_path = os.path.join(sample_data_path, "fhir-us-core-patient.json")
+    with open(file_path) as f:
+        input_message = "".join(f.readlines())
+
+    decode_count = 0
+    json_loads = json.loads
+
+    def _counting_loads(*args, **kwargs):
+        nonlocal decode_count
+        decode_count += 1
+        return json_loads(*args, **kwargs)
+
+    monkeypatch.setattr(detect.json, "loads", _counting_loads)
+
+    parsed_message: ParsedMessage = parse_message(input_message)
+    assert parsed_message.content_type == ContentType.FHIR_JSON
+    assert decode_count == 1
+
+
+def test_parse_message_binary(sample_data_path: str):
+    """
+    Validates that parse_message supports binary input messages.
+    :param sample_data_path: The sample data path
+    """
+    for file_name in ("270.x12", "adt_a01_26.hl7", "fhir-us-core-patient.json"):
+        with open(os.path.join(sample_data_path, file_name), "rb") as f:
+            input_message = f.read()
+
+        assert parse_message(input_message).error is None
+        assert parse_message(memoryview(input_message)).error is None
+
+
+def test_parse_message_malformed_json():
+    """Validates that a FHIR message containing malformed JSON returns a validation error"""
+    parsed_message = parse_message(b'{"resourceType": "Patient", "id": ')
+    assert parsed_message.content_type == ContentType.FHIR_JSON
+    assert parsed_message.error is not None
+
+
+def test_content_hash():
+    """Validates that content_hash returns the same hash for equivalent text and binary messages"""
+    assert content_hash("MSH|^~\\&|") == content_hash(b"MSH|^~\\&|")
+    assert content_hash(memoryview(b"MSH|^~\\&|")) == content_hash(b"MSH|^~\\&|")
+    assert content_hash(b"MSH|^~\\&|") != content_hash(b"MSH|^~\\&|A")
+
+
+def test_validation_cache_get_put():
+    """Validates ValidationCache hit and miss counters"""
+    cache = ValidationCache(max_entries=2, max_bytes=4096, ttl=60)
+    parsed_message = ParsedMessage(
+        content_type=ContentType.HL7_TEXT, parsed=["MSH"], metadata={"a": "b"}
+    )
+
+    key = cache.key(b"message")
+    assert cache.get(key) is None
+
+    cache.put(key, parsed_message)
+    cached_message = cache.get(key)
+    assert cached_message.content_type == ContentType.HL7_TEXT
+    assert cached_message.metadata == {"a": "b"}
+    # the parsed representation is not cached
+    assert cached_message.parsed is None
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_validation_cache_lru_eviction():
+    """Validates that the least recently used entry is evicted when the cache is full"""
+    cache = ValidationCache(max_entries=2, max_bytes=4096, ttl=60)
+    parsed_message = ParsedMessage(content_type=ContentType.HL7_TEXT)
+
+    cache.put("a", parsed_message)
+    cache.put("b", parsed_message)
+    # access "a" so that "b" is the least recently used entry
+    cache.get("a")
+    cache.put("c", parsed_message)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_validation_cache_max_bytes():
+    """Validates that entries are evicted when the cache exceeds its maximum size"""
+    entry_size = ValidationCache.ENTRY_OVERHEAD + 1
+    cache = ValidationCache(max_entries=10, max_bytes=entry_size * 2, ttl=60)
+    parsed_message = ParsedMessage(content_type=ContentType.HL7_TEXT)
+
+    for key in ("a", "b", "c"):
+        cache.put(key, parsed_message)
+
+    assert len(cache) == 2
+    assert cache.stats()["bytes"] == entry_size * 2
+
+
+def test_validation_cache_ttl(monkeypatch):
+    """Validates that cache entries expire"""
+    current_time = 100.0
+    monkeypatch.setattr(detect.time, "monotonic", lambda: current_time)
+
+    cache = ValidationCache(max_entries=10, max_bytes=4096, ttl=5)
+    cache.put("a", ParsedMessage(content_type=ContentType.HL7_TEXT))
+    assert cache.get("a") is not None
+
+    current_time = 106.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_configure_validation_cache():
+    """Validates configure_validation_cache and get_validation_cache"""
+    configure_validation_cache(max_entries=10, max_bytes=4096, ttl=5)
+    assert isinstance(get_validation_cache(), ValidationCache)
+
+    configure_validation_cache(max_entries=0, max_bytes=4096, ttl=5)
+    assert get_validation_cache() is None
+
+
+@pytest.mark.parametrize(
+    "file_name, content_type",
+    [
+        ("270.x12", ContentType.ASC_X12),
+        ("adt_a01_26.hl7", ContentType.HL7_TEXT),
+        ("fhir-us-core-patient.json", ContentType.FHIR_JSON),
+    ],
+)
+def test_parse_message_validation_modes(
+    sample_data_path: str, file_name: str, content_type: ContentType
+):
+    """
+    Validates that sniff and structural validation modes accept valid messages.
+
+    :param sample_data_path: The path to the sample data directory.
+    :param file_name: The file name within the sample data directory to test.
+    :param content_type: The expected content type
+    """
+    with open(os.path.join(sample_data_path, file_name), "rb") as f:
+        input_message = f.read()
+
+    sniffed_message = parse_message(input_message, validation_mode=ValidationMode.SNIFF)
+    assert sniffed_message.content_type == content_type
+    assert sniffed_message.parsed is None
+    assert sniffed_message.error is None
+
+    structural_message = parse_message(
+        input_message, validation_mode=ValidationMode.STRUCTURAL
+    )
+    full_message = parse_message(input_message, validation_mode=ValidationMode.FULL)
+    assert structural_message.content_type == content_type
+    assert structural_message.parsed is not None
+    assert structural_message.error is None
+    assert structural_message.metadata == full_message.metadata
+
+
+ISA_GS_SEGMENTS = (
+    "ISA*00*          *00*          *ZZ*890069730      *ZZ*154663145      *200929*1705*|*00501*000000001*0*T*:~"
+    + "GS*HS*890069730*154663145*20200929*1705*0001*X*005010X279A1~"
+)
+
+
+@pytest.mark.parametrize(
+    "input_message, content_type",
+    [
+        # missing IEA segment
+        (
+            ISA_GS_SEGMENTS
+            + "ST*270*0001*005010X279A1~BHT*0022*13*10001234*20200929*1319~SE*3*0001~GE*1*0001~",
+            ContentType.ASC_X12,
+        ),
+        # SE segment count mismatch
+        (
+            ISA_GS_SEGMENTS
+            + "ST*270*0001*005010X279A1~BHT*0022*13*10001234*20200929*1319~SE*4*0001~GE*1*0001~"
+            + "IEA*1*000000001~",
+            ContentType.ASC_X12,
+        ),
+        # GE transaction set count mismatch
+        (
+            ISA_GS_SEGMENTS
+            + "ST*270*0001*005010X279A1~BHT*0022*13*10001234*20200929*1319~SE*3*0001~GE*2*0001~"
+            + "IEA*1*000000001~",
+            ContentType.ASC_X12,
+        ),
+        # segment outside of a transaction set
+        (
+            ISA_GS_SEGMENTS
+            + "BHT*0022*13*10001234*20200929*1319~GE*0*0001~IEA*1*000000001~",
+            ContentType.ASC_X12,
+        ),
+        # invalid HL7 segment name
+        (
+            "MSH|^~\\&|SE050|050|PACS|050|20120912011230||ADT^A01|102|T|2.6\rpid|1",
+            ContentType.HL7_TEXT,
+        ),
+        # JSON array
+        ('["resourceType", "Patient"]', ContentType.FHIR_JSON),
+        # non-string resourceType
+        ('{"resourceType": 1}', ContentType.FHIR_JSON),
+    ],
+)
+def test_parse_message_structural_errors(input_message: str, content_type: ContentType):
+    """
+    Validates that structural validation returns errors for malformed messages.
+    :param input_message: The malformed input message
+    :param content_type: The content type of the malformed message
+    """
+    parsed_message = parse_message(
+        input_message, content_type, validation_mode=ValidationMode.STRUCTURAL
+    )
+    assert parsed_message.error is not None
+
+
+HL7_MESSAGE = (
+    "MSH|^~\\&|SE050|050|PACS|050|20120912011230||ADT^A01|{}|T|2.6\rEVN||201209122222"
+)
+HL7_FHS_SEGMENT = "FHS|^~\\&|LAB|050|HOSP|050|20120912011230"
+HL7_BHS_SEGMENT = "BHS|^~\\&|LAB|050|HOSP|050|20120912011230"
+
+
+@pytest.mark.parametrize(
+    "input_message,expected_result",
+    [
+        (f"{HL7_BHS_SEGMENT}\r{HL7_MESSAGE.format(1)}\rBTS|1", True),
+        (f"\n{HL7_FHS_SEGMENT}\r{HL7_BHS_SEGMENT}".encode(), True),
+        (HL7_MESSAGE.format(1), False),
+        ('{"resourceType": "Patient"}', False),
+    ],
+)
+def test_is_hl7_batch(input_message: str | bytes, expected_result: bool):
+    """
+    Validates HL7v2 batch detection.
+    :param input_message: The input message
+    :param expected_result: True if the message is a HL7v2 batch
+    """
+    assert is_hl7_batch(input_message) is expected_result
+    if expected_result:
+        assert detect_content_type(input_message) == ContentType.HL7_TEXT
+
+
+def test_split_hl7_batch():
+    """
+    Validates splitting a HL7v2 batch file with multiple batches into member messages.
+    """
+    segments = [
+        HL7_FHS_SEGMENT,
+        HL7_BHS_SEGMENT,
+        HL7_MESSAGE.format(1),
+        HL7_MESSAGE.format(2),
+        "BTS|2",
+        HL7_BHS_SEGMENT,
+        HL7_MESSAGE.format(3),
+        "BTS|1",
+        "FTS|2",
+    ]
+    batch = "\n".join(segments).encode()
+
+    messages = list(split_hl7_batch(batch))
+    assert messages == [HL7_MESSAGE.format(i) for i in range(1, 4)]
+
+    for message in messages:
+        parsed_message = parse_message(message)
+        assert parsed_message.error is None
+        assert parsed_message.metadata["message_type"] == "ADT^A01"
+
+
+@pytest.mark.parametrize(
+    "batch",
+    [
+        # batch message count mismatch
+        f"{HL7_BHS_SEGMENT}\r{HL7_MESSAGE.format(1)}\rBTS|2",
+        # file batch count mismatch
+        f"{HL7_FHS_SEGMENT}\r{HL7_BHS_SEGMENT}\r{HL7_MESSAGE.format(1)}\rBTS|1\rFTS|3",
+        # segment preceding MSH
+        f"{HL7_BHS_SEGMENT}\rEVN||201209122222\r{HL7_MESSAGE.format(1)}",
+        # empty batch
+        f"{HL7_BHS_SEGMENT}\rBTS|0",
+        # not a batch
+        HL7_MESSAGE.format(1),
+    ],
+)
+def test_split_hl7_batch_errors(batch: str):
+    """
+    Validates that structural errors are raised for malformed HL7v2 batches.
+    :param batch: The malformed HL7v2 batch
+    """
+    with pytest.raises(DataValidationError):
+        list(split_hl7_batch(batch))
+
+
+def test_detect_lazy_imports():
+    """
+    Validates that importing the detect module does not load the parsing libraries.
+    A subprocess is used since the libraries are loaded within the test session.
+    """
+    script = (
+        "import sys\n"
+        "import linuxforhealth.healthos.core.detect\n"
+        "loaded = {'hl7', 'fhir.resources', 'linuxforhealth.x12.io'} & set(sys.modules)\n"
+        "assert not loaded, loaded\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, env=os.environ.copy())
+
+
+@pytest.mark.parametrize(
+    "content_type,module_name",
+    [
+        (ContentType.ASC_X12, "linuxforhealth.x12.v5010.x12_837_005010X222A2.parsing"),
+        (ContentType.FHIR_JSON, "fhir.resources.bundle"),
+        ("text/hl7v2", "hl7"),
+    ],
+)
+def test_prewarm(content_type: ContentType | str, module_name: str):
+    """
+    Validates that pre-warming loads the parser modules for a content type.
+    :param content_type: The content type to pre-warm
+    :param module_name: A module loaded by the pre-warm
+    """
+    prewarm([content_type])
+    assert module_name in sys.modules
+
+
+def test_fhir_model_registry():
+    """
+    Validates that the FHIR model registry resolves and caches allowed resource types.
+    """
+    registry = FhirModelRegistry(["Patient", "Observation"])
+
+    patient_model = registry.get_model("Patient")
+    assert patient_model.__name__ == "Patient"
+    assert registry.get_model("Patient") is patient_model
+
+    assert registry.warm() > 0
+
+    # element and nested resource models are not limited by the allow-list
+    assert registry.get_element_model("BundleEntry").__name__ == "BundleEntry"
+    assert registry.get_element_model("Encounter").__name__ == "Encounter"
+    with pytest.raises(DataValidationError):
+        registry.get_element_model("NotAResource")
+
+
+@pytest.mark.parametrize(
+    "resource_type",
+    [
+        # not included in the allow-list
+        "Encounter",
+        # unknown resource type
+        "NotAResource",
+        # invalid resource type
+        None,
+        {"type": "Patient"},
+    ],
+)
+def test_fhir_model_registry_rejected_types(resource_type):
+    """
+    Validates that the FHIR model registry rejects unknown and disallowed resource types.
+    :param resource_type: The rejected resource type
+    """
+    registry = FhirModelRegistry(["Patient"])
+    with pytest.raises(DataValidationError):
+        registry.get_model(resource_type)
+
+
+def test_parse_message_fhir_resource_types(sample_data_path):
+    """
+    Validates that FHIR validation applies the configured resource type allow-list.
+    :param sample_data_path: The path to the sample-data directory
+    """
+    with open(os.path.join(sample_data_path, "fhir-us-core-patient.json")) as f:
+        patient = f.read()
+
+    try:
+        configure_fhir_model_registry(["Observation"])
+        assert "not supported" in parse_message(patient).error
+
+        configure_fhir_model_registry(["Patient"])
+        assert parse_message(patient).error is None
+    finally:
+        configure_fhir_model_registry()
+
+    assert get_fhir_model_registry().resource_types is None
+    assert "Unknown" in parse_message('{"resourceType": "NotAResource"}').error
@@ -0,0 +1,172 @@
+"""
+test_executor.py
+
+Tests the validation process pool.
+"""
+import asyncio
+import os
+
+import pytest
+
+from linuxforhealth.healthos.core import executor
+from linuxforhealth.healthos.core.detect import (
+    ContentType,
+    ContentTypeError,
+    configure_validation_cache,
+    get_validation_cache,
+)
+from linuxforhealth.healthos.core.executor import (
+    create_validation_executor,
+    get_validation_executor,
+    shutdown_validation_executor,
+    submit_parse_message,
+)
+
+
+@pytest.fixture
+def sample_data_path(resources_path) -> str:
+    """Returns the path to the test resources sample-data directory"""
+    return os.path.join(resources_path, "sample-data")
+
+
+@pytest.fixture
+def validation_executor():
+    """Creates a single worker validation process pool, shutting it down after the test completes"""
+    create_validation_executor(
+        max_workers=1, max_pending=2, prewarm_content_types=["text/hl7v2"]
+    )
+    yield get_validation_executor()
+    shutdown_validation_executor()
+
+
+def test_create_validation_executor_without_workers():
+    """Validates that a process pool is not created when max_workers is 0"""
+    create_validation_executor(max_workers=0, max_pending=2)
+    assert get_validation_executor() is None
+
+
+@pytest.mark.asyncio
+async def test_submit_parse_message_in_event_loop(sample_data_path):
+    """
+    Validates that messages are parsed within the event loop if a process pool does not exist.
+
+    :param sample_data_path: The path to the sample-data directory
+    """
+    with open(os.path.join(sample_data_path, "adt_a01_26.hl7")) as f:
+        message = f.read()
+
+    parsed_message = await submit_parse_message(message)
+    assert parsed_message.content_type == ContentType.HL7_TEXT
+    assert parsed_message.parsed is not None
+
+
+@pytest.mark.parametrize(
+    "file_name, content_type, has_error",
+    [
+        ("270.x12", ContentType.ASC_X12, False),
+        ("fhir-us-core-patient.json", ContentType.FHIR_JSON, False),
+        ("invalid-270.x12", ContentType.ASC_X12, True),
+    ],
+)
+@pytest.mark.asyncio
+async def test_submit_parse_message_process_pool(
+    validation_executor, sample_data_path, file_name, content_type, has_error
+):
+    """
+    Validates that messages are parsed within the validation process pool.
+
+    :param validation_executor: The validation process pool fixture
+    :param sample_data_path: The path to the sample-data directory
+    :param file_name: The file name containing the test message
+    :param content_type: The message's expected content type
+    :param has_error: True if the message is expected to fail validation
+    """
+    with open(os.path.join(sample_data_path, file_name)) as f:
+        message = f.read()
+
+    parsed_message = await submit_parse_message(message)
+    assert parsed_message.content_type == content_type
+    assert parsed_message.parsed is None
+    assert (parsed_message.error is not None) == has_error
+
+
+@pytest.mark.asyncio
+async def test_submit_parse_message_process_pool_content_type_error(
+    validation_executor,
+):
+    """
+    Validates that a ContentTypeError raised within the process pool is raised to the caller.
+
+    :param validation_executor: The validation process pool fixture
+    """
+    with pytest.raises(ContentTypeError):
+        await submit_parse_message("first_name,last_name")
+
+
+@pytest.mark.asyncio
+async def test_submit_parse_message_broken_process_pool(
+    validation_executor, sample_data_path
+):
+    """
+    Validates that a broken process pool is replaced, and that the message submitted to the broken pool is
+    returned with an error.
+
+    :param validation_executor: The validation process pool fixture
+    :param sample_data_path: The path to the sample-data directory
+    """
+    with open(os.path.join(sample_data_path, "270.x12")) as f:
+        message = f.read()
+
+    parsed_message = await submit_parse_message(message)
+    assert parsed_message.error is None
+
+    # a worker process which is killed breaks the pool
+    for process in list(validation_executor._processes.values()):
+        process.kill()
+        process.join()
+    for _ in range(100):
+        if validation_executor._broken:
+            break
+        await asyncio.sleep(0.05)
+
+    parsed_message = await submit_parse_message(message)
+    assert parsed_message.content_type == ContentType.ASC_X12
+    assert "exited unexpectedly" in parsed_message.error
+    assert get_validation_executor() is not validation_executor
+
+    parsed_message = await submit_parse_message(message)
+    assert parsed_message.error is None
+
+
+@pytest.mark.asyncio
+async def test_submit_parse_message_cache(monkeypatch, sample_data_path):
+    """
+    Validates that repeated messages are served from the validation cache.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param sample_data_path: The path to the sample-data directory
+    """
+    with open(os.path.join(sample_data_path, "270.x12")) as f:
+        message = f.read()
+
+    parse_count = 0
+    parse_message = executor.parse_message
+
+    def _counting_parse_message(*args, **kwargs):
+        nonlocal parse_count
+        parse_count += 1
+        return parse_message(*args, **kwargs)
+
+    monkeypatch.setattr(executor, "parse_message", _counting_parse_message)
+    configure_validation_cache(max_entries=10, max_bytes=65536, ttl=60)
+
+    try:
+        first_message = await submit_parse_message(message)
+        second_message = await submit_parse_message(message.encode())
+
+        assert parse_count == 1
+        assert first_message.content_type == second_message.content_type
+        assert first_message.metadata == second_message.metadata
+        assert get_validation_cache().stats()["hits"] == 1
+    finally:
+        configure_validation_cache(max_entries=0, max_bytes=0, ttl=60)
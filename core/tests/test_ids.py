@@ -0,0 +1,63 @@
+"""
+test_ids.py
+
+Tests data id generation.
+"""
+import time
+import uuid
+
+from linuxforhealth.healthos.core import ids
+from linuxforhealth.healthos.core.connector.processor import PublishDataModel
+from linuxforhealth.healthos.core.ids import (
+    DataIdGenerator,
+    data_id_timestamp,
+    generate_data_id,
+)
+
+
+def test_generate_data_id():
+    """Validates the data id version, variant, and timestamp"""
+    start_time = time.time()
+    data_id = generate_data_id()
+
+    assert isinstance(data_id, uuid.UUID)
+    assert data_id.version == 7
+    assert data_id.variant == uuid.RFC_4122
+    assert abs(data_id_timestamp(data_id) - start_time) < 1
+
+
+def test_generate_data_id_ordering():
+    """Validates that data ids are unique and time-ordered"""
+    data_ids = [generate_data_id() for _ in range(50_000)]
+
+    assert len(set(data_ids)) == len(data_ids)
+    assert data_ids == sorted(data_ids)
+    assert [str(d) for d in data_ids] == sorted(str(d) for d in data_ids)
+
+
+def test_generate_data_id_fixed_clock(monkeypatch):
+    """
+    Validates that data ids remain ordered when the counter is exhausted, or the clock moves backwards.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    clock_ns = [1_700_000_000_000 * 1_000_000]
+    monkeypatch.setattr(ids.time, "time_ns", lambda: clock_ns[0])
+    generator = DataIdGenerator()
+
+    data_ids = [generator.generate() for _ in range(ids.COUNTER_MAX + 10)]
+    assert data_ids == sorted(data_ids)
+    assert data_id_timestamp(data_ids[-1]) > data_id_timestamp(data_ids[0])
+
+    clock_ns[0] -= 5_000_000_000
+    data_id = generator.generate()
+    assert data_id > data_ids[-1]
+
+
+def test_publish_data_model_data_ids():
+    """Validates that each PublishDataModel receives a distinct data id"""
+    first_model = PublishDataModel(data="first message")
+    second_model = PublishDataModel(data="second message")
+
+    assert first_model.data_id.version == 7
+    assert first_model.data_id < second_model.data_id
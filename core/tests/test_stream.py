@@ -0,0 +1,336 @@
+"""
+test_stream.py
+
+Tests incremental validation of large messages.
+"""
+import io
+import json
+import os
+from typing import Dict, List
+
+import pytest
+
+from linuxforhealth.healthos.core import detect
+from linuxforhealth.healthos.core.detect import ContentType, parse_message
+from linuxforhealth.healthos.core.stream import (
+    JsonStreamReader,
+    TextSliceReader,
+    X12StreamReader,
+    validate_fhir_bundle_stream,
+    validate_x12_stream,
+)
+
+X12_ISA_SEGMENT = "ISA*00*          *00*          *ZZ*890069730      *ZZ*154663145      *200929*1705*|*00501*000000001*0*T*:~"
+X12_GS_SEGMENT = "GS*HS*890069730*154663145*20200929*1705*0001*X*005010X279A1~"
+X12_270_BODY = [
+    "BHT*0022*13*10001234*20200929*1319",
+    "HL*1**20*1",
+    "NM1*PR*2*UNIFIED INSURANCE CO*****PI*842610001",
+    "HL*2*1*21*1",
+    "NM1*1P*2*DOWNTOWN MEDICAL CENTER*****XX*2868383243",
+    "HL*3*2*22*0",
+    "TRN*1*1*1453915417",
+    "NM1*IL*1*DOE*JOHN****MI*11122333301",
+    "DMG*D8*19800519",
+    "DTP*291*D8*20200101",
+    "EQ*30",
+]
+
+
+@pytest.fixture
+def sample_data_path(resources_path) -> str:
+    """Returns the path to the test resources sample-data directory"""
+    return os.path.join(resources_path, "sample-data")
+
+
+@pytest.fixture
+def patient(sample_data_path) -> Dict:
+    """Returns the sample FHIR Patient resource"""
+    with open(os.path.join(sample_data_path, "fhir-us-core-patient.json")) as f:
+        return json.load(f)
+
+
+def create_bundle(resources: List[Dict]) -> Dict:
+    """
+    Creates a FHIR transaction Bundle containing the resources.
+
+    :param resources: The bundle's resources
+    :return: the Bundle
+    """
+    return {
+        "resourceType": "Bundle",
+        "id": "bundle-1",
+        "type": "transaction",
+        "entry": [
+            {
+                "fullUrl": f"urn:uuid:{i}",
+                "resource": r,
+                "request": {"method": "POST", "url": r["resourceType"]},
+            }
+            for i, r in enumerate(resources)
+        ],
+        "total": 12345,
+    }
+
+
+def create_x12_interchange(transactions: List[List[str]]) -> str:
+    """
+    Creates a X12 270 interchange containing the transaction sets.
+
+    :param transactions: The body segments for each transaction set, excluding ST and SE.
+    :return: the X12 interchange
+    """
+    x12_message = X12_ISA_SEGMENT + X12_GS_SEGMENT
+    for i, body in enumerate(transactions, start=1):
+        control_number = f"{i:04}"
+        segments = [f"ST*270*{control_number}*005010X279A1", *body]
+        segments.append(f"SE*{len(segments) + 1}*{control_number}")
+        x12_message += "~".join(segments) + "~"
+    x12_message += f"GE*{len(transactions)}*0001~IEA*1*000000001~"
+    return x12_message
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 65536])
+def test_json_stream_reader(chunk_size: int):
+    """
+    Validates that JsonStreamReader reads values split across chunk boundaries.
+    :param chunk_size: The number of bytes read at a time
+    """
+    document = '{"name": "Ωmega", "count": 123456789, "items": [1, {"a": true}, null]}'
+    reader = JsonStreamReader(io.BytesIO(document.encode()), chunk_size)
+
+    reader.expect("{")
+    assert reader.read_value() == "name"
+    reader.expect(":")
+    assert reader.read_value() == "Ωmega"
+    reader.expect(",")
+    assert reader.read_value() == "count"
+    reader.expect(":")
+    assert reader.read_value() == 123456789
+    reader.expect(",")
+    assert reader.read_value() == "items"
+    reader.expect(":")
+    assert reader.read_value() == [1, {"a": True}, None]
+    reader.expect("}")
+    assert reader.peek() == ""
+
+
+def test_text_slice_reader():
+    """Validates that TextSliceReader reads a string one slice at a time"""
+    reader = TextSliceReader("Ωmega bundle")
+    assert reader.read(5) == "Ωmega"
+    assert reader.read(100) == " bundle"
+    assert reader.read(5) == ""
+
+    reader = TextSliceReader("Ωmega bundle")
+    assert reader.read() == "Ωmega bundle"
+    assert reader.read() == ""
+
+
+@pytest.mark.parametrize("chunk_size", [16, 65536])
+def test_validate_fhir_bundle_stream(patient: Dict, chunk_size: int):
+    """
+    Validates a FHIR Bundle stream when all entries are valid.
+
+    :param patient: The FHIR Patient fixture
+    :param chunk_size: The number of bytes read at a time
+    """
+    bundle = create_bundle([patient] * 5)
+    stream = io.BytesIO(json.dumps(bundle).encode())
+
+    result = validate_fhir_bundle_stream(stream, chunk_size)
+    assert result.is_valid
+    assert result.item_count == 5
+    assert result.metadata == {"resource_type": "Bundle", "resource_id": "bundle-1"}
+
+
+def test_validate_fhir_bundle_stream_entry_errors(patient: Dict):
+    """
+    Validates that errors are reported for each invalid Bundle entry.
+
+    :param patient: The FHIR Patient fixture
+    """
+    invalid_patient = {**patient, "id": "invalid", "birthDate": "not-a-date"}
+    bundle = create_bundle([patient, invalid_patient, patient, invalid_patient])
+    stream = io.StringIO(json.dumps(bundle))
+
+    result = validate_fhir_bundle_stream(stream, chunk_size=128)
+    assert not result.is_valid
+    assert result.error is None
+    assert result.item_count == 4
+    assert [e.index for e in result.errors] == [1, 3]
+    assert result.errors[0].id == "Patient/invalid"
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        # not a Bundle
+        '{"resourceType": "Patient", "id": "example"}',
+        # missing the required Bundle type
+        '{"resourceType": "Bundle", "entry": []}',
+        # truncated document
+        '{"resourceType": "Bundle", "type": "transaction", "entry": [{"fullUrl": "urn:uuid:1"',
+        # trailing data
+        '{"resourceType": "Bundle", "type": "transaction"} {}',
+    ],
+)
+def test_validate_fhir_bundle_stream_bundle_errors(document: str):
+    """
+    Validates that errors are reported for invalid Bundles.
+    :param document: The invalid Bundle document
+    """
+    result = validate_fhir_bundle_stream(io.StringIO(document), chunk_size=8)
+    assert result.error is not None
+
+
+def test_parse_message_large_bundle(monkeypatch, patient: Dict):
+    """
+    Validates that parse_message streams FHIR Bundles which exceed the streaming threshold.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param patient: The FHIR Patient fixture
+    """
+    monkeypatch.setattr(detect, "STREAMING_THRESHOLD", 1024)
+
+    invalid_patient = {**patient, "id": "invalid", "birthDate": "not-a-date"}
+    bundle = create_bundle([patient, invalid_patient])
+    message = json.dumps(bundle).encode()
+
+    parsed_message = parse_message(message)
+    assert parsed_message.content_type == ContentType.FHIR_JSON
+    assert parsed_message.parsed is None
+    assert parsed_message.metadata["resource_id"] == "bundle-1"
+    assert "entry 1 (Patient/invalid)" in parsed_message.error
+
+    bundle = create_bundle([patient, patient])
+    parsed_message = parse_message(json.dumps(bundle))
+    assert parsed_message.error is None
+
+
+def test_parse_message_large_bundle_resource_types(monkeypatch, patient: Dict):
+    """
+    Validates that the FHIR resource type allow-list applies to streamed Bundles.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param patient: The FHIR Patient fixture
+    """
+    monkeypatch.setattr(detect, "STREAMING_THRESHOLD", 1024)
+    message = json.dumps(create_bundle([patient, patient]))
+
+    try:
+        detect.configure_fhir_model_registry(["Patient"])
+        assert "not supported" in parse_message(message).error
+        assert (
+            "not supported" in validate_fhir_bundle_stream(io.StringIO(message)).error
+        )
+
+        detect.configure_fhir_model_registry(["Bundle"])
+        assert parse_message(message).error is None
+    finally:
+        detect.configure_fhir_model_registry()
+
+    unknown_resource = {"resourceType": "NotAResource", "id": "unknown"}
+    parsed_message = parse_message(
+        json.dumps(create_bundle([patient, unknown_resource]))
+    )
+    assert (
+        "entry 1 (NotAResource/unknown): Unknown FHIR resource type"
+        in parsed_message.error
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 65536])
+def test_x12_stream_reader(chunk_size: int):
+    """
+    Validates that X12StreamReader reads segments split across chunk boundaries.
+
+    :param chunk_size: The stream chunk size
+    """
+    x12_message = "\n" + create_x12_interchange([X12_270_BODY])
+    reader = X12StreamReader(io.BytesIO(x12_message.encode()), chunk_size)
+    segments = list(reader.segments())
+
+    assert reader.element_separator == "*"
+    assert reader.segment_terminator == "~"
+    assert [s[0] for s in segments[:3]] == ["ISA", "GS", "ST"]
+    assert segments[-1] == ["IEA", "1", "000000001"]
+    assert len(segments) == 17
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64, 65536])
+def test_validate_x12_stream(chunk_size: int):
+    """
+    Validates streaming validation of a valid X12 interchange.
+
+    :param chunk_size: The stream chunk size
+    """
+    x12_message = create_x12_interchange([X12_270_BODY] * 3)
+    result = validate_x12_stream(io.StringIO(x12_message), chunk_size=chunk_size)
+
+    assert result.content_type == ContentType.ASC_X12
+    assert result.is_valid
+    assert result.item_count == 3
+    assert result.metadata == {
+        "transaction_set_codes": "270",
+        "transaction_set_control_number": "0001",
+    }
+
+
+def test_validate_x12_stream_transaction_errors():
+    """
+    Validates that invalid transaction sets are reported without stopping validation.
+    """
+    # the invalid transaction set is missing its information source loop
+    invalid_body = X12_270_BODY[:1] + X12_270_BODY[3:]
+    x12_message = create_x12_interchange([X12_270_BODY, invalid_body, X12_270_BODY])
+    result = validate_x12_stream(io.BytesIO(x12_message.encode()), chunk_size=32)
+
+    assert result.error is None
+    assert result.item_count == 3
+    assert [(e.index, e.id) for e in result.errors] == [(1, "270/0002")]
+
+
+@pytest.mark.parametrize(
+    "x12_message",
+    [
+        # shorter than the ISA segment
+        X12_ISA_SEGMENT[:50],
+        # transaction set segment count mismatch
+        X12_ISA_SEGMENT
+        + X12_GS_SEGMENT
+        + "ST*270*0001*005010X279A1~BHT*0022*13*10001234*20200929*1319~SE*4*0001~GE*1*0001~IEA*1*000000001~",
+        # missing IEA segment
+        create_x12_interchange([X12_270_BODY])[: -len("IEA*1*000000001~")],
+    ],
+)
+def test_validate_x12_stream_envelope_errors(x12_message: str):
+    """
+    Validates that validation stops at the first envelope error.
+
+    :param x12_message: The invalid X12 interchange
+    """
+    result = validate_x12_stream(io.StringIO(x12_message), chunk_size=16)
+    assert result.error is not None
+    assert not result.is_valid
+
+
+def test_parse_message_large_x12(monkeypatch):
+    """
+    Validates that parse_message streams X12 interchanges which exceed the streaming threshold.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+    monkeypatch.setattr(detect, "STREAMING_THRESHOLD", 1024)
+
+    invalid_body = X12_270_BODY[:1] + X12_270_BODY[3:]
+    x12_message = create_x12_interchange([X12_270_BODY, X12_270_BODY, invalid_body])
+
+    parsed_message = parse_message(x12_message.encode())
+    assert parsed_message.content_type == ContentType.ASC_X12
+    assert parsed_message.parsed is None
+    assert parsed_message.metadata["transaction_set_codes"] == "270"
+    assert parsed_message.error.startswith("transaction set 2 (270/0003)")
+
+    x12_message = create_x12_interchange([X12_270_BODY] * 3)
+    assert parse_message(x12_message).error is None